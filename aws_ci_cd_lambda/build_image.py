@@ -0,0 +1,41 @@
+import os
+
+from typing import List, Optional
+from aws_cdk import aws_codebuild, aws_lambda, core
+
+
+class BuildImage:
+    """
+    CodeBuild image with jq, zip, git, ssh, virtualenv, the function's python version and build toolchains
+    preinstalled. The image is built from a Dockerfile shipped with this package and stored in ECR
+    by the CDK asset pipeline, hence it is rebuilt only when the Dockerfile or its arguments change.
+    """
+    def __init__(
+            self,
+            scope: core.Stack,
+            prefix: str,
+            lambda_runtime: aws_lambda.Runtime,
+            extra_packages: Optional[List[str]] = None
+    ) -> None:
+        """
+        Constructor. Pass the "build_image" property to PipelineParameters.
+
+        :param scope: A scope in which resources shall be created.
+        :param prefix: Prefix for all of your resource IDs and names.
+        :param lambda_runtime: Runtime of your function. The image contains the same python version.
+        :param extra_packages: Additional yum packages, e.g. headers of native dependencies. Optional
+        """
+        assert lambda_runtime.name.startswith('python'), 'Only python runtimes are supported.'
+
+        self.__build_image = aws_codebuild.LinuxBuildImage.from_asset(
+            scope, prefix + 'CiCdLambdaBuildImage',
+            directory=os.path.join(os.path.dirname(os.path.realpath(__file__)), 'files', 'build_image'),
+            build_args={
+                'PYTHON_VERSION': lambda_runtime.name,
+                'EXTRA_PACKAGES': ' '.join(extra_packages or []),
+            }
+        )
+
+    @property
+    def build_image(self) -> aws_codebuild.IBuildImage:
+        return self.__build_image
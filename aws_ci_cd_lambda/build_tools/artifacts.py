@@ -0,0 +1,170 @@
+"""
+Content-addressed store of deployment packages.
+
+Packages are stored under a key of their sha256 hash ("artifacts/<hash>.zip"), hence identical packages
+are uploaded once and every deployed package stays available for rollbacks. A small manifest per function
+and commit ("manifests/<function>/<commit>.json") maps the commit to the package hash (and the dependency layer
+in layered mode).
+
+Lifecycle rules of the bucket expire packages and manifests after the same retention period. A package deployed
+again is "touched" (copied onto itself), which restarts its retention period. A manifest is only written after its
+package was stored or touched, hence a package is never older than any manifest referencing it and manifests
+expire first. S3 removes expired objects asynchronously though, so a manifest of the last retention day may
+briefly outlive its package: rollbacks check, that the package still exists (see artifact_exists).
+"""
+import base64
+import json
+import os
+import tempfile
+import time
+
+from typing import Any, Dict, List, Optional
+
+from .aws_cli import AwsCliError
+
+ARTIFACTS_PREFIX = 'artifacts'
+MANIFESTS_PREFIX = 'manifests'
+
+
+def artifact_key(artifact_sha256: str) -> str:
+    """
+    Creates a content-addressed key of a package.
+
+    :param artifact_sha256: Base64 encoded sha256 hash of the package (see deploy.code_sha256).
+
+    :return: S3 key.
+    """
+    return f'{ARTIFACTS_PREFIX}/{base64.b64decode(artifact_sha256).hex()}.zip'
+
+
+def artifact_exists(client: Any, bucket: str, key: str) -> bool:
+    try:
+        client.call('s3api', 'head-object', {'Bucket': bucket, 'Key': key})
+    except AwsCliError:
+        return False
+
+    return True
+
+
+def store_artifact(client: Any, bucket: str, path: str, artifact_sha256: str) -> str:
+    """
+    Uploads a package unless a package with the same hash is already stored.
+    The AWS CLI uploads large packages with parallel multipart uploads.
+
+    :param client: AWS client (see AwsCli).
+    :param bucket: S3 bucket.
+    :param path: Path to the package.
+    :param artifact_sha256: Base64 encoded sha256 hash of the package.
+
+    :return: S3 key of the package.
+    """
+    key = artifact_key(artifact_sha256)
+
+    if not artifact_exists(client, bucket, key):
+        client.copy(path, f's3://{bucket}/{key}')
+        print(f'Uploaded package to s3://{bucket}/{key}.')
+        return key
+
+    # Copying an object onto itself restarts its lifecycle expiration.
+    client.call('s3api', 'copy-object', {
+        'Bucket': bucket,
+        'Key': key,
+        'CopySource': f'{bucket}/{key}',
+        'MetadataDirective': 'REPLACE',
+    })
+
+    print(f'Package s3://{bucket}/{key} is already stored, upload skipped.')
+    return key
+
+
+def manifest_key(function_name: str, commit: str) -> str:
+    return f'{MANIFESTS_PREFIX}/{function_name}/{commit}.json'
+
+
+def write_manifest(
+        client: Any,
+        bucket: str,
+        function_name: str,
+        commit: str,
+        key: str,
+        layer_arn: Optional[str] = None
+) -> None:
+    """
+    Stores a manifest, that maps a commit to a deployed package.
+
+    :param client: AWS client (see AwsCli).
+    :param bucket: S3 bucket.
+    :param function_name: Function name.
+    :param commit: Source commit of the package.
+    :param key: S3 key of the package.
+    :param layer_arn: Dependency layer of the package. Optional
+
+    :return: No return.
+    """
+    manifest = {
+        'function': function_name,
+        'commit': commit,
+        'key': key,
+        'layer_arn': layer_arn,
+        'created': int(time.time()),
+    }
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'manifest.json')
+
+        with open(path, 'w') as file:
+            json.dump(manifest, file, indent=2, sort_keys=True)
+
+        client.copy(path, f's3://{bucket}/{manifest_key(function_name, commit)}')
+
+
+def read_manifest(client: Any, bucket: str, function_name: str, commit: str) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'manifest.json')
+        client.copy(f's3://{bucket}/{manifest_key(function_name, commit)}', path)
+
+        with open(path) as file:
+            return json.load(file)
+
+
+def list_manifests(client: Any, bucket: str, function_name: str) -> List[Dict[str, Any]]:
+    """
+    Lists deployed commits of a function.
+
+    :param client: AWS client (see AwsCli).
+    :param bucket: S3 bucket.
+    :param function_name: Function name.
+
+    :return: Commits and the time of their manifests, the latest first.
+    """
+    response = client.call('s3api', 'list-objects-v2', {
+        'Bucket': bucket,
+        'Prefix': f'{MANIFESTS_PREFIX}/{function_name}/',
+    })
+
+    objects = sorted(response.get('Contents', []), key=lambda item: item['LastModified'], reverse=True)
+
+    return [
+        {'commit': os.path.basename(item['Key'])[:-len('.json')], 'modified': item['LastModified']}
+        for item in objects
+    ]
+
+
+def find_manifest(client: Any, bucket: str, function_name: str, key: str) -> Optional[Dict[str, Any]]:
+    """
+    Finds the latest manifest of a function, that references a package.
+
+    :param client: AWS client (see AwsCli).
+    :param bucket: S3 bucket.
+    :param function_name: Function name.
+    :param key: S3 key of the package.
+
+    :return: Manifest or None, if no deployed commit of the function references the package.
+    """
+    for item in list_manifests(client, bucket, function_name):
+        manifest = read_manifest(client, bucket, function_name, item['commit'])
+
+        if manifest['key'] == key:
+            return manifest
+
+    return None
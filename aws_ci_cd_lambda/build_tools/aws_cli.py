@@ -0,0 +1,65 @@
+"""
+Thin wrapper around the AWS CLI, which is preinstalled in every CodeBuild image.
+
+Build tools talk to AWS only through a client with this interface, hence they can be tested
+offline by supplying a stub with the same methods.
+"""
+import json
+import re
+import subprocess
+
+from typing import Any, Dict, Optional
+
+
+class AwsCliError(Exception):
+    """
+    Raised when an AWS CLI command fails.
+    """
+    def __init__(self, command: str, stderr: str) -> None:
+        match = re.search(r'An error occurred \((\w+)\)', stderr)
+
+        self.command = command
+        self.code = match.group(1) if match else None
+        super().__init__(f'Command "{command}" failed: {stderr.strip()}')
+
+
+class AwsCli:
+    """
+    Calls AWS APIs through the AWS CLI.
+    """
+    def call(self, service: str, operation: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Calls an AWS API operation.
+
+        :param service: Service name as used by the CLI, e.g. "lambda".
+        :param operation: Operation name as used by the CLI, e.g. "get-function-configuration".
+        :param params: Request parameters in the shape of the API request (PascalCase keys).
+
+        :return: Parsed JSON response.
+        """
+        command = ['aws', service, operation, '--output', 'json']
+
+        if params:
+            command += ['--cli-input-json', json.dumps(params)]
+
+        return self.__run(command)
+
+    def copy(self, source: str, destination: str) -> None:
+        """
+        Copies a file to or from S3. Large files are uploaded with multipart uploads.
+
+        :param source: Local path or S3 url.
+        :param destination: Local path or S3 url.
+
+        :return: No return.
+        """
+        self.__run(['aws', 's3', 'cp', '--only-show-errors', source, destination])
+
+    @staticmethod
+    def __run(command) -> Dict[str, Any]:
+        result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+
+        if result.returncode != 0:
+            raise AwsCliError(' '.join(command[:3]), result.stderr)
+
+        return json.loads(result.stdout) if result.stdout.strip() else {}
@@ -0,0 +1,110 @@
+"""
+Generates a Dockerfile for deploying a function as a container image.
+
+Layers are ordered from the least to the most frequently changing, so registry-backed layer caching
+reuses as much as possible:
+
+1. the AWS Lambda base image of the function runtime,
+2. dependency files only (install.sh and lock files), then the dependency install,
+3. the function source code.
+
+Hence dependencies are reinstalled only if install.sh or a lock file changes, and a code change
+rebuilds only the last, small layer.
+
+Usage:
+    python -m build_tools.container --runtime python3.8 --handler manage.runner --output Dockerfile.lambda
+        [--lock-file requirements.txt ...] [--install-command "./install.sh"] [--ssh]
+"""
+import argparse
+import glob
+import os
+
+from typing import List, Optional
+
+# Files, that never belong to a function image. Docker reads them from the ".dockerignore" file.
+DOCKER_IGNORE = ['.git', '**/__pycache__', '**/*.pyc']
+
+
+def base_image(runtime: str) -> str:
+    """
+    Resolves the AWS Lambda base image of a runtime.
+
+    :param runtime: Lambda runtime, e.g. "python3.8".
+
+    :return: Image name, e.g. "public.ecr.aws/lambda/python:3.8".
+    """
+    return f'public.ecr.aws/lambda/python:{runtime[len("python"):]}'
+
+
+def dockerfile(
+        runtime: str,
+        handler: str,
+        lock_files: List[str],
+        install_command: str = './install.sh',
+        ssh: bool = False
+) -> str:
+    """
+    Creates a Dockerfile of a function.
+
+    :param runtime: Lambda runtime, e.g. "python3.8".
+    :param handler: Function handler, e.g. "manage.runner".
+    :param lock_files: Existing dependency files, that install.sh reads, relative to the build context.
+    :param install_command: Command, that installs dependencies.
+    :param ssh: Forward the ssh agent of the build to the install command (for private repositories).
+
+    :return: Dockerfile contents.
+    """
+    dependency_files = ['install.sh'] + [name for name in lock_files if name != 'install.sh']
+    mount = '--mount=type=ssh ' if ssh else ''
+
+    lines = [
+        '# syntax=docker/dockerfile:1',
+        f'FROM {base_image(runtime)}',
+        'WORKDIR ${LAMBDA_TASK_ROOT}',
+        '',
+        '# Dependency files are copied on their own, so this layer and the install are cached until they change.',
+        *[f'COPY {name} ./{name}' for name in dependency_files],
+        f'RUN {mount}chmod +x install.sh && {install_command}',
+        '',
+        '# Source code changes most often, hence it is the last layer.',
+        'COPY . ./',
+        f'CMD ["{handler}"]',
+    ]
+
+    return '\n'.join(lines) + '\n'
+
+
+def find_lock_files(patterns: List[str]) -> List[str]:
+    """
+    Finds existing dependency files.
+
+    :param patterns: File names or glob patterns relative to the working directory.
+
+    :return: Sorted unique paths.
+    """
+    return sorted({path.replace(os.sep, '/') for pattern in patterns for path in glob.glob(pattern) if os.path.isfile(path)})
+
+
+def main(args: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Generates a Dockerfile of a function.')
+    parser.add_argument('--runtime', required=True)
+    parser.add_argument('--handler', required=True)
+    parser.add_argument('--output', required=True, help='Path of the Dockerfile to write.')
+    parser.add_argument('--lock-file', action='append', default=[], help='Dependency file or glob pattern.')
+    parser.add_argument('--install-command', default='./install.sh')
+    parser.add_argument('--ssh', action='store_true', help='Forward the ssh agent to the install command.')
+    arguments = parser.parse_args(args)
+
+    lock_files = find_lock_files(arguments.lock_file)
+
+    with open(arguments.output, 'w') as file:
+        file.write(dockerfile(arguments.runtime, arguments.handler, lock_files, arguments.install_command, arguments.ssh))
+
+    with open('.dockerignore', 'a') as file:
+        file.write(''.join(line + '\n' for line in DOCKER_IGNORE))
+
+    print(f'Generated {arguments.output}. Dependency layers are keyed by: install.sh {" ".join(lock_files)}.')
+
+
+if __name__ == '__main__':
+    main()
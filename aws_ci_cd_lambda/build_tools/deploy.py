@@ -0,0 +1,491 @@
+"""
+Deploys a packaged function to AWS Lambda.
+
+In layered mode dependencies are deployed as a Lambda Layer named by a hash of the resolved dependency set.
+A layer is built and published only when its hash is new, otherwise the existing layer version is reused
+and only the code-only function package is uploaded.
+
+Packages are stored content-addressed (see artifacts), hence an unchanged package is never uploaded twice
+and a previous package can be redeployed with the rollback tool.
+
+A deploy is skipped entirely (a "no-op deploy") if the package is identical to the deployed code,
+which keeps warm containers of the current function version alive.
+
+If a CodeDeploy application and deployment group are given, the alias is not moved directly. Instead a CodeDeploy
+deployment shifts traffic to the new version progressively and rolls it back if monitored alarms fire.
+
+Container image functions are deployed by an image digest, which is compared with the deployed one in the same way.
+
+Usage:
+    python -m build_tools.deploy --function-name NAME --bucket BUCKET --artifact PATH [--commit SHA]
+        [--layer-source SITE_PACKAGES --runtime python3.6 --architecture x86_64]
+        [--prune RULE ...] [--strip] [--precompile] [--alias live]
+        [--deployment-application APP --deployment-group GROUP] [--version-file PATH]
+    python -m build_tools.deploy --function-name NAME --image-uri REPOSITORY@sha256:DIGEST [--alias live] ...
+"""
+import argparse
+import base64
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+from typing import Any, Callable, Dict, List, Optional
+
+from .artifacts import store_artifact, write_manifest
+from .aws_cli import AwsCli
+from .packager import build_archive, collect_entries
+from .slimming import Slimmer
+
+
+def code_sha256(path: str) -> str:
+    """
+    Calculates a hash of a deployment package in the same format as Lambda reports "CodeSha256".
+
+    :param path: Path to the deployment package.
+
+    :return: Base64 encoded sha256 hash.
+    """
+    digest = hashlib.sha256()
+
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b''):
+            digest.update(chunk)
+
+    return base64.b64encode(digest.digest()).decode()
+
+
+def should_deploy(artifact_sha256: str, configuration: Dict[str, Any], layer_arn: Optional[str] = None) -> bool:
+    """
+    Decides whether a package has to be deployed.
+
+    :param artifact_sha256: Base64 encoded sha256 hash of the package (see code_sha256).
+    :param configuration: Deployed function configuration as returned by "get-function-configuration".
+    :param layer_arn: Dependency layer, that the function should use. Optional.
+
+    :return: False, if the deployed function already runs the same code with the same dependency layer.
+    """
+    if configuration.get('CodeSha256') != artifact_sha256:
+        return True
+
+    if layer_arn is not None:
+        return layer_arn not in [layer['Arn'] for layer in configuration.get('Layers', [])]
+
+    return False
+
+
+def dependency_hash(site_packages: str, runtime: str, architecture: str = 'x86_64') -> str:
+    """
+    Calculates a hash of the resolved dependency set. Installed distributions are identified by their
+    metadata directories and RECORD files, which list every installed file together with its hash.
+
+    :param site_packages: Directory with installed dependencies.
+    :param runtime: Lambda runtime, e.g. "python3.6", since the same dependencies differ between runtimes.
+    :param architecture: Lambda architecture, since native dependencies differ between architectures.
+
+    :return: Hexadecimal sha256 hash.
+    """
+    digest = hashlib.sha256(f'{runtime}-{architecture}'.encode())
+
+    for name in sorted(os.listdir(site_packages)):
+        if not name.endswith(('.dist-info', '.egg-info')):
+            continue
+
+        digest.update(name.encode())
+        record = os.path.join(site_packages, name, 'RECORD')
+
+        if os.path.isfile(record):
+            with open(record, 'rb') as file:
+                digest.update(file.read())
+
+    return digest.hexdigest()
+
+
+def layer_name(function_name: str, deps_hash: str) -> str:
+    """
+    Creates a name of a dependency layer.
+
+    :param function_name: Name of the function the layer belongs to.
+    :param deps_hash: Hash of the resolved dependency set.
+
+    :return: Layer name.
+    """
+    return f'{function_name}-deps-{deps_hash[:16]}'
+
+
+def find_layer_version(client: Any, name: str) -> Optional[str]:
+    """
+    Finds the latest version of a layer.
+
+    :param client: AWS client (see AwsCli).
+    :param name: Layer name.
+
+    :return: Layer version ARN or None, if the layer has never been published.
+    """
+    versions = client.call('lambda', 'list-layer-versions', {'LayerName': name}).get('LayerVersions', [])
+
+    if not versions:
+        return None
+
+    return max(versions, key=lambda version: version['Version'])['LayerVersionArn']
+
+
+def wait_for_update(client: Any, function_name: str, sleep: Callable[[float], None] = time.sleep) -> None:
+    """
+    Waits until a previous update of a function completes, since Lambda rejects concurrent updates.
+
+    :param client: AWS client (see AwsCli).
+    :param function_name: Function name.
+    :param sleep: Sleep function.
+
+    :return: No return.
+    """
+    while True:
+        configuration = client.call('lambda', 'get-function-configuration', {'FunctionName': function_name})
+
+        if configuration.get('LastUpdateStatus') != 'InProgress':
+            return
+
+        sleep(2)
+
+
+def deploy_layer(
+        client: Any,
+        function_name: str,
+        site_packages: str,
+        runtime: str,
+        bucket: str,
+        level: int = 6,
+        slimmer: Optional[Slimmer] = None,
+        architecture: str = 'x86_64'
+) -> str:
+    """
+    Publishes a dependency layer if a layer for the current dependency set does not exist yet.
+
+    :param client: AWS client (see AwsCli).
+    :param function_name: Name of the function the layer belongs to.
+    :param site_packages: Directory with installed dependencies.
+    :param runtime: Lambda runtime, e.g. "python3.6".
+    :param bucket: S3 bucket to upload the layer package to.
+    :param level: Compression level of the layer package.
+    :param slimmer: Slimming to apply to the layer package. Optional.
+    :param architecture: Lambda architecture, e.g. "arm64".
+
+    :return: Layer version ARN.
+    """
+    deps_hash = dependency_hash(site_packages, runtime, architecture)
+    name = layer_name(function_name, deps_hash)
+
+    arn = find_layer_version(client, name)
+    if arn is not None:
+        print(f'Dependencies did not change, reusing layer {arn}.')
+        return arn
+
+    with tempfile.TemporaryDirectory() as directory:
+        archive = os.path.join(directory, 'layer.zip')
+        entries = collect_entries([site_packages], prefix='python')
+
+        if slimmer is not None:
+            entries, _ = slimmer.apply(entries, directory)
+
+        build_archive(archive, entries, level)
+
+        key = f'{function_name}-layers/{deps_hash}.zip'
+        client.copy(archive, f's3://{bucket}/{key}')
+
+    arn = client.call('lambda', 'publish-layer-version', {
+        'LayerName': name,
+        'Description': f'Dependencies of {function_name} ({deps_hash}).',
+        'Content': {'S3Bucket': bucket, 'S3Key': key},
+        'CompatibleRuntimes': [runtime],
+        'CompatibleArchitectures': [architecture],
+    })['LayerVersionArn']
+
+    print(f'Published dependency layer {arn}.')
+    return arn
+
+
+def deploy_function(
+        client: Any,
+        function_name: str,
+        bucket: str,
+        key: str,
+        layer_arn: Optional[str] = None
+) -> str:
+    """
+    Points a function to an uploaded package and publishes a new function version.
+
+    :param client: AWS client (see AwsCli).
+    :param function_name: Function name.
+    :param bucket: S3 bucket of the package.
+    :param key: S3 key of the package (see artifacts.store_artifact).
+    :param layer_arn: Dependency layer to attach to the function. Optional.
+
+    :return: Published function version.
+    """
+    if layer_arn is None:
+        return client.call('lambda', 'update-function-code', {
+            'FunctionName': function_name,
+            'S3Bucket': bucket,
+            'S3Key': key,
+            'Publish': True,
+        })['Version']
+
+    wait_for_update(client, function_name)
+    client.call('lambda', 'update-function-code', {
+        'FunctionName': function_name,
+        'S3Bucket': bucket,
+        'S3Key': key,
+    })
+
+    # Previous versions of the dependency layer are replaced. Layers, that were attached to the function
+    # by other means, are kept. The layer may be shared by several functions (see monorepo), hence
+    # its family is taken from the layer name rather than the function name.
+    family = ':layer:' + layer_arn.split(':layer:', 1)[1].split(':')[0].rsplit('-deps-', 1)[0] + '-deps-'
+
+    wait_for_update(client, function_name)
+    configuration = client.call('lambda', 'get-function-configuration', {'FunctionName': function_name})
+    layers: List[str] = [
+        layer['Arn'] for layer in configuration.get('Layers', [])
+        if family not in layer['Arn']
+    ]
+
+    client.call('lambda', 'update-function-configuration', {
+        'FunctionName': function_name,
+        'Layers': layers + [layer_arn],
+    })
+
+    wait_for_update(client, function_name)
+    return client.call('lambda', 'publish-version', {'FunctionName': function_name})['Version']
+
+
+def image_digest(image_uri: str) -> str:
+    """
+    Extracts a digest of an image in the same format as Lambda reports "CodeSha256" of container image functions.
+
+    :param image_uri: Image URI with a digest, e.g. "123.dkr.ecr.eu-west-1.amazonaws.com/repository@sha256:abc".
+
+    :return: Hexadecimal sha256 digest.
+    """
+    return image_uri.rsplit('@sha256:', 1)[1]
+
+
+def deploy_image(client: Any, function_name: str, image_uri: str) -> str:
+    """
+    Points a container image function to an image and publishes a new function version.
+
+    :param client: AWS client (see AwsCli).
+    :param function_name: Function name.
+    :param image_uri: Image URI with a digest.
+
+    :return: Published function version.
+    """
+    return client.call('lambda', 'update-function-code', {
+        'FunctionName': function_name,
+        'ImageUri': image_uri,
+        'Publish': True,
+    })['Version']
+
+
+def alias_version(client: Any, function_name: str, alias: str) -> str:
+    """
+    Reads the function version, that an alias points to.
+
+    :param client: AWS client (see AwsCli).
+    :param function_name: Function name.
+    :param alias: Alias name.
+
+    :return: Function version.
+    """
+    return client.call('lambda', 'get-alias', {'FunctionName': function_name, 'Name': alias})['FunctionVersion']
+
+
+def promote(client: Any, function_name: str, alias: str, version: str) -> None:
+    """
+    Points an alias to a function version.
+
+    :param client: AWS client (see AwsCli).
+    :param function_name: Function name.
+    :param alias: Alias name.
+    :param version: Function version.
+
+    :return: No return.
+    """
+    client.call('lambda', 'update-alias', {
+        'FunctionName': function_name,
+        'Name': alias,
+        'FunctionVersion': version,
+    })
+
+    print(f'Alias {alias} of {function_name} points to version {version}.')
+
+
+def shift_traffic(
+        client: Any,
+        function_name: str,
+        alias: str,
+        version: str,
+        application: str,
+        deployment_group: str,
+        sleep: Callable[[float], None] = time.sleep
+) -> None:
+    """
+    Shifts traffic of an alias to a function version with a CodeDeploy deployment and waits until it completes.
+
+    :param client: AWS client (see AwsCli).
+    :param function_name: Function name.
+    :param alias: Alias name.
+    :param version: Function version.
+    :param application: CodeDeploy application name.
+    :param deployment_group: CodeDeploy deployment group name.
+    :param sleep: Sleep function.
+
+    :return: No return.
+    """
+    current = client.call('lambda', 'get-alias', {'FunctionName': function_name, 'Name': alias})['FunctionVersion']
+
+    if current == version:
+        print(f'Alias {alias} of {function_name} already points to version {version}.')
+        return
+
+    appspec = json.dumps({
+        'version': 0.0,
+        'Resources': [{
+            function_name: {
+                'Type': 'AWS::Lambda::Function',
+                'Properties': {
+                    'Name': function_name,
+                    'Alias': alias,
+                    'CurrentVersion': current,
+                    'TargetVersion': version,
+                }
+            }
+        }]
+    })
+
+    deployment_id = client.call('deploy', 'create-deployment', {
+        'applicationName': application,
+        'deploymentGroupName': deployment_group,
+        'revision': {
+            'revisionType': 'AppSpecContent',
+            'appSpecContent': {
+                'content': appspec,
+                'sha256': hashlib.sha256(appspec.encode()).hexdigest(),
+            }
+        },
+        'description': f'Shift {function_name}:{alias} from version {current} to {version}.',
+    })['deploymentId']
+
+    print(f'Shifting traffic of {function_name}:{alias} from version {current} to {version} ({deployment_id}).')
+
+    while True:
+        deployment = client.call('deploy', 'get-deployment', {'deploymentId': deployment_id})['deploymentInfo']
+        status = deployment['status']
+
+        if status == 'Succeeded':
+            print(f'Alias {alias} of {function_name} points to version {version}.')
+            return
+
+        if status in ['Failed', 'Stopped']:
+            message = deployment.get('errorInformation', {}).get('message', 'no error information')
+            raise SystemExit(f'Deployment {deployment_id} {status.lower()} and was rolled back: {message}')
+
+        sleep(15)
+
+
+def main(args: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Deploys a packaged function to AWS Lambda.')
+    parser.add_argument('--function-name', required=True)
+    parser.add_argument('--bucket', default=None, help='S3 bucket for deployment packages.')
+    parser.add_argument('--artifact', default=None, help='Path to the function package.')
+    parser.add_argument('--commit', default=None, help='Source commit to record in the artifact manifest.')
+    parser.add_argument('--image-uri', default=None, help='Container image with a digest to deploy instead.')
+    parser.add_argument('--layer-source', default=None, help='Site-packages to deploy as a dependency layer.')
+    parser.add_argument('--runtime', default='python3.6')
+    parser.add_argument('--architecture', default='x86_64')
+    parser.add_argument('--level', type=int, default=6, help='Compression level of the layer package.')
+    parser.add_argument('--alias', default=None, help='Alias to move to the deployed version.')
+    parser.add_argument('--deployment-application', default=None, help='CodeDeploy application to shift traffic.')
+    parser.add_argument('--deployment-group', default=None, help='CodeDeploy deployment group to shift traffic.')
+    parser.add_argument('--version-file', default=None, help='File to write the deployed function version to.')
+    Slimmer.add_arguments(parser)
+    arguments = parser.parse_args(args)
+
+    if not arguments.image_uri and not (arguments.bucket and arguments.artifact):
+        parser.error('Either --image-uri or --bucket and --artifact are required.')
+
+    client = AwsCli()
+    layer_arn = None
+
+    if arguments.layer_source:
+        layer_arn = deploy_layer(
+            client,
+            arguments.function_name,
+            arguments.layer_source,
+            arguments.runtime,
+            arguments.bucket,
+            arguments.level,
+            Slimmer.from_arguments(arguments),
+            arguments.architecture
+        )
+
+    configuration = client.call('lambda', 'get-function-configuration', {'FunctionName': arguments.function_name})
+
+    key = None
+
+    if arguments.image_uri:
+        artifact_sha256 = image_digest(arguments.image_uri)
+    else:
+        artifact_sha256 = code_sha256(arguments.artifact)
+        # Stored even on a no-op deploy, so the deployed package stays referenced and does not expire.
+        key = store_artifact(client, arguments.bucket, arguments.artifact, artifact_sha256)
+
+        if arguments.commit:
+            write_manifest(client, arguments.bucket, arguments.function_name, arguments.commit, key, layer_arn)
+
+    if not should_deploy(artifact_sha256, configuration, layer_arn):
+        print(f'No-op deploy: {arguments.function_name} already runs this package.')
+
+        if not arguments.version_file and not arguments.alias:
+            return
+
+        # Publishing unchanged code returns the existing version, which later pipeline stages can refer to.
+        version = client.call('lambda', 'publish-version', {'FunctionName': arguments.function_name})['Version']
+    elif arguments.image_uri:
+        version = deploy_image(client, arguments.function_name, arguments.image_uri)
+
+        print(f'Deployed {arguments.function_name} version {version}.')
+    else:
+        version = deploy_function(
+            client,
+            arguments.function_name,
+            arguments.bucket,
+            key,
+            layer_arn
+        )
+
+        print(f'Deployed {arguments.function_name} version {version}.')
+
+    if arguments.version_file:
+        with open(arguments.version_file, 'w') as file:
+            file.write(version)
+
+    # A no-op deploy still moves the alias, if a previous build deployed the code, but failed to move it.
+    if arguments.alias and alias_version(client, arguments.function_name, arguments.alias) == version:
+        print(f'Alias {arguments.alias} already points to version {version}.')
+    elif arguments.alias and arguments.deployment_group:
+        shift_traffic(
+            client,
+            arguments.function_name,
+            arguments.alias,
+            version,
+            arguments.deployment_application,
+            arguments.deployment_group
+        )
+    elif arguments.alias:
+        promote(client, arguments.function_name, arguments.alias, version)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,216 @@
+"""
+Cold start import time gate.
+
+Extracts a packaged function, imports its handler module in a clean interpreter (no site-packages of the build)
+under "-X importtime", aggregates cumulative import cost per package and compares the total with a baseline
+stored in S3. The build fails if the import time regresses past the configured threshold.
+
+The report of a passed check becomes the baseline only once the package is deployed ("--store-baseline" after
+the deploy), so a package, that failed to deploy, does not move the baseline. "-X importtime" requires
+python 3.7 or later.
+
+Usage:
+    python -m build_tools.importtime --artifact PATH --module manage --bucket BUCKET --key-prefix PREFIX
+        [--layer-source SITE_PACKAGES] [--runs 3] [--max-regression 0.2] [--max-total-ms 1500]
+    python -m build_tools.importtime --store-baseline --bucket BUCKET --key-prefix PREFIX
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import zipfile
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from .aws_cli import AwsCli, AwsCliError
+
+IMPORT_TIME_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|\s+(\S+)\s*$')
+
+# Script executed in the clean interpreter. It prints the wall time of the import in milliseconds.
+IMPORT_SCRIPT = (
+    'import sys, time; sys.path[:0] = {paths!r}; start = time.perf_counter(); '
+    'import {module}; print((time.perf_counter() - start) * 1000)'
+)
+
+
+def parse_import_times(stderr: str) -> Dict[str, float]:
+    """
+    Parses "-X importtime" output.
+
+    :param stderr: Standard error of an interpreter run with "-X importtime".
+
+    :return: Top level package name mapped to its cumulative import time in milliseconds.
+    """
+    packages: Dict[str, float] = {}
+
+    for line in stderr.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+
+        if match:
+            # The first import of a package includes all of its submodules, hence it has the largest cumulative time.
+            package = match.group(3).split('.')[0]
+            packages[package] = max(packages.get(package, 0.0), int(match.group(2)) / 1000)
+
+    return packages
+
+
+def measure(paths: List[str], module: str) -> Tuple[float, Dict[str, float]]:
+    """
+    Imports a module in a clean interpreter.
+
+    :param paths: Directories to put on the module search path.
+    :param module: Module to import.
+
+    :return: Wall time of the import in milliseconds and cumulative import times per package.
+    """
+    result = subprocess.run(
+        [sys.executable, '-S', '-X', 'importtime', '-c', IMPORT_SCRIPT.format(paths=paths, module=module)],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True
+    )
+
+    if result.returncode != 0:
+        raise RuntimeError(f'Failed to import {module}:\n{result.stderr[-4000:]}')
+
+    return float(result.stdout.strip().splitlines()[-1]), parse_import_times(result.stderr)
+
+
+def create_report(paths: List[str], module: str, runs: int) -> Dict[str, Any]:
+    """
+    Measures import time several times and creates a report of median values.
+
+    :param paths: Directories to put on the module search path.
+    :param module: Module to import.
+    :param runs: Number of measurements.
+
+    :return: Report.
+    """
+    measurements = [measure(paths, module) for _ in range(runs)]
+    names = set(name for _, modules in measurements for name in modules)
+
+    return {
+        'module': module,
+        'runs': runs,
+        'total_ms': statistics.median(total for total, _ in measurements),
+        'modules_ms': {
+            name: statistics.median(modules.get(name, 0.0) for _, modules in measurements) for name in names
+        },
+    }
+
+
+def check_regression(
+        report: Dict[str, Any],
+        baseline: Optional[Dict[str, Any]],
+        max_regression: float,
+        max_total_ms: Optional[float] = None,
+        min_delta_ms: float = 20.0
+) -> Optional[str]:
+    """
+    Compares a report with a baseline.
+
+    :param report: Current report.
+    :param baseline: Report of the last successful build. Optional.
+    :param max_regression: Allowed relative increase of the total import time, e.g. 0.2 for 20%.
+    :param max_total_ms: Allowed absolute total import time. Optional.
+    :param min_delta_ms: Increases smaller than this are treated as noise.
+
+    :return: Failure reason or None, if the report passes.
+    """
+    total = report['total_ms']
+
+    if max_total_ms is not None and total > max_total_ms:
+        return f'Import time {total:.0f} ms exceeds the limit of {max_total_ms:.0f} ms.'
+
+    if baseline is not None:
+        previous = baseline['total_ms']
+
+        if total > previous * (1 + max_regression) and total - previous > min_delta_ms:
+            return f'Import time regressed from {previous:.0f} ms to {total:.0f} ms.'
+
+    return None
+
+
+def print_report(report: Dict[str, Any], baseline: Optional[Dict[str, Any]], limit: int = 20) -> None:
+    previous = baseline['modules_ms'] if baseline else {}
+
+    print(f'Import time of {report["module"]}: {report["total_ms"]:.1f} ms.')
+    for name, value in sorted(report['modules_ms'].items(), key=lambda item: -item[1])[:limit]:
+        delta = f'{value - previous[name]:+.1f} ms' if name in previous else 'new'
+        print(f'  {name:<40} {value:>9.1f} ms ({delta})')
+
+
+def load_baseline(client: Any, url: str) -> Optional[Dict[str, Any]]:
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'baseline.json')
+
+        try:
+            client.copy(url, path)
+        except AwsCliError:
+            return None
+
+        with open(path) as file:
+            return json.load(file)
+
+
+def store_report(client: Any, report: Dict[str, Any], url: str) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'report.json')
+
+        with open(path, 'w') as file:
+            json.dump(report, file, indent=2, sort_keys=True)
+
+        client.copy(path, url)
+
+
+def main(args: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Fails the build if import time of a function regresses.')
+    parser.add_argument('--artifact', default=None, help='Path to the function package.')
+    parser.add_argument('--module', default=None, help='Handler module to import.')
+    parser.add_argument('--bucket', required=True, help='S3 bucket for reports.')
+    parser.add_argument('--key-prefix', required=True, help='S3 key prefix for reports.')
+    parser.add_argument('--layer-source', default=None, help='Dependencies, that are deployed as a layer.')
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--max-regression', type=float, default=0.2)
+    parser.add_argument('--max-total-ms', type=float, default=None)
+    parser.add_argument('--store-baseline', action='store_true', help='Make the report of this commit the baseline.')
+    arguments = parser.parse_args(args)
+
+    client = AwsCli()
+    base_url = f's3://{arguments.bucket}/{arguments.key_prefix}'
+    commit = os.environ.get('CODEBUILD_RESOLVED_SOURCE_VERSION', 'latest')
+
+    if arguments.store_baseline:
+        client.copy(f'{base_url}/{commit}.json', f'{base_url}/baseline.json')
+        print(f'Import time report of {commit} is the new baseline.')
+        return
+
+    if not arguments.artifact or not arguments.module:
+        parser.error('--artifact and --module are required.')
+
+    # Older interpreters ignore "-X importtime", which would measure nothing and always pass.
+    if sys.version_info < (3, 7):
+        sys.exit(f'Import time gate requires python 3.7 or later, the build runs python {sys.version.split()[0]}.')
+
+    with tempfile.TemporaryDirectory() as directory:
+        with zipfile.ZipFile(arguments.artifact) as archive:
+            archive.extractall(directory)
+
+        paths = [directory] + ([arguments.layer_source] if arguments.layer_source else [])
+        report = create_report(paths, arguments.module, arguments.runs)
+
+    baseline = load_baseline(client, f'{base_url}/baseline.json')
+    print_report(report, baseline)
+    store_report(client, report, f'{base_url}/{commit}.json')
+
+    failure = check_regression(report, baseline, arguments.max_regression, arguments.max_total_ms)
+    if failure:
+        sys.exit(failure)
+
+
+if __name__ == '__main__':
+    main()
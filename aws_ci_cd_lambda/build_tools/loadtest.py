@@ -0,0 +1,310 @@
+"""
+Load test of a deployed function version.
+
+Replays sample events against a function version at a fixed concurrency and collects client side latency
+(round trip of an invocation) and server side latency (Duration and Billed Duration from the invocation log tail).
+The run fails if latency percentiles exceed budgets or regress against the previous passed run stored in S3.
+
+Invocations go through an invoker, hence the load driver can be run against a local stub:
+
+    class StubInvoker:
+        def invoke(self, payload: bytes) -> Invocation: ...
+
+Usage:
+    python -m build_tools.loadtest --function-name NAME --qualifier VERSION --events PATH
+        --bucket BUCKET --key-prefix PREFIX [--concurrency 10] [--invocations 200]
+        [--p50-budget-ms 100] [--p99-budget-ms 500] [--max-regression 0.2]
+"""
+import argparse
+import base64
+import json
+import math
+import os
+import re
+import tempfile
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from .aws_cli import AwsCli, AwsCliError
+
+DURATION = re.compile(r'\tDuration: ([\d.]+) ms')
+BILLED_DURATION = re.compile(r'Billed Duration: ([\d.]+) ms')
+
+# Metrics, that are compared with budgets and the baseline.
+METRICS = ['client', 'duration', 'billed']
+
+
+class Invocation(NamedTuple):
+    """
+    Outcome of a single invocation.
+    """
+    client_ms: float
+    duration_ms: Optional[float]
+    billed_ms: Optional[float]
+    error: Optional[str]
+
+
+class LambdaInvoker:
+    """
+    Invokes a function version with boto3, since a process per invocation (AWS CLI) would dominate client latency.
+    Boto3 is installed by the load test build or, to run it elsewhere, with the "tools" extra of this package.
+    """
+    def __init__(self, function_name: str, qualifier: str) -> None:
+        import boto3
+        from botocore.config import Config
+
+        self.__function_name = function_name
+        self.__qualifier = qualifier
+        self.__client = boto3.client('lambda', config=Config(max_pool_connections=100, retries={'max_attempts': 0}))
+
+    def invoke(self, payload: bytes) -> Invocation:
+        start = time.perf_counter()
+        response = self.__client.invoke(
+            FunctionName=self.__function_name,
+            Qualifier=self.__qualifier,
+            Payload=payload,
+            LogType='Tail'
+        )
+        response['Payload'].read()
+        client_ms = (time.perf_counter() - start) * 1000
+
+        log = base64.b64decode(response.get('LogResult', '')).decode(errors='replace')
+        duration = DURATION.search(log)
+        billed = BILLED_DURATION.search(log)
+
+        return Invocation(
+            client_ms,
+            float(duration.group(1)) if duration else None,
+            float(billed.group(1)) if billed else None,
+            response.get('FunctionError')
+        )
+
+
+def load_events(path: str) -> List[bytes]:
+    """
+    Loads sample events.
+
+    :param path: A JSON file with a list of events or a directory of JSON files with one event each.
+
+    :return: Serialized events.
+    """
+    if os.path.isdir(path):
+        names = sorted(name for name in os.listdir(path) if name.endswith('.json'))
+        events = []
+
+        for name in names:
+            with open(os.path.join(path, name)) as file:
+                events.append(json.load(file))
+    else:
+        with open(path) as file:
+            events = json.load(file)
+
+    assert events, f'No events found in {path}.'
+    return [json.dumps(event).encode() for event in events]
+
+
+def run(invoker: Any, events: List[bytes], concurrency: int, invocations: int) -> List[Invocation]:
+    """
+    Replays events round robin at a fixed concurrency.
+
+    :param invoker: Invoker with an "invoke(payload) -> Invocation" method.
+    :param events: Serialized events.
+    :param concurrency: Number of concurrent invocations.
+    :param invocations: Total number of invocations.
+
+    :return: Invocation outcomes.
+    """
+    def invoke(index: int) -> Invocation:
+        try:
+            return invoker.invoke(events[index % len(events)])
+        except Exception as error:
+            return Invocation(0.0, None, None, str(error))
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return list(executor.map(invoke, range(invocations)))
+
+
+def percentile(values: List[float], fraction: float) -> Optional[float]:
+    """
+    Calculates a percentile with the nearest rank method.
+
+    :param values: Values.
+    :param fraction: Percentile as a fraction, e.g. 0.99.
+
+    :return: Percentile or None, if there are no values.
+    """
+    if not values:
+        return None
+
+    ordered = sorted(values)
+    return ordered[max(math.ceil(fraction * len(ordered)) - 1, 0)]
+
+
+def summarize(invocations: List[Invocation]) -> Dict[str, Any]:
+    """
+    Summarizes invocation outcomes.
+
+    :param invocations: Invocation outcomes.
+
+    :return: Report with latency percentiles (milliseconds) of successful invocations and an error count.
+    """
+    succeeded = [invocation for invocation in invocations if invocation.error is None]
+    values = {
+        'client': [invocation.client_ms for invocation in succeeded],
+        'duration': [invocation.duration_ms for invocation in succeeded if invocation.duration_ms is not None],
+        'billed': [invocation.billed_ms for invocation in succeeded if invocation.billed_ms is not None],
+    }
+
+    report: Dict[str, Any] = {
+        'invocations': len(invocations),
+        'errors': len(invocations) - len(succeeded),
+        'error_samples': sorted({invocation.error for invocation in invocations if invocation.error})[:5],
+    }
+
+    for metric in METRICS:
+        report[metric] = {
+            'p50': percentile(values[metric], 0.5),
+            'p99': percentile(values[metric], 0.99),
+        }
+
+    return report
+
+
+def check(
+        report: Dict[str, Any],
+        baseline: Optional[Dict[str, Any]],
+        p50_budget_ms: Optional[float] = None,
+        p99_budget_ms: Optional[float] = None,
+        max_regression: Optional[float] = None,
+        max_error_rate: float = 0.0
+) -> List[str]:
+    """
+    Compares a report with budgets and a baseline.
+
+    :param report: Report of this run (see summarize).
+    :param baseline: Report of the previous passed run. Optional
+    :param p50_budget_ms: Maximum client side p50 latency. Optional
+    :param p99_budget_ms: Maximum client side p99 latency. Optional
+    :param max_regression: Maximum allowed growth of any percentile relative to the baseline, e.g. 0.2. Optional
+    :param max_error_rate: Maximum allowed fraction of failed invocations.
+
+    :return: Violations. Empty if the run passes.
+    """
+    violations = []
+
+    if report['errors'] > report['invocations'] * max_error_rate:
+        violations.append(f'{report["errors"]} of {report["invocations"]} invocations failed.')
+
+    for name, budget in [('p50', p50_budget_ms), ('p99', p99_budget_ms)]:
+        value = report['client'][name]
+
+        if budget is not None and value is not None and value > budget:
+            violations.append(f'Client {name} {value:.1f}ms exceeds the budget of {budget:.1f}ms.')
+
+    if baseline is not None and max_regression is not None:
+        for metric in METRICS:
+            for name in ['p50', 'p99']:
+                value = report[metric][name]
+                previous = baseline.get(metric, {}).get(name)
+
+                if value is not None and previous and value > previous * (1 + max_regression):
+                    violations.append(
+                        f'{metric.capitalize()} {name} {value:.1f}ms regressed by more than '
+                        f'{max_regression:.0%} from {previous:.1f}ms.'
+                    )
+
+    return violations
+
+
+def print_report(report: Dict[str, Any], baseline: Optional[Dict[str, Any]]) -> None:
+    print(f'Invocations: {report["invocations"]}, errors: {report["errors"]}.')
+
+    for sample in report['error_samples']:
+        print(f'  Error: {sample}')
+
+    for metric in METRICS:
+        for name in ['p50', 'p99']:
+            value = report[metric][name]
+            previous = (baseline or {}).get(metric, {}).get(name)
+
+            print(
+                f'{metric:>10} {name}: ' + (f'{value:9.1f}ms' if value is not None else '      n/a') +
+                (f' (previous {previous:.1f}ms)' if previous else '')
+            )
+
+
+def load_report(client: Any, url: str) -> Optional[Dict[str, Any]]:
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'report.json')
+
+        try:
+            client.copy(url, path)
+        except AwsCliError:
+            return None
+
+        with open(path) as file:
+            return json.load(file)
+
+
+def store_report(client: Any, report: Dict[str, Any], url: str) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'report.json')
+
+        with open(path, 'w') as file:
+            json.dump(report, file, indent=2, sort_keys=True)
+
+        client.copy(path, url)
+
+
+def main(args: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Load tests a deployed function version.')
+    parser.add_argument('--function-name', required=True)
+    parser.add_argument('--qualifier', required=True, help='Function version to invoke.')
+    parser.add_argument('--events', required=True, help='JSON file with a list of events or a directory of events.')
+    parser.add_argument('--bucket', required=True, help='S3 bucket to store results in.')
+    parser.add_argument('--key-prefix', required=True, help='S3 key prefix of results.')
+    parser.add_argument('--concurrency', type=int, default=10)
+    parser.add_argument('--invocations', type=int, default=200)
+    parser.add_argument('--p50-budget-ms', type=float, default=None)
+    parser.add_argument('--p99-budget-ms', type=float, default=None)
+    parser.add_argument('--max-regression', type=float, default=None)
+    parser.add_argument('--max-error-rate', type=float, default=0.0)
+    arguments = parser.parse_args(args)
+
+    client = AwsCli()
+    baseline_url = f's3://{arguments.bucket}/{arguments.key_prefix}/baseline.json'
+
+    invoker = LambdaInvoker(arguments.function_name, arguments.qualifier)
+    invocations = run(invoker, load_events(arguments.events), arguments.concurrency, arguments.invocations)
+
+    report = summarize(invocations)
+    report['function'] = arguments.function_name
+    report['version'] = arguments.qualifier
+    report['concurrency'] = arguments.concurrency
+
+    baseline = load_report(client, baseline_url)
+    print_report(report, baseline)
+
+    violations = check(
+        report,
+        baseline,
+        arguments.p50_budget_ms,
+        arguments.p99_budget_ms,
+        arguments.max_regression,
+        arguments.max_error_rate
+    )
+
+    report['violations'] = violations
+    store_report(client, report, f's3://{arguments.bucket}/{arguments.key_prefix}/{arguments.qualifier}.json')
+
+    if violations:
+        raise SystemExit('Load test failed:\n' + '\n'.join(violations))
+
+    # Only passed runs become the baseline, so a slow release can not lower the bar for the next one.
+    store_report(client, report, baseline_url)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,323 @@
+"""
+Builds and deploys many functions of a single repository in parallel.
+
+Functions, whose source paths changed since the last successfully deployed commit, are packaged and deployed.
+A change outside of every function source path (e.g. shared code, install.sh or requirements) rebuilds
+all functions. Dependencies are installed once for the whole repository: shared files are slimmed and
+compressed once and the compressed data is reused by every function package (or deployed once as a shared
+layer in layered mode). A per-function timing table is printed at the end of the build.
+
+Usage:
+    python -m build_tools.monorepo --bucket BUCKET --prefix PREFIX --function NAME=PATH [--function NAME=PATH ...]
+        [--site-packages PATH] [--shared PATH ...] [--layered --runtime python3.6 --architecture x86_64]
+        [--level 6] [--workers 4] [--parallel 4] [--alias live] [--prune RULE ...] [--strip] [--precompile]
+"""
+import argparse
+import json
+import os
+import subprocess
+import tempfile
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from .artifacts import store_artifact, write_manifest
+from .aws_cli import AwsCli, AwsCliError
+from .deploy import alias_version, code_sha256, deploy_function, deploy_layer, promote, should_deploy
+from .packager import CompressedEntry, Entry, build_archive, collect_entries
+from .slimming import Slimmer
+
+
+class FunctionResult(NamedTuple):
+    """
+    Outcome of building and deploying a single function.
+    """
+    name: str
+    status: str
+    size: int
+    package_seconds: float
+    deploy_seconds: float
+
+
+def parse_functions(values: List[str]) -> Dict[str, str]:
+    """
+    Parses function definitions.
+
+    :param values: Definitions in a form of "NAME=PATH".
+
+    :return: Function name mapped to its normalized source path.
+    """
+    functions = {}
+
+    for value in values:
+        name, path = value.split('=', 1)
+        functions[name] = os.path.normpath(path).replace(os.sep, '/')
+
+    return functions
+
+
+def changed_functions(functions: Dict[str, str], changed_files: Optional[List[str]]) -> List[str]:
+    """
+    Decides which functions have to be rebuilt.
+
+    :param functions: Function name mapped to its source path.
+    :param changed_files: Paths of changed files relative to the repository root.
+    None means the changes are unknown (e.g. the first build).
+
+    :return: Sorted names of functions to rebuild.
+    """
+    if changed_files is None:
+        return sorted(functions)
+
+    changed = set()
+
+    for path in changed_files:
+        owners = [name for name, source in functions.items() if path == source or path.startswith(source + '/')]
+
+        # A file, that belongs to no function, may be used by any of them.
+        if not owners:
+            return sorted(functions)
+
+        changed.update(owners)
+
+    return sorted(changed)
+
+
+def git(*args: str) -> Optional[str]:
+    result = subprocess.run(['git'] + list(args), stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def changed_files_since(commit: Optional[str]) -> Optional[List[str]]:
+    """
+    Lists files changed between a commit and the checked out one.
+
+    :param commit: Last deployed commit. Optional
+
+    :return: Changed paths or None, if the commit is unknown or the source has no git history.
+    """
+    if commit is None or git('cat-file', '-e', f'{commit}^{{commit}}') is None:
+        return None
+
+    diff = git('diff', '--name-only', commit, 'HEAD')
+    return None if diff is None else [line for line in diff.splitlines() if line]
+
+
+def load_state(client: Any, url: str) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'state.json')
+
+        try:
+            client.copy(url, path)
+        except AwsCliError:
+            return {}
+
+        with open(path) as file:
+            return json.load(file)
+
+
+def store_state(client: Any, state: Dict[str, Any], url: str) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'state.json')
+
+        with open(path, 'w') as file:
+            json.dump(state, file, indent=2, sort_keys=True)
+
+        client.copy(path, url)
+
+
+def merge_entries(*groups: List[Entry]) -> List[Entry]:
+    """
+    Merges entry lists. If the same archive name exists in several lists, the entry from the latest list wins.
+
+    :param groups: Entry lists.
+
+    :return: Entries sorted by their archive names.
+    """
+    entries = {entry.arcname: entry for group in groups for entry in group}
+    return [entries[arcname] for arcname in sorted(entries)]
+
+
+def build_and_deploy(
+        client: Any,
+        name: str,
+        function_name: str,
+        source: str,
+        shared_entries: List[Entry],
+        cache: Dict[str, CompressedEntry],
+        bucket: str,
+        level: int,
+        workers: Optional[int],
+        slimmer: Slimmer,
+        layer_arn: Optional[str],
+        alias: Optional[str],
+        commit: Optional[str] = None
+) -> FunctionResult:
+    """
+    Packages a single function together with shared files and deploys it, unless the package is already deployed.
+
+    :param client: AWS client (see AwsCli).
+    :param name: Function name as defined in the repository.
+    :param function_name: Lambda function name.
+    :param source: Source path of the function.
+    :param shared_entries: Slimmed entries of dependencies and shared code.
+    :param cache: Compressed shared files, filled by the first package that compresses them.
+    :param bucket: S3 bucket for deployment packages.
+    :param level: Compression level.
+    :param workers: Number of compression threads.
+    :param slimmer: Slimming to apply to the function sources.
+    :param layer_arn: Shared dependency layer. Optional
+    :param alias: Alias to move to the deployed version. Optional
+    :param commit: Source commit to record in the artifact manifest. Optional
+
+    :return: Build and deploy outcome.
+    """
+    start = time.time()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        entries, _ = slimmer.apply(collect_entries([source]), work_dir)
+        artifact = os.path.join(work_dir, f'{name}.zip')
+        size = build_archive(artifact, merge_entries(shared_entries, entries), level, workers, cache)
+        package_seconds = time.time() - start
+
+        start = time.time()
+        configuration = client.call('lambda', 'get-function-configuration', {'FunctionName': function_name})
+
+        artifact_sha256 = code_sha256(artifact)
+        key = store_artifact(client, bucket, artifact, artifact_sha256)
+
+        if commit:
+            write_manifest(client, bucket, function_name, commit, key, layer_arn)
+
+        if not should_deploy(artifact_sha256, configuration, layer_arn):
+            if not alias:
+                return FunctionResult(name, 'no-op', size, package_seconds, time.time() - start)
+
+            # A previous build may have deployed the code, but failed to move the alias.
+            version = client.call('lambda', 'publish-version', {'FunctionName': function_name})['Version']
+
+            if alias_version(client, function_name, alias) == version:
+                return FunctionResult(name, 'no-op', size, package_seconds, time.time() - start)
+
+            promote(client, function_name, alias, version)
+            return FunctionResult(name, f'promoted v{version}', size, package_seconds, time.time() - start)
+
+        version = deploy_function(client, function_name, bucket, key, layer_arn)
+
+    if alias:
+        promote(client, function_name, alias, version)
+
+    return FunctionResult(name, f'deployed v{version}', size, package_seconds, time.time() - start)
+
+
+def print_timings(results: List[FunctionResult], skipped: List[str]) -> None:
+    print(f'{"Function":<40} {"Status":<20} {"Size, KiB":>10} {"Package, s":>11} {"Deploy, s":>10}')
+
+    for result in sorted(results):
+        print(
+            f'{result.name:<40} {result.status:<20} {result.size // 1024:>10} '
+            f'{result.package_seconds:>11.2f} {result.deploy_seconds:>10.2f}'
+        )
+
+    for name in skipped:
+        print(f'{name:<40} {"unchanged":<20}')
+
+
+def main(args: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Builds and deploys changed functions of a repository in parallel.')
+    parser.add_argument('--bucket', required=True, help='S3 bucket for deployment packages and build state.')
+    parser.add_argument('--prefix', required=True, help='Prefix of Lambda function names.')
+    parser.add_argument('--function', action='append', required=True, help='Function as NAME=PATH.')
+    parser.add_argument('--site-packages', default=None, help='Dependencies shared by all functions.')
+    parser.add_argument('--shared', action='append', default=[], help='Code directory shared by all functions.')
+    parser.add_argument('--layered', action='store_true', help='Deploy dependencies as a shared layer.')
+    parser.add_argument('--runtime', default='python3.6')
+    parser.add_argument('--architecture', default='x86_64')
+    parser.add_argument('--level', type=int, default=6, choices=range(0, 10), help='Compression level.')
+    parser.add_argument('--workers', type=int, default=None, help='Number of compression threads per package.')
+    parser.add_argument('--parallel', type=int, default=4, help='Number of functions built at the same time.')
+    parser.add_argument('--alias', default=None, help='Alias to move to deployed versions.')
+    Slimmer.add_arguments(parser)
+    arguments = parser.parse_args(args)
+
+    client = AwsCli()
+    slimmer = Slimmer.from_arguments(arguments)
+    functions = parse_functions(arguments.function)
+    state_url = f's3://{arguments.bucket}/{arguments.prefix}-monorepo/state.json'
+
+    head = git('rev-parse', 'HEAD')
+    changed_files = changed_files_since(load_state(client, state_url).get('commit'))
+    selected = changed_functions(functions, changed_files)
+    skipped = [name for name in sorted(functions) if name not in selected]
+
+    if changed_files is None:
+        print('Last deployed commit is unknown, building all functions.')
+
+    print(f'Building {len(selected)} of {len(functions)} functions: {", ".join(selected) or "none"}.')
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        layer_arn = None
+        shared_sources = list(arguments.shared)
+
+        if arguments.site_packages and arguments.layered:
+            layer_arn = deploy_layer(
+                client,
+                arguments.prefix,
+                arguments.site_packages,
+                arguments.runtime,
+                arguments.bucket,
+                arguments.level,
+                slimmer,
+                arguments.architecture
+            ) if selected else None
+        elif arguments.site_packages:
+            shared_sources.insert(0, arguments.site_packages)
+
+        # Shared files are slimmed once and compressed once (by whichever package gets to them first).
+        shared_entries, _ = slimmer.apply(collect_entries(shared_sources), work_dir)
+        cache: Dict[str, CompressedEntry] = {}
+
+        with ThreadPoolExecutor(max_workers=max(arguments.parallel, 1)) as executor:
+            futures = [
+                (name, executor.submit(
+                    build_and_deploy,
+                    client,
+                    name,
+                    arguments.prefix + name,
+                    functions[name],
+                    shared_entries,
+                    cache,
+                    arguments.bucket,
+                    arguments.level,
+                    arguments.workers,
+                    slimmer,
+                    layer_arn,
+                    arguments.alias,
+                    head
+                ))
+                for name in selected
+            ]
+
+            results = []
+            failures = []
+
+            for name, future in futures:
+                try:
+                    results.append(future.result())
+                except Exception as error:
+                    failures.append(name)
+                    print(f'Failed to build or deploy {name}: {error}')
+
+    print_timings(results, skipped)
+
+    if failures:
+        raise SystemExit(f'Failed functions: {", ".join(failures)}.')
+
+    # The next build diffs against this commit, hence failed builds are retried with the same changes.
+    if head is not None:
+        store_state(client, {'commit': head}, state_url)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,321 @@
+"""
+Streaming, deterministic zip packager for Lambda deployment packages.
+
+Files are read straight from the given source directories (no staging copies), compressed in parallel
+and written in a sorted order with a fixed timestamp, so identical inputs produce byte-identical archives.
+
+Usage:
+    python -m build_tools.packager --output pack.zip [--level 6] [--workers 4]
+        [--prune RULE ...] [--strip] [--precompile] [--report report.json] SOURCE [SOURCE ...]
+"""
+import argparse
+import os
+import stat
+import struct
+import tempfile
+import time
+import zlib
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Deque, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from .slimming import Slimmer, print_report, size_report, write_report
+
+# Directories that never belong to a deployment package.
+DEFAULT_EXCLUDE = ['.git']
+
+# Every entry gets 1980-01-01 00:00:00, the earliest timestamp a zip entry can hold.
+DOS_TIME = 0
+DOS_DATE = (1 << 5) | 1
+
+ZIP_STORED = 0
+ZIP_DEFLATED = 8
+
+# "Version made by" is UNIX (3) and zip specification 2.0, which is enough for deflate.
+VERSION_MADE_BY = (3 << 8) | 20
+VERSION_NEEDED = 20
+UTF8_FLAG = 0x800
+
+ZIP64_LIMIT = 0xFFFFFFFF
+ZIP64_COUNT_LIMIT = 0xFFFF
+
+
+class Entry(NamedTuple):
+    """
+    A single file to be written to an archive.
+    """
+    arcname: str
+    path: str
+    executable: bool
+
+
+class CompressedEntry(NamedTuple):
+    """
+    A compressed file, ready to be written to an archive.
+    """
+    crc: int
+    size: int
+    method: int
+    data: bytes
+
+
+def collect_entries(
+        sources: Iterable[str],
+        prefix: str = '',
+        exclude: Optional[List[str]] = None
+) -> List[Entry]:
+    """
+    Walks source directories and collects files to be archived.
+    If the same archive name exists in several sources, the file from the latest source wins.
+
+    :param sources: Directories whose contents should be placed to the root of the archive.
+    :param prefix: Directory inside the archive to which all files are placed.
+    :param exclude: File or directory names which should not be archived.
+
+    :return: Entries sorted by their archive names.
+    """
+    exclude = set(DEFAULT_EXCLUDE if exclude is None else exclude)
+    prefix = prefix.strip('/')
+    entries: Dict[str, Entry] = {}
+
+    for source in sources:
+        for root, dirs, files in os.walk(source, followlinks=True):
+            dirs[:] = [name for name in dirs if name not in exclude]
+
+            for name in files:
+                if name in exclude:
+                    continue
+
+                path = os.path.join(root, name)
+                arcname = os.path.relpath(path, source).replace(os.sep, '/')
+
+                if prefix:
+                    arcname = prefix + '/' + arcname
+
+                mode = os.stat(path).st_mode
+                entries[arcname] = Entry(arcname, path, bool(mode & stat.S_IXUSR))
+
+    return [entries[arcname] for arcname in sorted(entries)]
+
+
+def compress(data: bytes, level: int) -> CompressedEntry:
+    """
+    Compresses file contents with raw deflate. Data is stored as is if compression does not help.
+
+    :param data: File contents.
+    :param level: Compression level from 0 (store) to 9 (best).
+
+    :return: Compressed entry.
+    """
+    crc = zlib.crc32(data) & 0xFFFFFFFF
+
+    if level > 0:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+        compressed = compressor.compress(data) + compressor.flush()
+
+        if len(compressed) < len(data):
+            return CompressedEntry(crc, len(data), ZIP_DEFLATED, compressed)
+
+    return CompressedEntry(crc, len(data), ZIP_STORED, data)
+
+
+def compress_file(
+        entry: Entry,
+        level: int,
+        cache: Optional[Dict[str, CompressedEntry]] = None
+) -> CompressedEntry:
+    """
+    Reads and compresses a single file. Zlib releases the GIL, hence this can run in a thread pool.
+
+    :param entry: File to compress.
+    :param level: Compression level from 0 (store) to 9 (best).
+    :param cache: Compressed files by their paths, shared between archives with common files. Optional.
+
+    :return: Compressed entry.
+    """
+    if cache is not None and entry.path in cache:
+        return cache[entry.path]
+
+    with open(entry.path, 'rb') as file:
+        compressed = compress(file.read(), level)
+
+    if cache is not None:
+        cache[entry.path] = compressed
+
+    return compressed
+
+
+class ZipWriter:
+    """
+    Minimal zip writer that accepts already compressed entries.
+    """
+    def __init__(self, file) -> None:
+        """
+        Constructor.
+
+        :param file: Binary file object to write the archive to.
+        """
+        self.__file = file
+        self.__central_directory: List[bytes] = []
+        self.__offset = 0
+
+    def write(self, arcname: str, executable: bool, entry: CompressedEntry) -> None:
+        """
+        Writes a local file header followed by compressed data.
+
+        :param arcname: Name of the file in the archive.
+        :param executable: Whether the file should keep an executable bit.
+        :param entry: Compressed file.
+
+        :return: No return.
+        """
+        if entry.size > ZIP64_LIMIT or len(entry.data) > ZIP64_LIMIT or self.__offset > ZIP64_LIMIT:
+            raise ValueError(f'Archive is too large to hold {arcname}.')
+
+        try:
+            name = arcname.encode('ascii')
+            flags = 0
+        except UnicodeEncodeError:
+            name = arcname.encode('utf-8')
+            flags = UTF8_FLAG
+
+        header = struct.pack(
+            '<IHHHHHIIIHH',
+            0x04034b50,
+            VERSION_NEEDED,
+            flags,
+            entry.method,
+            DOS_TIME,
+            DOS_DATE,
+            entry.crc,
+            len(entry.data),
+            entry.size,
+            len(name),
+            0
+        )
+
+        permissions = 0o755 if executable else 0o644
+
+        self.__central_directory.append(struct.pack(
+            '<IHHHHHHIIIHHHHHII',
+            0x02014b50,
+            VERSION_MADE_BY,
+            VERSION_NEEDED,
+            flags,
+            entry.method,
+            DOS_TIME,
+            DOS_DATE,
+            entry.crc,
+            len(entry.data),
+            entry.size,
+            len(name),
+            0,
+            0,
+            0,
+            0,
+            (stat.S_IFREG | permissions) << 16,
+            self.__offset
+        ) + name)
+
+        self.__file.write(header)
+        self.__file.write(name)
+        self.__file.write(entry.data)
+        self.__offset += len(header) + len(name) + len(entry.data)
+
+    def close(self) -> None:
+        """
+        Writes the central directory and the end of central directory records.
+
+        :return: No return.
+        """
+        start = self.__offset
+        size = sum(len(record) for record in self.__central_directory)
+        count = len(self.__central_directory)
+
+        for record in self.__central_directory:
+            self.__file.write(record)
+
+        if count > ZIP64_COUNT_LIMIT or start + size > ZIP64_LIMIT:
+            end = start + size
+            self.__file.write(struct.pack(
+                '<IQHHIIQQQQ', 0x06064b50, 44, VERSION_MADE_BY, 45, 0, 0, count, count, size, start
+            ))
+            self.__file.write(struct.pack('<IIQI', 0x07064b50, 0, end, 1))
+            count, size, start = ZIP64_COUNT_LIMIT, min(size, ZIP64_LIMIT), min(start, ZIP64_LIMIT)
+
+        self.__file.write(struct.pack('<IHHHHIIH', 0x06054b50, 0, 0, count, count, size, start, 0))
+
+
+def build_archive(
+        output: str,
+        entries: List[Entry],
+        level: int = 6,
+        workers: Optional[int] = None,
+        cache: Optional[Dict[str, CompressedEntry]] = None
+) -> int:
+    """
+    Compresses entries in parallel and streams them into a zip archive in the given order.
+
+    :param output: Path of the archive to create.
+    :param entries: Files to archive.
+    :param level: Compression level from 0 (store) to 9 (best).
+    :param workers: Number of compression threads. Defaults to the number of CPU cores.
+    :param cache: Compressed files by their paths, shared between archives with common files. Optional.
+
+    :return: Size of the created archive in bytes.
+    """
+    workers = workers or os.cpu_count() or 1
+
+    # Only a bounded number of compressed files is kept in memory at once.
+    window = workers * 4
+
+    with open(output, 'wb') as file, ThreadPoolExecutor(max_workers=workers) as executor:
+        writer = ZipWriter(file)
+        pending: Deque[Tuple[Entry, object]] = deque()
+
+        for entry in entries:
+            pending.append((entry, executor.submit(compress_file, entry, level, cache)))
+
+            if len(pending) >= window:
+                done, future = pending.popleft()
+                writer.write(done.arcname, done.executable, future.result())
+
+        while pending:
+            done, future = pending.popleft()
+            writer.write(done.arcname, done.executable, future.result())
+
+        writer.close()
+
+        return file.tell()
+
+
+def main(args: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Packages source directories into a deterministic zip archive.')
+    parser.add_argument('sources', nargs='+', help='Directories whose contents are placed to the archive root.')
+    parser.add_argument('--output', required=True, help='Path of the archive to create.')
+    parser.add_argument('--level', type=int, default=6, choices=range(0, 10), help='Compression level.')
+    parser.add_argument('--workers', type=int, default=None, help='Number of compression threads.')
+    parser.add_argument('--prefix', default='', help='Directory inside the archive to place files to.')
+    parser.add_argument('--exclude', action='append', default=None, help='File or directory name to skip.')
+    parser.add_argument('--report', default=None, help='Path of a JSON size report to write.')
+    Slimmer.add_arguments(parser)
+    arguments = parser.parse_args(args)
+
+    start = time.time()
+    entries = collect_entries(arguments.sources, arguments.prefix, arguments.exclude)
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        entries, pruned = Slimmer.from_arguments(arguments).apply(entries, work_dir)
+        size = build_archive(arguments.output, entries, arguments.level, arguments.workers)
+        report = size_report(entries, pruned)
+
+    print(f'Packaged {len(entries)} files into {arguments.output} ({size} bytes) in {time.time() - start:.2f}s.')
+    print_report(report)
+
+    if arguments.report:
+        write_report(arguments.report, report)
+
+
+if __name__ == '__main__':
+    main()
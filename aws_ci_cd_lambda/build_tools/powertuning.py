@@ -0,0 +1,255 @@
+"""
+Memory power tuning.
+
+Runs a function at a range of memory sizes against sample events, measures its duration and computes
+the cost per invocation, then prints a speed/cost curve and recommends a memory size for a strategy:
+"fastest", "cheapest" or "balanced" (a weighted mix of normalized duration and cost).
+
+Every memory size is published as a temporary function version, so callers of published versions and aliases
+are not affected. The original memory size is restored and temporary versions are deleted afterwards.
+With "--apply" the recommended memory size is set on the function. Note, that the next deploy of your
+CDK stack sets lambda_memory of LambdaParameters again, hence update it there to keep the result.
+
+The sweep takes a tuner with "prepare(memory) / invoke(payload) / cleanup()" methods, hence the sweep
+and the cost model can be run offline against a stub.
+
+Invocations go through boto3, install it with the "tools" extra: pip install aws_ci_cd_lambda[tools]
+
+Usage:
+    python -m aws_ci_cd_lambda.build_tools.powertuning --function-name NAME --events PATH
+        [--memory 128 256 512 1024 1536 2048 3008] [--invocations 20] [--concurrency 5]
+        [--strategy balanced] [--balanced-weight 0.5] [--architecture x86_64] [--output report.json] [--apply]
+"""
+import argparse
+import json
+import statistics
+import time
+
+from typing import Any, Callable, List, NamedTuple, Optional
+
+from .aws_cli import AwsCli
+from .deploy import wait_for_update
+from .loadtest import LambdaInvoker, load_events, run
+
+# On-demand prices in us-east-1 (USD). Other regions differ slightly, which does not change the curve's shape.
+PRICE_PER_GB_SECOND = {
+    'x86_64': 0.0000166667,
+    'arm64': 0.0000133334,
+}
+PRICE_PER_REQUEST = 0.0000002
+
+DEFAULT_MEMORY_SIZES = [128, 256, 512, 1024, 1536, 2048, 3008]
+STRATEGIES = ['fastest', 'cheapest', 'balanced']
+
+
+class PowerPoint(NamedTuple):
+    """
+    Measurements of a single memory size.
+    """
+    memory: int
+    duration_ms: float
+    billed_ms: float
+    cost: float
+    errors: int
+
+
+def invocation_cost(memory: int, billed_ms: float, architecture: str = 'x86_64') -> float:
+    """
+    Computes the cost of a single invocation.
+
+    :param memory: Memory size in megabytes.
+    :param billed_ms: Billed duration in milliseconds.
+    :param architecture: Function architecture, "x86_64" or "arm64".
+
+    :return: Cost in USD.
+    """
+    return memory / 1024 * billed_ms / 1000 * PRICE_PER_GB_SECOND[architecture] + PRICE_PER_REQUEST
+
+
+def sweep(
+        tuner: Any,
+        memory_sizes: List[int],
+        events: List[bytes],
+        invocations: int,
+        concurrency: int = 1,
+        architecture: str = 'x86_64'
+) -> List[PowerPoint]:
+    """
+    Measures duration and cost at every memory size.
+
+    :param tuner: Tuner with "prepare(memory)", "invoke(payload) -> Invocation" and "cleanup()" methods.
+    :param memory_sizes: Memory sizes in megabytes.
+    :param events: Serialized sample events.
+    :param invocations: Number of measured invocations per memory size.
+    :param concurrency: Number of concurrent invocations.
+    :param architecture: Function architecture, "x86_64" or "arm64".
+
+    :return: Measurements sorted by memory size.
+    """
+    points = []
+
+    try:
+        for memory in sorted(memory_sizes):
+            tuner.prepare(memory)
+
+            # Cold starts are not representative of the steady state, hence the first invocations are discarded.
+            run(tuner, events, concurrency, concurrency)
+            results = run(tuner, events, concurrency, invocations)
+            succeeded = [result for result in results if result.error is None and result.billed_ms is not None]
+
+            if not succeeded:
+                points.append(PowerPoint(memory, float('inf'), float('inf'), float('inf'), len(results)))
+                continue
+
+            billed_ms = statistics.mean(result.billed_ms for result in succeeded)
+
+            points.append(PowerPoint(
+                memory,
+                statistics.mean(result.duration_ms for result in succeeded),
+                billed_ms,
+                invocation_cost(memory, billed_ms, architecture),
+                len(results) - len(succeeded)
+            ))
+    finally:
+        tuner.cleanup()
+
+    return points
+
+
+def recommend(points: List[PowerPoint], strategy: str, balanced_weight: float = 0.5) -> PowerPoint:
+    """
+    Picks the best memory size for a strategy. Memory sizes with failed invocations are never recommended.
+
+    :param points: Measurements.
+    :param strategy: "fastest", "cheapest" or "balanced".
+    :param balanced_weight: Weight of duration in the balanced strategy (1 - weight is the weight of cost).
+
+    :return: The best measurement.
+    """
+    candidates = [point for point in points if point.errors == 0] or points
+
+    if strategy == 'fastest':
+        return min(candidates, key=lambda point: (point.duration_ms, point.cost))
+
+    if strategy == 'cheapest':
+        return min(candidates, key=lambda point: (point.cost, point.duration_ms))
+
+    fastest = min(point.duration_ms for point in candidates)
+    cheapest = min(point.cost for point in candidates)
+
+    return min(candidates, key=lambda point: (
+        balanced_weight * point.duration_ms / fastest + (1 - balanced_weight) * point.cost / cheapest,
+        point.memory
+    ))
+
+
+def print_curve(points: List[PowerPoint], best: PowerPoint) -> None:
+    print(f'{"Memory, MB":>10} {"Duration, ms":>13} {"Billed, ms":>11} {"Cost per 1M, USD":>17} {"Errors":>7}')
+
+    for point in points:
+        marker = '  <-' if point == best else ''
+        print(
+            f'{point.memory:>10} {point.duration_ms:>13.1f} {point.billed_ms:>11.1f} '
+            f'{point.cost * 1000000:>17.4f} {point.errors:>7}{marker}'
+        )
+
+
+class LambdaTuner:
+    """
+    Publishes a temporary function version for every memory size and invokes it.
+    """
+    def __init__(self, client: Any, function_name: str, sleep: Callable[[float], None] = time.sleep) -> None:
+        self.__client = client
+        self.__function_name = function_name
+        self.__sleep = sleep
+        self.__versions: List[str] = []
+        self.__invoker: Optional[LambdaInvoker] = None
+        self.__original_memory = client.call(
+            'lambda', 'get-function-configuration', {'FunctionName': function_name}
+        )['MemorySize']
+
+    def prepare(self, memory: int) -> None:
+        self.__set_memory(memory)
+
+        description = f'Power tuning {memory} MB.'
+        version = self.__client.call('lambda', 'publish-version', {
+            'FunctionName': self.__function_name,
+            'Description': description,
+        })
+
+        # Lambda returns an existing version if nothing changed since it was published. It is not ours to delete.
+        if version['Description'] == description:
+            self.__versions.append(version['Version'])
+
+        self.__invoker = LambdaInvoker(self.__function_name, version['Version'])
+
+    def invoke(self, payload: bytes) -> Any:
+        return self.__invoker.invoke(payload)
+
+    def cleanup(self) -> None:
+        self.__set_memory(self.__original_memory)
+
+        for version in self.__versions:
+            self.__client.call('lambda', 'delete-function', {
+                'FunctionName': self.__function_name,
+                'Qualifier': version,
+            })
+
+    def __set_memory(self, memory: int) -> None:
+        wait_for_update(self.__client, self.__function_name, self.__sleep)
+        self.__client.call('lambda', 'update-function-configuration', {
+            'FunctionName': self.__function_name,
+            'MemorySize': memory,
+        })
+        wait_for_update(self.__client, self.__function_name, self.__sleep)
+
+
+def main(args: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Finds the optimal memory size of a function.')
+    parser.add_argument('--function-name', required=True)
+    parser.add_argument('--events', required=True, help='JSON file with a list of events or a directory of events.')
+    parser.add_argument('--memory', type=int, nargs='+', default=DEFAULT_MEMORY_SIZES, help='Memory sizes to try.')
+    parser.add_argument('--invocations', type=int, default=20, help='Measured invocations per memory size.')
+    parser.add_argument('--concurrency', type=int, default=5)
+    parser.add_argument('--strategy', default='balanced', choices=STRATEGIES)
+    parser.add_argument('--balanced-weight', type=float, default=0.5, help='Weight of speed in the balanced strategy.')
+    parser.add_argument('--architecture', default='x86_64', choices=sorted(PRICE_PER_GB_SECOND))
+    parser.add_argument('--output', default=None, help='Path of a JSON report to write.')
+    parser.add_argument('--apply', action='store_true', help='Set the recommended memory size on the function.')
+    arguments = parser.parse_args(args)
+
+    client = AwsCli()
+    points = sweep(
+        LambdaTuner(client, arguments.function_name),
+        arguments.memory,
+        load_events(arguments.events),
+        arguments.invocations,
+        arguments.concurrency,
+        arguments.architecture
+    )
+
+    best = recommend(points, arguments.strategy, arguments.balanced_weight)
+    print_curve(points, best)
+    print(f'Recommended memory size ({arguments.strategy}): {best.memory} MB.')
+
+    if arguments.output:
+        with open(arguments.output, 'w') as file:
+            json.dump({
+                'function': arguments.function_name,
+                'strategy': arguments.strategy,
+                'recommended_memory': best.memory,
+                'points': [point._asdict() for point in points],
+            }, file, indent=2)
+
+    if arguments.apply:
+        wait_for_update(client, arguments.function_name)
+        client.call('lambda', 'update-function-configuration', {
+            'FunctionName': arguments.function_name,
+            'MemorySize': best.memory,
+        })
+        print(f'Memory size of {arguments.function_name} set to {best.memory} MB. '
+              f'Set lambda_memory in LambdaParameters to keep it after the next stack deploy.')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+"""
+Points the alias of a function to an already published version, e.g. after the version passed a load test.
+
+Usage:
+    python -m build_tools.promote --function-name NAME --alias live --version VERSION
+        [--deployment-application APP --deployment-group GROUP]
+"""
+import argparse
+
+from typing import List, Optional
+
+from .aws_cli import AwsCli
+from .deploy import promote, shift_traffic
+
+
+def main(args: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Points a function alias to a published version.')
+    parser.add_argument('--function-name', required=True)
+    parser.add_argument('--alias', required=True)
+    parser.add_argument('--version', required=True)
+    parser.add_argument('--deployment-application', default=None, help='CodeDeploy application to shift traffic.')
+    parser.add_argument('--deployment-group', default=None, help='CodeDeploy deployment group to shift traffic.')
+    arguments = parser.parse_args(args)
+
+    client = AwsCli()
+
+    if arguments.deployment_group:
+        shift_traffic(
+            client,
+            arguments.function_name,
+            arguments.alias,
+            arguments.version,
+            arguments.deployment_application,
+            arguments.deployment_group
+        )
+    else:
+        promote(client, arguments.function_name, arguments.alias, arguments.version)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Rolls a function back to a previously deployed package of the content-addressed artifact store (see artifacts).
+
+A package is selected by the commit it was built from or by its sha256 hash. A hash is looked up in the manifests
+of the function, hence only packages, that were deployed to it, can be selected. The function is pointed to
+the stored package (together with its dependency layer, if the manifest records one), a version is published and
+the alias is moved to it. Nothing is rebuilt, hence a rollback takes seconds. Packages, that expired (see
+RetentionParameters), can not be rolled back to.
+
+Usage:
+    python -m build_tools.rollback --function-name NAME --bucket BUCKET --list
+    python -m build_tools.rollback --function-name NAME --bucket BUCKET (--commit SHA | --sha256 HEX)
+        [--alias live] [--deployment-application APP --deployment-group GROUP]
+"""
+import argparse
+
+from typing import List, Optional
+
+from .artifacts import ARTIFACTS_PREFIX, artifact_exists, find_manifest, list_manifests, read_manifest
+from .aws_cli import AwsCli
+from .deploy import deploy_function, promote, shift_traffic
+
+
+def main(args: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Rolls a function back to a previously deployed package.')
+    parser.add_argument('--function-name', required=True)
+    parser.add_argument('--bucket', required=True, help='S3 bucket of deployment packages.')
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument('--commit', help='Commit of the package to roll back to.')
+    target.add_argument('--sha256', help='Hexadecimal sha256 hash of the package to roll back to.')
+    target.add_argument('--list', action='store_true', help='List deployed commits.')
+    parser.add_argument('--alias', default=None, help='Alias to move to the rolled back version.')
+    parser.add_argument('--deployment-application', default=None, help='CodeDeploy application to shift traffic.')
+    parser.add_argument('--deployment-group', default=None, help='CodeDeploy deployment group to shift traffic.')
+    arguments = parser.parse_args(args)
+
+    client = AwsCli()
+
+    if arguments.list:
+        for manifest in list_manifests(client, arguments.bucket, arguments.function_name):
+            print(f'{manifest["modified"]} {manifest["commit"]}')
+        return
+
+    if arguments.commit:
+        manifest = read_manifest(client, arguments.bucket, arguments.function_name, arguments.commit)
+        key, layer_arn = manifest['key'], manifest.get('layer_arn')
+    else:
+        # The package must be deployed with the dependency layer it was built with, which its manifest records.
+        key = f'{ARTIFACTS_PREFIX}/{arguments.sha256.lower()}.zip'
+        manifest = find_manifest(client, arguments.bucket, arguments.function_name, key)
+
+        if manifest is None:
+            message = f'No deployed commit of {arguments.function_name} references s3://{arguments.bucket}/{key}.'
+            raise SystemExit(message)
+
+        print(f'Package s3://{arguments.bucket}/{key} was deployed from commit {manifest["commit"]}.')
+        layer_arn = manifest.get('layer_arn')
+
+    # Packages expire with their manifests, but S3 removes expired objects asynchronously.
+    if not artifact_exists(client, arguments.bucket, key):
+        message = f'Package s3://{arguments.bucket}/{key} no longer exists, it expired after the retention period.'
+        raise SystemExit(message)
+
+    version = deploy_function(client, arguments.function_name, arguments.bucket, key, layer_arn)
+    print(f'Rolled {arguments.function_name} back to s3://{arguments.bucket}/{key} as version {version}.')
+
+    if arguments.alias and arguments.deployment_group:
+        shift_traffic(
+            client,
+            arguments.function_name,
+            arguments.alias,
+            version,
+            arguments.deployment_application,
+            arguments.deployment_group
+        )
+    elif arguments.alias:
+        promote(client, arguments.function_name, arguments.alias, version)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,207 @@
+"""
+Test sharding balanced by historical test durations.
+
+Every shard discovers the same test files and assigns them to shards with the same greedy algorithm
+(the longest file goes to the least loaded shard), hence shards agree on the split without talking to
+each other. Durations come from JUnit XML reports of previous runs: each shard records the durations of
+its files per source version, and the deploy build merges them into the history once all shards passed.
+Files without history are assumed to take the average duration.
+
+Usage:
+    python -m build_tools.sharding assign --index 0 --total 4 --timings-url S3_URL --output PATH [--root .]
+    python -m build_tools.sharding record --index 0 --junit PATH --timings-url S3_URL --source-version SHA [--root .]
+    python -m build_tools.sharding merge --total 4 --timings-url S3_URL --source-version SHA
+"""
+import argparse
+import fnmatch
+import json
+import os
+import tempfile
+import xml.etree.ElementTree as ElementTree
+
+from typing import Any, Dict, List, Optional
+
+from .aws_cli import AwsCli, AwsCliError
+
+TEST_FILE_PATTERNS = ['test_*.py', '*_test.py']
+
+# Directories, that never contain tests of the function.
+EXCLUDED_DIRECTORIES = {'.git', '__pycache__', 'node_modules', 'site-packages', '.venv', 'venv'}
+
+
+def discover(root: str, patterns: Optional[List[str]] = None) -> List[str]:
+    """
+    Finds test files.
+
+    :param root: Repository root.
+    :param patterns: File name patterns of test files.
+
+    :return: Sorted paths relative to the root.
+    """
+    patterns = patterns or TEST_FILE_PATTERNS
+    files = []
+
+    for directory, dirs, names in os.walk(root):
+        dirs[:] = [name for name in dirs if name not in EXCLUDED_DIRECTORIES]
+
+        for name in names:
+            if any(fnmatch.fnmatch(name, pattern) for pattern in patterns):
+                files.append(os.path.relpath(os.path.join(directory, name), root).replace(os.sep, '/'))
+
+    return sorted(files)
+
+
+def assign(files: List[str], timings: Dict[str, float], total: int) -> List[List[str]]:
+    """
+    Splits test files into shards of similar total duration.
+
+    :param files: Test files.
+    :param timings: Historical duration of a test file in seconds.
+    :param total: Number of shards.
+
+    :return: Sorted test files of every shard.
+    """
+    known = [timings[name] for name in files if name in timings]
+    default = sum(known) / len(known) if known else 1.0
+
+    shards: List[List[str]] = [[] for _ in range(total)]
+    loads = [0.0] * total
+
+    for name in sorted(files, key=lambda file: (-timings.get(file, default), file)):
+        index = loads.index(min(loads))
+        shards[index].append(name)
+        loads[index] += timings.get(name, default)
+
+    return [sorted(shard) for shard in shards]
+
+
+def junit_durations(path: str, root: str) -> Dict[str, float]:
+    """
+    Sums test case durations of a JUnit XML report per test file.
+
+    :param path: Path to the report.
+    :param root: Repository root, used to resolve class names to files if a report has no file attributes.
+
+    :return: Test file mapped to its duration in seconds.
+    """
+    durations: Dict[str, float] = {}
+
+    for case in ElementTree.parse(path).getroot().iter('testcase'):
+        name = case.get('file') or module_file(case.get('classname', ''), root)
+
+        if name:
+            name = os.path.normpath(name).replace(os.sep, '/')
+            durations[name] = durations.get(name, 0.0) + float(case.get('time') or 0)
+
+    return durations
+
+
+def module_file(classname: str, root: str) -> Optional[str]:
+    """
+    Resolves a dotted class name of a test case (e.g. "tests.test_api.TestApi") to its file.
+
+    :param classname: Dotted class name.
+    :param root: Repository root.
+
+    :return: Path relative to the root or None, if no file matches.
+    """
+    parts = classname.split('.')
+
+    for end in range(len(parts), 0, -1):
+        name = '/'.join(parts[:end]) + '.py'
+
+        if os.path.isfile(os.path.join(root, name)):
+            return name
+
+    return None
+
+
+def load_json(client: Any, url: str) -> Optional[Dict[str, Any]]:
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'timings.json')
+
+        try:
+            client.copy(url, path)
+        except AwsCliError:
+            return None
+
+        with open(path) as file:
+            return json.load(file)
+
+
+def store_json(client: Any, data: Dict[str, Any], url: str) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'timings.json')
+
+        with open(path, 'w') as file:
+            json.dump(data, file, indent=2, sort_keys=True)
+
+        client.copy(path, url)
+
+
+def main(args: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Splits tests into shards balanced by historical durations.')
+    commands = parser.add_subparsers(dest='command')
+
+    assign_parser = commands.add_parser('assign', help='Writes test files of a shard to a file.')
+    assign_parser.add_argument('--index', type=int, required=True)
+    assign_parser.add_argument('--total', type=int, required=True)
+    assign_parser.add_argument('--timings-url', required=True)
+    assign_parser.add_argument('--output', required=True)
+    assign_parser.add_argument('--root', default='.')
+    assign_parser.add_argument('--pattern', action='append', default=None, help='File name pattern of test files.')
+
+    record_parser = commands.add_parser('record', help='Stores test file durations of a shard.')
+    record_parser.add_argument('--index', type=int, required=True)
+    record_parser.add_argument('--junit', required=True)
+    record_parser.add_argument('--timings-url', required=True)
+    record_parser.add_argument('--source-version', required=True)
+    record_parser.add_argument('--root', default='.')
+
+    merge_parser = commands.add_parser('merge', help='Merges durations of all passed shards into the history.')
+    merge_parser.add_argument('--total', type=int, required=True)
+    merge_parser.add_argument('--timings-url', required=True)
+    merge_parser.add_argument('--source-version', required=True)
+
+    arguments = parser.parse_args(args)
+    client = AwsCli()
+
+    if arguments.command == 'assign':
+        timings = load_json(client, f'{arguments.timings_url}/history.json') or {}
+        shards = assign(discover(arguments.root, arguments.pattern), timings, arguments.total)
+        files = shards[arguments.index]
+
+        with open(arguments.output, 'w') as file:
+            file.write(''.join(name + '\n' for name in files))
+
+        duration = sum(timings.get(name, 0.0) for name in files)
+        print(f'Shard {arguments.index + 1}/{arguments.total}: {len(files)} test files, ~{duration:.1f}s by history.')
+    elif arguments.command == 'record':
+        if not os.path.isfile(arguments.junit):
+            print(f'No JUnit report at {arguments.junit}, test durations are not recorded.')
+            return
+
+        durations = junit_durations(arguments.junit, arguments.root)
+        store_json(client, durations, f'{arguments.timings_url}/{arguments.source_version}/shard-{arguments.index}.json')
+        print(f'Recorded durations of {len(durations)} test files.')
+    elif arguments.command == 'merge':
+        history = load_json(client, f'{arguments.timings_url}/history.json') or {}
+        recorded = 0
+
+        for index in range(arguments.total):
+            durations = load_json(client, f'{arguments.timings_url}/{arguments.source_version}/shard-{index}.json')
+
+            if durations is not None:
+                history.update(durations)
+                recorded += 1
+
+        if recorded:
+            store_json(client, history, f'{arguments.timings_url}/history.json')
+
+        print(f'Merged test durations of {recorded}/{arguments.total} shards into the history.')
+    else:
+        parser.print_help()
+
+
+if __name__ == '__main__':
+    main()
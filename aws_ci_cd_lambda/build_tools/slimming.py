@@ -0,0 +1,231 @@
+"""
+Slimming of deployment packages to reduce their size and the cold start time of a function.
+
+The slimming stage prunes files that are never needed at runtime, strips debug symbols from shared objects
+and precompiles python sources into bytecode of the interpreter that runs the build (which matches the
+function runtime), so Lambda does not have to compile modules on every cold start.
+"""
+import argparse
+import fnmatch
+import importlib.util
+import json
+import marshal
+import os
+import shutil
+import subprocess
+import sys
+
+from collections import defaultdict
+from typing import Dict, List, NamedTuple, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .packager import Entry
+
+
+class PruneRule(NamedTuple):
+    """
+    Directory and file name patterns of files to prune.
+    """
+    directories: List[str]
+    files: List[str]
+
+
+PRUNE_RULES: Dict[str, PruneRule] = {
+    'pycache': PruneRule(['__pycache__'], ['*.pyc', '*.pyo']),
+    'tests': PruneRule(['tests', 'test'], []),
+    'docs': PruneRule(['docs', 'doc'], ['*.rst', '*.md']),
+    'stubs': PruneRule([], ['*.pyi']),
+    'examples': PruneRule(['examples', 'example', 'sample_data'], []),
+    'dist_info': PruneRule(['*.dist-info', '*.egg-info'], []),
+    'boto3': PruneRule(
+        ['boto3', 'botocore', 's3transfer', 'boto3-*-info', 'botocore-*-info', 's3transfer-*-info'],
+        []
+    ),
+}
+
+# Rules that are safe for most packages. "dist_info" and "boto3" can break packages that read
+# their own metadata or depend on a specific boto3 version, hence they must be chosen explicitly.
+DEFAULT_PRUNE_RULES = ['pycache', 'tests', 'docs', 'stubs', 'examples']
+
+# Lambda extracts packages with the timestamp of zip entries, which the packager sets to 1980-01-01.
+ZIP_EPOCH = 315532800
+
+
+def is_pruned(arcname: str, rules: List[PruneRule]) -> bool:
+    """
+    Checks whether a file matches any of the prune rules.
+
+    :param arcname: File name in the archive.
+    :param rules: Prune rules.
+
+    :return: True, if the file should be pruned.
+    """
+    *directories, name = arcname.split('/')
+
+    for rule in rules:
+        if any(fnmatch.fnmatch(name, pattern) for pattern in rule.files):
+            return True
+
+        for directory in directories:
+            if any(fnmatch.fnmatch(directory, pattern) for pattern in rule.directories):
+                return True
+
+    return False
+
+
+def strip_binary(entry: 'Entry', work_dir: str) -> 'Entry':
+    """
+    Strips debug symbols from a copy of a shared object.
+
+    :param entry: Shared object entry.
+    :param work_dir: Directory for stripped copies.
+
+    :return: Entry pointing to the stripped copy or the original entry, if stripping failed.
+    """
+    path = os.path.join(work_dir, 'stripped', entry.arcname)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    shutil.copyfile(entry.path, path)
+
+    if subprocess.call(['strip', '--strip-unneeded', path], stderr=subprocess.DEVNULL) != 0:
+        return entry
+
+    return entry._replace(path=path)
+
+
+def precompile(entry: 'Entry', work_dir: str) -> Optional['Entry']:
+    """
+    Compiles a python source into bytecode of the running interpreter. Since Lambda file system is read-only,
+    bytecode is written in a form that is never validated against the source (hash-based, unchecked on
+    python 3.7+, and a timestamp of the zip entries on older versions).
+
+    :param entry: Python source entry.
+    :param work_dir: Directory for compiled files.
+
+    :return: Entry of the compiled file or None, if the source can not be compiled.
+    """
+    with open(entry.path, 'rb') as file:
+        source = file.read()
+
+    try:
+        code = compile(source, entry.arcname, 'exec', dont_inherit=True)
+    except (SyntaxError, ValueError):
+        return None
+
+    if sys.version_info >= (3, 7):
+        header = importlib.util.MAGIC_NUMBER + (1).to_bytes(4, 'little') + importlib.util.source_hash(source)
+    else:
+        header = importlib.util.MAGIC_NUMBER + ZIP_EPOCH.to_bytes(4, 'little') + len(source).to_bytes(4, 'little')
+
+    directory, name = os.path.split(entry.arcname)
+    cached_name = f'{name[:-3]}.{sys.implementation.cache_tag}.pyc'
+    arcname = '/'.join(filter(None, [directory, '__pycache__', cached_name]))
+
+    path = os.path.join(work_dir, 'compiled', arcname)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    with open(path, 'wb') as file:
+        file.write(header + marshal.dumps(code))
+
+    return entry._replace(arcname=arcname, path=path, executable=False)
+
+
+def size_report(entries: List['Entry'], pruned: List['Entry']) -> Dict[str, Dict[str, int]]:
+    """
+    Summarizes sizes of top level packages in an archive.
+
+    :param entries: Archived entries.
+    :param pruned: Pruned entries.
+
+    :return: Top level package name mapped to its kept and pruned size in bytes.
+    """
+    report: Dict[str, Dict[str, int]] = defaultdict(lambda: {'kept': 0, 'pruned': 0})
+
+    for key, group in [('kept', entries), ('pruned', pruned)]:
+        for entry in group:
+            parts = entry.arcname.split('/')
+            package = parts[1] if parts[0] == 'python' and len(parts) > 2 else parts[0]
+            report[package][key] += os.path.getsize(entry.path)
+
+    return dict(report)
+
+
+def print_report(report: Dict[str, Dict[str, int]], limit: int = 15) -> None:
+    total = sum(sizes['kept'] for sizes in report.values())
+    pruned = sum(sizes['pruned'] for sizes in report.values())
+
+    print(f'Package size: {total / 2 ** 20:.1f} MiB, pruned: {pruned / 2 ** 20:.1f} MiB.')
+    for package, sizes in sorted(report.items(), key=lambda item: -item[1]['kept'])[:limit]:
+        print(f'  {package:<40} {sizes["kept"] / 2 ** 20:>8.2f} MiB')
+
+
+class Slimmer:
+    """
+    Applies slimming to entries collected by the packager.
+    """
+    def __init__(
+            self,
+            prune_rules: Optional[List[str]] = None,
+            strip_binaries: bool = False,
+            compile_bytecode: bool = False
+    ) -> None:
+        """
+        Constructor.
+
+        :param prune_rules: Names of rules from PRUNE_RULES.
+        :param strip_binaries: Whether to strip debug symbols from shared objects.
+        :param compile_bytecode: Whether to precompile python sources.
+        """
+        unknown = set(prune_rules or []) - set(PRUNE_RULES)
+        assert not unknown, f'Unknown prune rules: {", ".join(sorted(unknown))}.'
+
+        self.rules = [PRUNE_RULES[name] for name in prune_rules or []]
+        self.strip_binaries = strip_binaries
+        self.compile_bytecode = compile_bytecode
+
+    def apply(self, entries: List['Entry'], work_dir: str) -> Tuple[List['Entry'], List['Entry']]:
+        """
+        Prunes, strips and precompiles entries.
+
+        :param entries: Entries sorted by their archive names.
+        :param work_dir: Directory for stripped and compiled files.
+
+        :return: Entries to archive (sorted by their archive names) and pruned entries.
+        """
+        kept: List['Entry'] = []
+        pruned: List['Entry'] = []
+
+        for entry in entries:
+            (pruned if is_pruned(entry.arcname, self.rules) else kept).append(entry)
+
+        if self.strip_binaries and shutil.which('strip'):
+            kept = [strip_binary(entry, work_dir) if entry.arcname.endswith('.so') else entry for entry in kept]
+
+        if self.compile_bytecode:
+            names = {entry.arcname for entry in kept}
+            compiled = [precompile(entry, work_dir) for entry in kept if entry.arcname.endswith('.py')]
+            kept += [entry for entry in compiled if entry is not None and entry.arcname not in names]
+            kept.sort(key=lambda entry: entry.arcname)
+
+        return kept, pruned
+
+    @staticmethod
+    def add_arguments(parser: argparse.ArgumentParser) -> None:
+        """
+        Adds slimming arguments to a command line parser.
+
+        :param parser: Command line parser.
+
+        :return: No return.
+        """
+        parser.add_argument('--prune', action='append', default=[], choices=sorted(PRUNE_RULES))
+        parser.add_argument('--strip', action='store_true', help='Strip debug symbols from shared objects.')
+        parser.add_argument('--precompile', action='store_true', help='Precompile python sources.')
+
+    @staticmethod
+    def from_arguments(arguments: argparse.Namespace) -> 'Slimmer':
+        return Slimmer(arguments.prune, arguments.strip, arguments.precompile)
+
+
+def write_report(path: str, report: Dict[str, Dict[str, int]]) -> None:
+    with open(path, 'w') as file:
+        json.dump(report, file, indent=2, sort_keys=True)
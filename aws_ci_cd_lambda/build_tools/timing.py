@@ -0,0 +1,284 @@
+"""
+Timing of build phases and steps.
+
+The generated buildspec is instrumented (see instrument): before every command and at the end of every phase
+a timestamp mark is appended to a file. Commands keep running in the build's shell, hence exported variables
+and activated virtual environments still work. A report at the end of the build turns the marks into
+durations, prints the slowest steps and publishes phase and step durations as CloudWatch metrics,
+either with a single PutMetricData call or as CloudWatch Embedded Metric Format (EMF) records in the build log.
+
+Usage:
+    python -m build_tools.timing --prefix PREFIX --stage build [--marks PATH] [--namespace CiCdLambda/Build]
+        [--emf] [--slowest 5]
+"""
+import argparse
+import json
+import re
+import time
+
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from .aws_cli import AwsCli
+
+MARKS_FILE = '/tmp/ci-cd-lambda-timings.txt'
+NAMESPACE = 'CiCdLambda/Build'
+
+# Label of the mark, that closes a phase.
+PHASE_END = '-'
+
+# Patterns, that name a step after the essential part of its command, the first match wins.
+STEP_PATTERNS = [
+    re.compile(r'python3 -m build_tools\.(\w+)(?: ([a-z]\w*))?'),
+    re.compile(r'\./([\w.-]+\.sh)'),
+    re.compile(r'(ssh-add|ssh-agent|secretsmanager)'),
+    re.compile(r'(virtualenv|pip install|docker \w+|aws s3 \w+|aws ecr \w+)'),
+]
+
+
+class Step(NamedTuple):
+    """
+    Duration of a single step of a build phase.
+    """
+    phase: str
+    label: str
+    seconds: float
+
+
+def step_label(command: str) -> str:
+    """
+    Names a build step after its command.
+
+    :param command: Shell command.
+
+    :return: Short label without shell special characters.
+    """
+    for pattern in STEP_PATTERNS:
+        match = pattern.search(command)
+
+        if match:
+            label = ' '.join(group for group in match.groups() if group)
+            break
+    else:
+        label = command.split('=', 1)[0] if re.match(r'^(export )?\w+=', command) else command
+
+    return re.sub(r'[^\w .:/-]', '', label).strip()[:40] or 'command'
+
+
+def mark_command(phase: str, label: str, path: str = MARKS_FILE) -> str:
+    """
+    Creates a shell command, that appends a timestamp mark in milliseconds.
+
+    :param phase: Buildspec phase.
+    :param label: Label of the step, that starts at the mark.
+    :param path: Marks file.
+
+    :return: Shell command.
+    """
+    return f"echo '{phase}|{label}|'$(date +%s%3N) >> {path}"
+
+
+def instrument(buildspec: Dict[str, Any], report_command: str, path: str = MARKS_FILE) -> Dict[str, Any]:
+    """
+    Adds timestamp marks around every command of a buildspec and runs a report at the end of the build.
+
+    :param buildspec: Buildspec object.
+    :param report_command: Command, that runs this module to report timings.
+    :param path: Marks file.
+
+    :return: A new, instrumented buildspec object.
+    """
+    phases = {}
+
+    for phase, definition in buildspec['phases'].items():
+        commands = []
+
+        for command in definition.get('commands', []):
+            commands += [mark_command(phase, step_label(command), path), command]
+
+        phases[phase] = dict(definition, commands=commands + [mark_command(phase, PHASE_END, path)])
+
+    # Post build runs even if the build phase fails, so durations of failed builds are reported too.
+    post_build = phases.setdefault('post_build', {'commands': []})
+    post_build['commands'] = post_build['commands'] + [f'{report_command} || true']
+
+    return dict(buildspec, phases=phases)
+
+
+def read_marks(path: str) -> List[Tuple[str, str, int]]:
+    """
+    Reads timestamp marks.
+
+    :param path: Marks file.
+
+    :return: Phase, label and timestamp in milliseconds of every mark in the order they were written.
+    """
+    marks = []
+
+    with open(path) as file:
+        for line in file:
+            parts = line.strip().rsplit('|', 2)
+
+            if len(parts) == 3 and parts[2].isdigit():
+                marks.append((parts[0], parts[1], int(parts[2])))
+
+    return marks
+
+
+def steps(marks: List[Tuple[str, str, int]], end_ms: int) -> List[Step]:
+    """
+    Turns marks into step durations. A step lasts until the next mark. The last step, e.g. a command
+    that failed the build, lasts until the end.
+
+    :param marks: Marks (see read_marks).
+    :param end_ms: End of the build in milliseconds.
+
+    :return: Durations of steps, that ran, in order. Repeated labels of a phase are summed up.
+    """
+    durations: Dict[Tuple[str, str], float] = {}
+
+    for index, (phase, label, start) in enumerate(marks):
+        if label == PHASE_END:
+            continue
+
+        end = marks[index + 1][2] if index + 1 < len(marks) else end_ms
+        durations[(phase, label)] = durations.get((phase, label), 0.0) + max(end - start, 0) / 1000
+
+    return [Step(phase, label, seconds) for (phase, label), seconds in durations.items()]
+
+
+def phase_durations(build_steps: List[Step]) -> Dict[str, float]:
+    """
+    Sums step durations by phase.
+
+    :param build_steps: Step durations.
+
+    :return: Duration of every phase in seconds, in order.
+    """
+    durations: Dict[str, float] = {}
+
+    for step in build_steps:
+        durations[step.phase] = durations.get(step.phase, 0.0) + step.seconds
+
+    return durations
+
+
+def emf_record(
+        namespace: str,
+        dimensions: Dict[str, str],
+        metrics: Dict[str, float],
+        timestamp_ms: int,
+        unit: str = 'Seconds'
+) -> Dict[str, Any]:
+    """
+    Serializes metrics in the CloudWatch Embedded Metric Format.
+
+    :param namespace: CloudWatch namespace.
+    :param dimensions: Dimension names and values.
+    :param metrics: Metric names and values.
+    :param timestamp_ms: Timestamp in milliseconds.
+    :param unit: Unit of all metrics.
+
+    :return: EMF record. Printed as a single line of JSON, CloudWatch Logs extracts the metrics.
+    """
+    return {
+        '_aws': {
+            'Timestamp': timestamp_ms,
+            'CloudWatchMetrics': [{
+                'Namespace': namespace,
+                'Dimensions': [sorted(dimensions)],
+                'Metrics': [{'Name': name, 'Unit': unit} for name in sorted(metrics)],
+            }],
+        },
+        **dimensions,
+        **metrics,
+    }
+
+
+def metric_records(prefix: str, stage: str, build_steps: List[Step]) -> List[Tuple[Dict[str, str], Dict[str, float]]]:
+    """
+    Creates dimensions and values of phase and step duration metrics.
+
+    :param prefix: Pipeline prefix.
+    :param stage: Build, that the steps belong to, e.g. "build" or "test".
+    :param build_steps: Step durations.
+
+    :return: Dimensions and metrics of every record.
+    """
+    records = [
+        ({'Prefix': prefix, 'Stage': stage, 'Phase': phase}, {'PhaseDuration': seconds})
+        for phase, seconds in phase_durations(build_steps).items()
+    ]
+
+    records += [
+        ({'Prefix': prefix, 'Stage': stage, 'Phase': step.phase, 'Step': step.label}, {'StepDuration': step.seconds})
+        for step in build_steps
+    ]
+
+    return records
+
+
+def put_metrics(client: Any, namespace: str, records: List[Tuple[Dict[str, str], Dict[str, float]]]) -> None:
+    """
+    Puts metrics to CloudWatch in one batch.
+
+    :param client: AWS client (see AwsCli).
+    :param namespace: CloudWatch namespace.
+    :param records: Dimensions and metrics (see metric_records).
+
+    :return: No return.
+    """
+    client.call('cloudwatch', 'put-metric-data', {
+        'Namespace': namespace,
+        'MetricData': [
+            {
+                'MetricName': name,
+                'Dimensions': [{'Name': key, 'Value': value} for key, value in sorted(dimensions.items())],
+                'Value': value,
+                'Unit': 'Seconds',
+            }
+            for dimensions, metrics in records
+            for name, value in metrics.items()
+        ],
+    })
+
+
+def print_slowest(build_steps: List[Step], count: int) -> None:
+    total = sum(step.seconds for step in build_steps)
+
+    print(f'Slowest build steps (of {total:.1f}s):')
+    print(f'{"Phase":<12} {"Step":<40} {"Seconds":>8} {"Share":>6}')
+
+    for step in sorted(build_steps, key=lambda step: step.seconds, reverse=True)[:count]:
+        share = step.seconds / total if total else 0.0
+        print(f'{step.phase:<12} {step.label:<40} {step.seconds:>8.1f} {share:>6.0%}')
+
+
+def main(args: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Reports durations of build phases and steps.')
+    parser.add_argument('--prefix', required=True, help='Pipeline prefix, a metric dimension.')
+    parser.add_argument('--stage', required=True, help='Build, e.g. "build" or "test", a metric dimension.')
+    parser.add_argument('--marks', default=MARKS_FILE)
+    parser.add_argument('--namespace', default=NAMESPACE)
+    parser.add_argument('--emf', action='store_true', help='Print EMF records instead of calling PutMetricData.')
+    parser.add_argument('--slowest', type=int, default=5, help='Number of slowest steps to print.')
+    arguments = parser.parse_args(args)
+
+    now = int(time.time() * 1000)
+    build_steps = steps(read_marks(arguments.marks), now)
+
+    if not build_steps:
+        print('No build timings recorded.')
+        return
+
+    print_slowest(build_steps, arguments.slowest)
+    records = metric_records(arguments.prefix, arguments.stage, build_steps)
+
+    if arguments.emf:
+        for dimensions, metrics in records:
+            print(json.dumps(emf_record(arguments.namespace, dimensions, metrics, now)))
+    else:
+        put_metrics(AwsCli(), arguments.namespace, records)
+
+
+if __name__ == '__main__':
+    main()
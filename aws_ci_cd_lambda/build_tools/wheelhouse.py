@@ -0,0 +1,146 @@
+"""
+Shared wheelhouse of pre-built binary dependencies.
+
+Several pipelines sync a wheelhouse from S3 before installing dependencies and let pip find wheels in it.
+Wheels, that pip had to build from source, are collected from the pip cache and pushed back, so the next
+build of any pipeline downloads them instead of compiling. Wheelhouses are keyed by python version,
+machine architecture and the build image distribution, since binary wheels are not portable between them.
+
+Usage:
+    python -m build_tools.wheelhouse key
+    python -m build_tools.wheelhouse collect --wheelhouse PATH --site-packages PATH [--pip-cache PATH]
+"""
+import argparse
+import os
+import platform
+import re
+import shutil
+import sys
+
+from typing import Dict, List, Optional, Set, Tuple
+
+
+def normalize(name: str) -> str:
+    return re.sub(r'[-_.]+', '_', name).lower()
+
+
+def wheelhouse_key() -> str:
+    """
+    Creates a key of a wheelhouse compatible with the running interpreter and build image.
+
+    :return: Key, e.g. "cpython-38-x86_64-ubuntu18.04".
+    """
+    distribution = 'linux'
+
+    if os.path.isfile('/etc/os-release'):
+        with open('/etc/os-release') as file:
+            release = dict(
+                line.strip().split('=', 1) for line in file if '=' in line
+            )
+
+        distribution = release.get('ID', 'linux').strip('"') + release.get('VERSION_ID', '').strip('"')
+
+    return f'{sys.implementation.cache_tag}-{platform.machine()}-{distribution}'
+
+
+def parse_wheel_name(filename: str) -> Tuple[str, str]:
+    """
+    Parses a wheel file name.
+
+    :param filename: Wheel file name, e.g. "numpy-1.19.0-cp38-cp38-linux_x86_64.whl".
+
+    :return: Normalized distribution name and version.
+    """
+    name, version = filename.split('-')[:2]
+    return normalize(name), version
+
+
+def installed_distributions(site_packages: str) -> Set[Tuple[str, str]]:
+    """
+    Lists distributions installed into a site-packages directory.
+
+    :param site_packages: Directory with installed dependencies.
+
+    :return: Normalized distribution names and versions.
+    """
+    distributions = set()
+
+    for name in os.listdir(site_packages):
+        if name.endswith('.dist-info'):
+            distribution, version = name[:-len('.dist-info')].rsplit('-', 1)
+            distributions.add((normalize(distribution), version))
+
+    return distributions
+
+
+def find_wheels(directory: str) -> Dict[str, str]:
+    """
+    Finds wheels in a directory tree.
+
+    :param directory: Directory to search.
+
+    :return: Wheel file name mapped to its path.
+    """
+    wheels = {}
+
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.endswith('.whl'):
+                wheels[name] = os.path.join(root, name)
+
+    return wheels
+
+
+def collect(wheelhouse: str, site_packages: str, pip_cache: str) -> Tuple[int, int, List[str]]:
+    """
+    Copies wheels, that pip built from source, into the wheelhouse and counts wheelhouse hits.
+
+    :param wheelhouse: Wheelhouse directory.
+    :param site_packages: Directory with installed dependencies.
+    :param pip_cache: Pip cache directory.
+
+    :return: Number of installed distributions found in the wheelhouse (hits),
+    number of distributions built from source (misses) and names of wheels added to the wheelhouse.
+    """
+    os.makedirs(wheelhouse, exist_ok=True)
+
+    installed = installed_distributions(site_packages)
+    existing = find_wheels(wheelhouse)
+    built = find_wheels(os.path.join(pip_cache, 'wheels'))
+
+    hits = len(installed & {parse_wheel_name(name) for name in existing})
+    added = []
+
+    for name, path in sorted(built.items()):
+        if name not in existing and parse_wheel_name(name) in installed:
+            shutil.copyfile(path, os.path.join(wheelhouse, name))
+            added.append(name)
+
+    return hits, len(added), added
+
+
+def main(args: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Manages a shared wheelhouse.')
+    commands = parser.add_subparsers(dest='command')
+    commands.add_parser('key', help='Prints the wheelhouse key of this interpreter.')
+
+    collect_parser = commands.add_parser('collect', help='Adds wheels built from source to the wheelhouse.')
+    collect_parser.add_argument('--wheelhouse', required=True)
+    collect_parser.add_argument('--site-packages', required=True)
+    collect_parser.add_argument('--pip-cache', default=os.path.expanduser('~/.cache/pip'))
+    arguments = parser.parse_args(args)
+
+    if arguments.command == 'key':
+        print(wheelhouse_key())
+    elif arguments.command == 'collect':
+        hits, misses, added = collect(arguments.wheelhouse, arguments.site_packages, arguments.pip_cache)
+
+        print(f'Wheelhouse hits: {hits}, misses (built from source): {misses}.')
+        for name in added:
+            print(f'  Added {name}')
+    else:
+        parser.print_help()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,10 @@
-from typing import Optional, List
+from typing import Dict, Optional, List
 from aws_cdk.aws_s3 import Bucket
+from aws_cdk.aws_s3_assets import Asset
+from aws_ci_cd_lambda.build_tools.timing import instrument
+from aws_ci_cd_lambda.parameters.import_time_parameters import ImportTimeParameters
+from aws_ci_cd_lambda.parameters.load_test_parameters import LoadTestParameters
+from aws_ci_cd_lambda.parameters.packaging_parameters import PackagingParameters
 
 
 class BuildSpecObject:
@@ -7,77 +12,476 @@ class BuildSpecObject:
             self,
             prefix: str,
             bucket: Bucket,
+            build_tools: Asset,
             aws_secret_id: Optional[str] = None,
             ssh_key: Optional[str] = None,
             install_args: Optional[List[str]] = None,
             test_args: Optional[List[str]] = None,
-            custom_pre_build_commands: Optional[List[str]] = None
+            custom_pre_build_commands: Optional[List[str]] = None,
+            cache_hash_files: Optional[List[str]] = None,
+            packaging_params: Optional[PackagingParameters] = None,
+            import_time_params: Optional[ImportTimeParameters] = None,
+            lambda_handler: Optional[str] = None,
+            alias_name: Optional[str] = None,
+            python_version: str = 'python3.6',
+            architecture: str = 'x86_64',
+            wheelhouse_url: Optional[str] = None,
+            functions: Optional[Dict[str, str]] = None,
+            shared_paths: Optional[List[str]] = None,
+            parallel_builds: int = 4,
+            test_shards: int = 1,
+            deployment_application: Optional[str] = None,
+            deployment_group: Optional[str] = None,
+            load_test_params: Optional[LoadTestParameters] = None,
+            image_repository_uri: Optional[str] = None,
+            lock_files: Optional[List[str]] = None
     ) -> None:
         assert aws_secret_id is None or ssh_key is None, 'Both aws secret id and ssh key cannot be set. Choose one.'
+        assert functions is None or import_time_params is None, 'Import time gate is not supported for many functions.'
+        assert import_time_params is None or python_version != 'python3.6', 'Import time gate requires python 3.7+.'
 
         self.__prefix = prefix
         self.__bucket = bucket
+        self.__build_tools = build_tools
         self.__aws_secret_id = aws_secret_id
         self.__private_key = ssh_key
         self.__install_args = install_args or []
         self.__test_args = test_args or []
         self.__custom_pre_build_commands = custom_pre_build_commands or []
+        self.__cache_hash_files = cache_hash_files
+        self.__packaging_params = packaging_params or PackagingParameters()
+        self.__import_time_params = import_time_params
+        self.__lambda_handler = lambda_handler
+        self.__alias_name = alias_name
+        self.__python_version = python_version
+        self.__architecture = architecture
+        self.__wheelhouse_url = wheelhouse_url
+        self.__functions = functions
+        self.__shared_paths = shared_paths or []
+        self.__parallel_builds = parallel_builds
+        self.__test_shards = test_shards
+        self.__deployment_application = deployment_application
+        self.__deployment_group = deployment_group
+        self.__load_test_params = load_test_params
+        self.__image_repository_uri = image_repository_uri
+        self.__lock_files = lock_files or []
+
+    @staticmethod
+    def tool(module: str, *args: str) -> str:
+        """
+        Creates a command that runs one of the build tools shipped with this library.
+
+        :param module: Name of a module in the build_tools package.
+        :param args: Arguments for the module.
+
+        :return: Shell command.
+        """
+        return ' '.join(['PYTHONPATH=$TOOLS_PATH', 'python3', '-m', f'build_tools.{module}'] + list(args))
+
+    def __install_tools_commands(self) -> List[str]:
+        return [
+            'TOOLS_PATH="/tmp/ci-cd-lambda-tools"',
+            f'aws s3 cp s3://{self.__build_tools.s3_bucket_name}/{self.__build_tools.s3_object_key} $TOOLS_PATH.zip',
+            'python3 -m zipfile -e $TOOLS_PATH.zip $TOOLS_PATH/build_tools',
+            # Large deployment packages are uploaded in parallel multipart chunks.
+            'aws configure set default.s3.max_concurrent_requests 20',
+            'aws configure set default.s3.multipart_chunksize 16MB',
+        ]
+
+    def __install_commands(self) -> List[str]:
+        install_tools_commands = self.__install_tools_commands() + [
+            'command -v virtualenv > /dev/null || python3 -m pip install virtualenv',
+        ]
+
+        # Ubuntu and Amazon Linux (ARM) build images use different package managers.
+        # Prebaked images (see BuildImage) already contain jq, hence nothing is installed.
+        install_jq_command = 'command -v jq > /dev/null || apt-get install -y jq || yum install -y jq'
 
-    def get_object(self):
         if self.__aws_secret_id is not None:
             install_ssh_commands = [
-                'apt install jq',
+                install_jq_command,
                 '{ aws secretsmanager get-secret-value --secret-id ' + self.__aws_secret_id +
                 '| jq --raw-output \'.SecretString\' > id_rsa;'
-                'eval `ssh-agent`; mv id_rsa ~/.ssh;'
+                'eval `ssh-agent`; mkdir -p ~/.ssh; mv id_rsa ~/.ssh;'
                 'chmod 0600 ~/.ssh/id_rsa;'
                 'ssh-add ~/.ssh/id_rsa; } || { echo \"Invalid key\"; }'
             ]
         elif self.__private_key is not None:
             install_ssh_commands = [
-                'apt install jq',
+                install_jq_command,
                 '{ echo ' + self.__private_key + ' > id_rsa;'
-                'eval `ssh-agent`; mv id_rsa ~/.ssh;'
+                'eval `ssh-agent`; mkdir -p ~/.ssh; mv id_rsa ~/.ssh;'
                 'chmod 0600 ~/.ssh/id_rsa;'
                 'ssh-add ~/.ssh/id_rsa; } || { echo \"Invalid key\"; }'
             ]
         else:
             install_ssh_commands = []
 
-        return {
+        install_command = ' '.join(['./install.sh'] + self.__install_args)
+
+        # Pip looks for pre-built wheels in a shared wheelhouse. Wheels, that had to be built from source,
+        # are pushed back. Nothing is synced if dependencies are restored from cache.
+        if self.__wheelhouse_url is not None:
+            sync_wheelhouse_commands = [
+                'WHEELHOUSE_PATH="/tmp/lambda-wheelhouse"',
+                'WHEELHOUSE_URL="' + self.__wheelhouse_url + '/$(' + self.tool('wheelhouse', 'key') + ')"',
+                'if [ "$DEPS_CACHED" != "1" ]; then aws s3 sync --only-show-errors $WHEELHOUSE_URL $WHEELHOUSE_PATH; fi',
+                'export PIP_FIND_LINKS=$WHEELHOUSE_PATH',
+            ]
+            collect_wheelhouse_commands = [
+                'if [ "$DEPS_CACHED" != "1" ]; then ' + self.tool(
+                    'wheelhouse', 'collect',
+                    '--wheelhouse', '$WHEELHOUSE_PATH',
+                    '--site-packages', f'$VENV_PATH/lib/{self.__python_version}/site-packages'
+                ) + ' && aws s3 sync --only-show-errors $WHEELHOUSE_PATH $WHEELHOUSE_URL; fi',
+            ]
+        else:
+            sync_wheelhouse_commands = []
+            collect_wheelhouse_commands = []
+
+        if self.__cache_hash_files is not None:
+            # Dependencies are reinstalled only if the hash of dependency files differs from the one
+            # that the cached virtual environment was built with.
+            hash_files = ' '.join(self.__cache_hash_files)
+            install_venv_commands = [
+                'VENV_PATH="/tmp/lambda-tmpenv"',
+                'DEPS_HASH=$( { echo "' + self.__python_version + ' ' + install_command + '";'
+                'for f in $(ls -d ' + hash_files + ' 2>/dev/null | sort); do echo "$f"; cat "$f"; done; }'
+                ' | sha256sum | cut -d " " -f 1 )',
+                'if [ -f "$VENV_PATH/.deps-hash" ] && [ "$(cat $VENV_PATH/.deps-hash)" = "$DEPS_HASH" ]; '
+                'then DEPS_CACHED=1; echo "Dependency cache hit ($DEPS_HASH)."; '
+                'else DEPS_CACHED=0; echo "Dependency cache miss ($DEPS_HASH)."; '
+                'find $VENV_PATH -mindepth 1 -delete 2>/dev/null || true; fi',
+                'if [ "$DEPS_CACHED" = "0" ]; then virtualenv $VENV_PATH --python=' + self.__python_version + '; fi',
+                '. $VENV_PATH/bin/activate',
+                'chmod +x install.sh',
+                *sync_wheelhouse_commands,
+                'if [ "$DEPS_CACHED" = "0" ]; then ' + install_command + ' && echo "$DEPS_HASH" > $VENV_PATH/.deps-hash; fi',
+                *collect_wheelhouse_commands
+            ]
+        else:
+            install_venv_commands = [
+                'VENV_PATH="/tmp/lambda-tmpenv"',
+                f'virtualenv $VENV_PATH --python={self.__python_version}',
+                '. $VENV_PATH/bin/activate',
+                'chmod +x install.sh',
+                *sync_wheelhouse_commands,
+                install_command,
+                *collect_wheelhouse_commands
+            ]
+
+        return install_tools_commands + install_ssh_commands + install_venv_commands
+
+    def get_test_object(self):
+        """
+        Creates a buildspec of a test shard. Shards get SHARD_INDEX and SHARD_TOTAL environment variables,
+        a SHARD_TESTS_FILE with test files of the shard, and record test durations from a JUnit XML report,
+        that test.sh may write to SHARD_JUNIT_PATH.
+
+        :return: Buildspec object.
+        """
+        timings_url = f's3://{self.__bucket.bucket_name}/{self.__prefix}-test-timings'
+
+        buildspec = {
             'version': 0.2,
             'phases': {
                 'install': {
-                    'commands': install_ssh_commands + [
-                        'VENV_PATH="/tmp/lambda-tmpenv"',
-                        'virtualenv $VENV_PATH --python=python3.6',
-                        '. $VENV_PATH/bin/activate',
-                        'chmod +x install.sh',
-                        ' '.join(['./install.sh'] + self.__install_args)
-                    ]
+                    'commands': self.__install_commands()
                 },
                 'pre_build': {
-                    'commands': self.__custom_pre_build_commands + [
+                    'commands': [
+                        'export SHARD_TESTS_FILE="/tmp/shard-tests.txt"',
+                        'export SHARD_JUNIT_PATH="/tmp/shard-junit.xml"',
+                        self.tool(
+                            'sharding', 'assign',
+                            '--index', '$SHARD_INDEX',
+                            '--total', '$SHARD_TOTAL',
+                            '--timings-url', timings_url,
+                            '--output', '$SHARD_TESTS_FILE'
+                        ),
+                    ] + self.__custom_pre_build_commands
+                },
+                'build': {
+                    'commands': [
                         'chmod +x test.sh',
-                        ' '.join(['./test.sh'] + self.__test_args)
+                        ' '.join(['./test.sh'] + self.__test_args),
+                        self.tool(
+                            'sharding', 'record',
+                            '--index', '$SHARD_INDEX',
+                            '--junit', '$SHARD_JUNIT_PATH',
+                            '--timings-url', timings_url,
+                            '--source-version', '$CODEBUILD_RESOLVED_SOURCE_VERSION'
+                        ),
+                    ]
+                },
+            }
+        }
+
+        return self.__add_cache(self.__add_timing(buildspec, 'test'))
+
+    def get_load_test_object(self):
+        """
+        Creates a buildspec of the load test stage. The stage gets the version published by the build stage
+        in a FUNCTION_VERSION environment variable and promotes it to the alias once the load test passes.
+
+        :return: Buildspec object.
+        """
+        load_test = self.__load_test_params
+
+        if self.__alias_name:
+            promote_commands = [
+                self.tool(
+                    'promote',
+                    '--function-name', self.__prefix,
+                    '--alias', self.__alias_name,
+                    '--version', '$FUNCTION_VERSION',
+                    *([
+                        '--deployment-application', self.__deployment_application,
+                        '--deployment-group', self.__deployment_group
+                    ] if self.__deployment_group else [])
+                )
+            ]
+        else:
+            promote_commands = []
+
+        buildspec = {
+            'version': 0.2,
+            'phases': {
+                'install': {
+                    'commands': self.__install_tools_commands() + [
+                        'python3 -m pip install --quiet boto3',
                     ]
                 },
                 'build': {
                     'commands': [
-                        'INSTALL_PATH="/tmp/ivs-lambda-install-dir"',
-                        'BUILD_PATH="/tmp/ivs-lambda-pack.zip"',
-                        'cp -R . $INSTALL_PATH',
-                        'cp -R $VENV_PATH/lib/python3.6/site-packages/. $INSTALL_PATH',
-                        'cp -R $VENV_PATH/lib/python3.6/site-packages/. .',
-                        'current_dir=$( pwd )',
-                        'cd $INSTALL_PATH',
-                        'zip -9 -r $BUILD_PATH .',
-                        'cd $current_dir',
-                        f'KEY={self.__prefix}',
-                        f'aws s3 cp $BUILD_PATH s3://{self.__bucket.bucket_name}/"$KEY".zip',
-                        f'aws lambda update-function-code --function-name="$KEY" '
-                        f'--s3-bucket={self.__bucket.bucket_name} --s3-key="$KEY".zip --publish'
+                        self.tool(
+                            'loadtest',
+                            '--function-name', self.__prefix,
+                            '--qualifier', '$FUNCTION_VERSION',
+                            '--events', load_test.events_path,
+                            '--bucket', self.__bucket.bucket_name,
+                            '--key-prefix', f'{self.__prefix}-loadtest',
+                            '--concurrency', str(load_test.concurrency),
+                            '--invocations', str(load_test.invocations),
+                            '--max-error-rate', str(load_test.max_error_rate),
+                            *(['--p50-budget-ms', str(load_test.p50_budget_ms)] if load_test.p50_budget_ms else []),
+                            *(['--p99-budget-ms', str(load_test.p99_budget_ms)] if load_test.p99_budget_ms else []),
+                            *(['--max-regression', str(load_test.max_regression)] if load_test.max_regression else [])
+                        ),
+                        *promote_commands
                     ]
                 },
             }
         }
+
+        return self.__add_timing(buildspec, 'loadtest')
+
+    def get_object(self):
+        packaging = self.__packaging_params
+
+        slimming_args = [f'--prune {rule}' for rule in packaging.prune_rules]
+        if packaging.strip_binaries:
+            slimming_args.append('--strip')
+        if packaging.precompile:
+            slimming_args.append('--precompile')
+
+        compression_args = ['--level', str(packaging.compression_level)]
+        if packaging.workers:
+            compression_args += ['--workers', str(packaging.workers)]
+
+        # In layered mode dependencies are deployed as a separate layer, hence the package contains only the code.
+        if packaging.layered:
+            package_sources = ['.']
+            layer_args = [
+                '--layer-source', '$SITE_PACKAGES',
+                '--runtime', self.__python_version,
+                '--architecture', self.__architecture,
+                '--level', str(packaging.compression_level),
+                *slimming_args
+            ]
+        else:
+            package_sources = ['.', '$SITE_PACKAGES']
+            layer_args = []
+
+        # Import time of the packaged handler is checked before the package is deployed.
+        # Its report becomes the baseline once the package is deployed.
+        if self.__import_time_params is not None:
+            import_time = self.__import_time_params
+            import_time_commands = [
+                self.tool(
+                    'importtime',
+                    '--artifact', '$BUILD_PATH',
+                    '--module', import_time.handler_module or self.__lambda_handler.rsplit('.', 1)[0],
+                    '--bucket', self.__bucket.bucket_name,
+                    '--key-prefix', f'{self.__prefix}-importtime',
+                    '--runs', str(import_time.runs),
+                    '--max-regression', str(import_time.max_regression),
+                    *(['--max-total-ms', str(import_time.max_total_ms)] if import_time.max_total_ms else []),
+                    *(['--layer-source', '$SITE_PACKAGES'] if packaging.layered else [])
+                )
+            ]
+            import_time_baseline_commands = [
+                self.tool(
+                    'importtime',
+                    '--store-baseline',
+                    '--bucket', self.__bucket.bucket_name,
+                    '--key-prefix', f'{self.__prefix}-importtime'
+                )
+            ]
+        else:
+            import_time_commands = []
+            import_time_baseline_commands = []
+
+        # With a load test stage the published version is exported to it and promoted only after the load test.
+        if self.__load_test_params is not None:
+            promote_args = ['--version-file', '/tmp/deployed-version']
+            export_version_commands = ['DEPLOYED_VERSION=$(cat /tmp/deployed-version)']
+        else:
+            promote_args = [
+                *(['--alias', self.__alias_name] if self.__alias_name else []),
+                *([
+                    '--deployment-application', self.__deployment_application,
+                    '--deployment-group', self.__deployment_group
+                ] if self.__deployment_group else [])
+            ]
+            export_version_commands = []
+
+        if self.__image_repository_uri is not None:
+            # The function is deployed as a container image. The latest image is the layer cache of the next build.
+            install_command = ' '.join(['./install.sh'] + self.__install_args)
+            docker_build_args = [
+                'DOCKER_BUILDKIT=1', 'docker', 'build',
+                '--build-arg', 'BUILDKIT_INLINE_CACHE=1',
+                '--cache-from', '$IMAGE_REPOSITORY:latest',
+                *(['--ssh', 'default'] if self.__aws_secret_id or self.__private_key else []),
+                '--file', 'Dockerfile.lambda',
+                '--tag', '$IMAGE_REPOSITORY:$IMAGE_TAG',
+                '--tag', '$IMAGE_REPOSITORY:latest',
+                '.'
+            ]
+
+            build_commands = [
+                f'IMAGE_REPOSITORY="{self.__image_repository_uri}"',
+                'IMAGE_TAG=${CODEBUILD_RESOLVED_SOURCE_VERSION:-latest}',
+                'aws ecr get-login-password | docker login --username AWS --password-stdin ${IMAGE_REPOSITORY%%/*}',
+                self.tool(
+                    'container',
+                    '--runtime', self.__python_version,
+                    '--handler', self.__lambda_handler,
+                    '--output', 'Dockerfile.lambda',
+                    *[f'--lock-file "{name}"' for name in self.__lock_files],
+                    '--install-command', f'"{install_command}"',
+                    *(['--ssh'] if self.__aws_secret_id or self.__private_key else [])
+                ),
+                ' '.join(docker_build_args),
+                'docker push $IMAGE_REPOSITORY:$IMAGE_TAG',
+                'docker push $IMAGE_REPOSITORY:latest',
+                'IMAGE_URI=$(docker inspect --format "{{index .RepoDigests 0}}" $IMAGE_REPOSITORY:$IMAGE_TAG)',
+                self.tool(
+                    'deploy',
+                    '--function-name', self.__prefix,
+                    '--image-uri', '$IMAGE_URI',
+                    *promote_args
+                ),
+                *export_version_commands
+            ]
+        elif self.__functions is not None:
+            # Many functions share one dependency set. Only changed functions are built and deployed, in parallel.
+            build_commands = [
+                f'SITE_PACKAGES="$VENV_PATH/lib/{self.__python_version}/site-packages"',
+                self.tool(
+                    'monorepo',
+                    '--bucket', self.__bucket.bucket_name,
+                    '--prefix', self.__prefix,
+                    *[f'--function {name}={path}' for name, path in sorted(self.__functions.items())],
+                    *[f'--shared {path}' for path in self.__shared_paths],
+                    '--site-packages', '$SITE_PACKAGES',
+                    *(['--layered'] if packaging.layered else []),
+                    '--runtime', self.__python_version,
+                    '--architecture', self.__architecture,
+                    '--parallel', str(self.__parallel_builds),
+                    *compression_args,
+                    *slimming_args,
+                    *(['--alias', self.__alias_name] if self.__alias_name else [])
+                )
+            ]
+        else:
+            build_commands = [
+                'BUILD_PATH="/tmp/ivs-lambda-pack.zip"',
+                f'SITE_PACKAGES="$VENV_PATH/lib/{self.__python_version}/site-packages"',
+                self.tool(
+                    'packager',
+                    '--output', '$BUILD_PATH',
+                    '--report', '/tmp/ivs-lambda-size-report.json',
+                    *compression_args,
+                    *slimming_args,
+                    *package_sources
+                ),
+                *import_time_commands,
+                self.tool(
+                    'deploy',
+                    '--function-name', self.__prefix,
+                    '--bucket', self.__bucket.bucket_name,
+                    '--artifact', '$BUILD_PATH',
+                    '--commit', '$CODEBUILD_RESOLVED_SOURCE_VERSION',
+                    *layer_args,
+                    *promote_args
+                ),
+                *import_time_baseline_commands,
+                *export_version_commands
+            ]
+
+        # Sharded tests run in separate builds before this one. Once all of them passed,
+        # their test durations become the history, that the next split is balanced by.
+        if self.__test_shards > 1:
+            pre_build_commands = [
+                self.tool(
+                    'sharding', 'merge',
+                    '--total', str(self.__test_shards),
+                    '--timings-url', f's3://{self.__bucket.bucket_name}/{self.__prefix}-test-timings',
+                    '--source-version', '$CODEBUILD_RESOLVED_SOURCE_VERSION'
+                )
+            ]
+        else:
+            pre_build_commands = self.__custom_pre_build_commands + [
+                'chmod +x test.sh',
+                ' '.join(['./test.sh'] + self.__test_args)
+            ]
+
+        buildspec = {
+            'version': 0.2,
+            'phases': {
+                'install': {
+                    'commands': self.__install_commands()
+                },
+                'pre_build': {
+                    'commands': pre_build_commands
+                },
+                'build': {
+                    'commands': build_commands
+                },
+            }
+        }
+
+        if self.__load_test_params is not None:
+            buildspec['env'] = {
+                'exported-variables': ['DEPLOYED_VERSION']
+            }
+
+        return self.__add_cache(self.__add_timing(buildspec, 'build'))
+
+    def __add_timing(self, buildspec, stage: str):
+        # Every command is timed and the slowest steps are reported at the end of the build,
+        # along with phase and step duration metrics.
+        return instrument(buildspec, self.tool('timing', '--prefix', self.__prefix, '--stage', stage))
+
+    def __add_cache(self, buildspec):
+        if self.__cache_hash_files is not None:
+            buildspec['cache'] = {
+                'paths': [
+                    '/root/.cache/pip/**/*',
+                    '/tmp/lambda-tmpenv/**/*'
+                ]
+            }
+
+        return buildspec
@@ -1,18 +1,30 @@
+import os
 import re
 
+from typing import List, Optional
+
 from aws_ci_cd_lambda.lambda_alarms import LambdaAlarms
+from aws_ci_cd_lambda.lambda_warmer import LambdaWarmer
+from aws_ci_cd_lambda.parameters.alarm_parameters import AlarmParameters
+from aws_ci_cd_lambda.parameters.event_source_parameters import EventSourceParameters
 from aws_ci_cd_lambda.parameters.pipeline_parameters import PipelineParameters
 from aws_ci_cd_lambda.parameters.lambda_parameters import LambdaParameters
 from aws_ci_cd_lambda.parameters.vpc_parameters import VpcParameters
+from aws_ci_cd_lambda.shared_infrastructure import SharedInfrastructure
 from aws_ci_cd_lambda.custom.initial_commit import InitialCommit
 from aws_ci_cd_lambda.buildspec_object import BuildSpecObject
+from aws_ci_cd_lambda.build_tools.timing import NAMESPACE
 from aws_empty_bucket.empty_s3_bucket import EmptyS3Bucket
 from aws_cdk import (
     aws_codepipeline_actions,
     aws_codepipeline,
     aws_codecommit,
     aws_codebuild,
+    aws_codedeploy,
+    aws_cloudwatch,
+    aws_ecr,
     aws_lambda,
+    aws_s3_assets,
     aws_ec2,
     aws_iam,
     core
@@ -20,13 +32,17 @@ from aws_cdk import (
 
 
 class CiCdLambda:
+    ALIAS_NAME = 'live'
+
     def __init__(
             self,
             scope: core.Stack,
             prefix: str,
             pipeline_params: PipelineParameters,
             lambda_params: LambdaParameters,
-            vpc_params: VpcParameters
+            vpc_params: Optional[VpcParameters] = None,
+            event_source_params: Optional[List[EventSourceParameters]] = None,
+            shared_infrastructure: Optional[SharedInfrastructure] = None
     ):
         """
         AWS CDK package that helps deploying a lambda function.
@@ -35,7 +51,12 @@ class CiCdLambda:
         :param prefix: Prefix for all of your resource IDs and names.
         :param pipeline_params: Parameters, letting you supply ssh key for accessing remote repositories.
         :param lambda_params: Parameters, focusing on the Lambda function itself.
-        :param vpc_params: Parameters, focused on Virtual Private Cloud settings.
+        :param vpc_params: Parameters, focused on Virtual Private Cloud settings. Functions outside of a VPC start
+        faster and reach AWS services without a NAT gateway, hence only use it if the function needs private
+        resources. Optional
+        :param event_source_params: Parameters of SQS, Kinesis and DynamoDB stream event sources. Optional
+        :param shared_infrastructure: Artifacts bucket, build tools and roles shared with other pipelines
+        of the stack. Optional
         """
 
         # CodeCommmit repository to store your function source code.
@@ -44,101 +65,475 @@ class CiCdLambda:
             repository_name=prefix + 'CiCdLambdaCodeCommitRepo',
         )
 
-        # The lambda function for which this package is made.
-        self.function = aws_lambda.Function(
-            scope, prefix + 'Function',
-            code=aws_lambda.Code.from_inline(
-                'def runner():\n'
-                '    return \'Hello, World!\''
-            ),
-            handler=lambda_params.lambda_handler,
-            runtime=lambda_params.lambda_runtime,
+        # Options shared by zip package and container image functions.
+        function_options = dict(
             description=f'Lambda function {prefix}.',
             environment=lambda_params.environment,
             function_name=prefix,
             memory_size=lambda_params.lambda_memory,
-            reserved_concurrent_executions=5,
+            reserved_concurrent_executions=lambda_params.reserved_concurrency,
             role=lambda_params.execution_role,
-            security_groups=vpc_params.security_groups,
+            architecture=lambda_params.architecture,
+            security_groups=vpc_params.security_groups if vpc_params else None,
             timeout=core.Duration.seconds(lambda_params.lambda_timeout),
-            vpc=vpc_params.vpc,
-            vpc_subnets=aws_ec2.SubnetSelection(subnets=vpc_params.subnets)
+            vpc=vpc_params.vpc if vpc_params else None,
+            vpc_subnets=aws_ec2.SubnetSelection(subnets=vpc_params.subnets) if vpc_params else None
         )
 
-        # Create alarms for the function.
-        if lambda_params.alarms_sns_topic:
-            self.alarms = LambdaAlarms(scope, prefix, lambda_params.alarms_sns_topic, self.function)
+        # Endpoints keep AWS API calls of the function inside the VPC instead of going through NAT.
+        self.vpc_endpoints = vpc_params.endpoints if vpc_params else None
+
+        if self.vpc_endpoints is not None:
+            self.vpc_endpoints.allow_from(vpc_params.security_groups)
+
+        container_image = pipeline_params.container_image_params
+
+        # The lambda function for which this package is made.
+        if container_image is not None:
+            # Images are stored in a dedicated repository, which also serves as the docker layer cache.
+            self.image_repository = aws_ecr.Repository(
+                scope, prefix + 'CiCdLambdaImageRepository',
+                repository_name=self.__convert(prefix + 'CiCdLambdaImageRepository'),
+                lifecycle_rules=[aws_ecr.LifecycleRule(max_image_count=container_image.max_image_count)]
+            )
+
+            # A container image function can not be created without an image, hence an initial one is built here.
+            self.function = aws_lambda.DockerImageFunction(
+                scope, prefix + 'Function',
+                code=aws_lambda.DockerImageCode.from_image_asset(
+                    directory=os.path.join(os.path.dirname(os.path.realpath(__file__)), 'files'),
+                    file='container_image/Dockerfile',
+                    build_args={'PYTHON_VERSION': lambda_params.lambda_runtime.name[len('python'):]}
+                ),
+                **function_options
+            )
+        else:
+            self.image_repository = None
+
+            self.function = aws_lambda.Function(
+                scope, prefix + 'Function',
+                code=aws_lambda.Code.from_inline(
+                    'def runner():\n'
+                    '    return \'Hello, World!\''
+                ),
+                handler=lambda_params.lambda_handler,
+                runtime=lambda_params.lambda_runtime,
+                **function_options
+            )
+
+        # Provisioned concurrency, traffic shifting and load test gating are configured on an alias,
+        # which the pipeline moves to every new version.
+        provisioned_concurrency = lambda_params.provisioned_concurrency_params
+        traffic_shifting = pipeline_params.traffic_shifting_params
+        load_test = pipeline_params.load_test_params
+
+        if provisioned_concurrency is not None or traffic_shifting is not None or load_test is not None:
+            self.alias = aws_lambda.Alias(
+                scope, prefix + 'CiCdLambdaAlias',
+                alias_name=self.ALIAS_NAME,
+                version=self.function.current_version,
+                provisioned_concurrent_executions=provisioned_concurrency.min_capacity if provisioned_concurrency else None
+            )
+        else:
+            self.alias = None
+
+        if provisioned_concurrency is not None:
+            self.alias_scaling = self.alias.add_auto_scaling(
+                min_capacity=provisioned_concurrency.min_capacity,
+                max_capacity=provisioned_concurrency.max_capacity
+            )
+
+            self.alias_scaling.scale_on_utilization(utilization_target=provisioned_concurrency.utilization_target)
+
+            for action_id, schedule, min_capacity, max_capacity in provisioned_concurrency.scheduled_capacity:
+                self.alias_scaling.scale_on_schedule(
+                    action_id,
+                    schedule=schedule,
+                    min_capacity=min_capacity,
+                    max_capacity=max_capacity
+                )
+        else:
+            self.alias_scaling = None
+
+        # Warm the alias, if there is one, so instances of the promoted version are kept warm.
+        if lambda_params.warmer_params is not None:
+            self.warmer = LambdaWarmer(scope, prefix, self.function, lambda_params.warmer_params, target=self.alias)
+        else:
+            self.warmer = None
+
+        # Create alarms for the function. Traffic shifting rolls back on them.
+        event_source_params = event_source_params or []
+
+        alarm_params = lambda_params.alarm_params
+
+        # Rolling back on duration needs the p99 duration alarm, even if other alarms were not opted in.
+        if alarm_params is None and traffic_shifting is not None and traffic_shifting.rollback_on_duration:
+            alarm_params = AlarmParameters(
+                duration_p90_timeout_fraction=None,
+                concurrency_fraction=None,
+                create_dashboard=False
+            )
+
+        if lambda_params.alarms_sns_topic or alarm_params or traffic_shifting or event_source_params:
+            self.alarms = LambdaAlarms(
+                scope,
+                prefix,
+                lambda_params.alarms_sns_topic,
+                self.function,
+                lambda_timeout=lambda_params.lambda_timeout,
+                reserved_concurrency=lambda_params.reserved_concurrency,
+                alarm_params=alarm_params,
+                event_source_params=event_source_params
+            )
         else:
             self.alarms = None
 
-        # Convert bucket name to an S3 friendly one.
-        bucket_name = self.__convert(prefix + 'CiCdLambdaArtifactsBucket')
+        # Event sources invoke the alias, if there is one, so only promoted versions process events.
+        self.event_source_mappings = [
+            self.__create_event_source_mapping(scope, prefix + f'CiCdLambdaEventSource{index}', params)
+            for index, params in enumerate(event_source_params)
+        ]
+
+        # CodeDeploy shifts traffic of the alias to new versions and rolls back if alarms fire meanwhile.
+        if traffic_shifting is not None:
+            if traffic_shifting.strategy == 'all_at_once':
+                deployment_config = aws_codedeploy.LambdaDeploymentConfig.ALL_AT_ONCE
+            else:
+                if traffic_shifting.strategy == 'canary':
+                    traffic_routing = aws_codedeploy.CfnDeploymentConfig.TrafficRoutingConfigProperty(
+                        type='TimeBasedCanary',
+                        time_based_canary=aws_codedeploy.CfnDeploymentConfig.TimeBasedCanaryProperty(
+                            canary_percentage=traffic_shifting.percentage,
+                            canary_interval=traffic_shifting.interval_minutes
+                        )
+                    )
+                else:
+                    traffic_routing = aws_codedeploy.CfnDeploymentConfig.TrafficRoutingConfigProperty(
+                        type='TimeBasedLinear',
+                        time_based_linear=aws_codedeploy.CfnDeploymentConfig.TimeBasedLinearProperty(
+                            linear_percentage=traffic_shifting.percentage,
+                            linear_interval=traffic_shifting.interval_minutes
+                        )
+                    )
+
+                self.deployment_config = aws_codedeploy.CfnDeploymentConfig(
+                    scope, prefix + 'CiCdLambdaDeploymentConfig',
+                    deployment_config_name=prefix + 'CiCdLambdaDeploymentConfig',
+                    compute_platform='Lambda',
+                    traffic_routing_config=traffic_routing
+                )
+
+                deployment_config = aws_codedeploy.LambdaDeploymentConfig.import_(
+                    scope, prefix + 'CiCdLambdaImportedDeploymentConfig',
+                    deployment_config_name=self.deployment_config.ref
+                )
+
+            rollback_alarms = list(traffic_shifting.alarms)
+
+            if traffic_shifting.rollback_on_errors:
+                rollback_alarms.append(aws_cloudwatch.Alarm.from_alarm_arn(
+                    scope, prefix + 'CiCdLambdaRollbackErrorsAlarm', self.alarms.errors_alarm.attr_arn
+                ))
+
+            if traffic_shifting.rollback_on_duration and self.alarms.duration_p99_alarm is not None:
+                rollback_alarms.append(aws_cloudwatch.Alarm.from_alarm_arn(
+                    scope, prefix + 'CiCdLambdaRollbackDurationAlarm', self.alarms.duration_p99_alarm.attr_arn
+                ))
+
+            self.deployment_group = aws_codedeploy.LambdaDeploymentGroup(
+                scope, prefix + 'CiCdLambdaDeploymentGroup',
+                deployment_group_name=prefix + 'CiCdLambdaDeploymentGroup',
+                alias=self.alias,
+                deployment_config=deployment_config,
+                alarms=rollback_alarms,
+                auto_rollback=aws_codedeploy.AutoRollbackConfig(
+                    failed_deployment=True,
+                    stopped_deployment=True,
+                    deployment_in_alarm=bool(rollback_alarms)
+                )
+            )
+        else:
+            self.deployment_group = None
+
+        retention_params = pipeline_params.retention_params
+
+        if shared_infrastructure is not None:
+            self.__check_shared_grants(shared_infrastructure, pipeline_params)
+
+            self.bucket = shared_infrastructure.bucket
+            self.build_tools = shared_infrastructure.build_tools
+        else:
+            # Convert bucket name to an S3 friendly one.
+            bucket_name = self.__convert(prefix + 'CiCdLambdaArtifactsBucket')
 
-        self.bucket = EmptyS3Bucket(
-            scope, prefix + 'CiCdLambdaDeploymentBucket',
-            bucket_name=bucket_name
+            self.bucket = EmptyS3Bucket(
+                scope, prefix + 'CiCdLambdaDeploymentBucket',
+                bucket_name=bucket_name
+            )
+
+            # Deployment packages are content-addressed and refreshed on every deploy (see build_tools/artifacts.py),
+            # hence age based expiration removes only packages, that are no longer deployed.
+            for rule_prefix in ['artifacts/', 'manifests/']:
+                self.bucket.add_lifecycle_rule(
+                    prefix=rule_prefix,
+                    expiration=core.Duration.days(retention_params.artifact_retention_days),
+                    abort_incomplete_multipart_upload_after=core.Duration.days(1)
+                )
+
+            # Build tools (packager, etc.), that CodeBuild downloads and runs during the build.
+            self.build_tools = aws_s3_assets.Asset(
+                scope, prefix + 'CiCdLambdaBuildTools',
+                path=os.path.join(os.path.dirname(os.path.realpath(__file__)), 'build_tools'),
+                exclude=['__pycache__', '*.pyc']
+            )
+
+        # CodePipeline stores artifacts under the pipeline name, truncated to 20 characters.
+        self.bucket.add_lifecycle_rule(
+            prefix=(prefix + 'CiCdLambdaPipeline')[:20] + '/',
+            expiration=core.Duration.days(retention_params.pipeline_artifact_retention_days)
         )
 
+        # Projects of pipelines, that share infrastructure, also share one CodeBuild role.
+        build_role = shared_infrastructure.build_role if shared_infrastructure else None
+
+        cache_params = pipeline_params.cache_params
+        packaging_params = pipeline_params.packaging_params
+        wheelhouse_params = pipeline_params.wheelhouse_params
+
         # Create a BuildSpec object for CodeBuild
         self.buildspec = BuildSpecObject(
             prefix,
             self.bucket,
+            self.build_tools,
             pipeline_params.ssh_params.secret_id,
             pipeline_params.ssh_params.private_key,
             pipeline_params.install_args,
             pipeline_params.test_args,
-            pipeline_params.custom_pre_build_commands
+            pipeline_params.custom_pre_build_commands,
+            cache_hash_files=cache_params.hash_files if cache_params else None,
+            packaging_params=packaging_params,
+            import_time_params=pipeline_params.import_time_params,
+            lambda_handler=lambda_params.lambda_handler,
+            alias_name=self.alias.alias_name if self.alias else None,
+            python_version=lambda_params.lambda_runtime.name,
+            architecture=lambda_params.architecture.name,
+            wheelhouse_url=(
+                f's3://{wheelhouse_params.bucket.bucket_name}/{wheelhouse_params.prefix}' if wheelhouse_params else None
+            ),
+            test_shards=pipeline_params.test_shards,
+            deployment_application=(
+                self.deployment_group.application.application_name if self.deployment_group else None
+            ),
+            deployment_group=self.deployment_group.deployment_group_name if self.deployment_group else None,
+            load_test_params=pipeline_params.load_test_params,
+            image_repository_uri=self.image_repository.repository_uri if self.image_repository else None,
+            lock_files=container_image.lock_files if container_image else None
         )
 
+        # Cache for dependencies, that are reused between builds.
+        if cache_params is None:
+            cache = None
+        elif cache_params.bucket is not None:
+            cache = aws_codebuild.Cache.bucket(cache_params.bucket, prefix=cache_params.bucket_prefix)
+        else:
+            cache = aws_codebuild.Cache.local(aws_codebuild.LocalCacheMode.CUSTOM)
+
+        # Native dependencies must be built on the same architecture as the function runs on.
+        # CodeBuild ARM containers require a large compute type.
+        if lambda_params.architecture.name == aws_lambda.Architecture.ARM_64.name:
+            build_image = pipeline_params.build_image or aws_codebuild.LinuxBuildImage.AMAZON_LINUX_2_ARM
+            compute_type = pipeline_params.build_compute_type or aws_codebuild.ComputeType.LARGE
+        else:
+            build_image = pipeline_params.build_image or aws_codebuild.LinuxBuildImage.STANDARD_3_0
+            compute_type = pipeline_params.build_compute_type or aws_codebuild.ComputeType.SMALL
+
         # CodeBuild project, that installs functions dependencies, runs tests and deploys it to Lambda.
         self.code_build_project = aws_codebuild.PipelineProject(
             scope, prefix + 'CiCdLambdaCodeBuildProject',
             project_name=prefix + 'CiCdLambdaCodeBuildProject',
+            role=build_role,
             environment=aws_codebuild.BuildEnvironment(
-                build_image=aws_codebuild.LinuxBuildImage.STANDARD_3_0,
-                compute_type=aws_codebuild.ComputeType.SMALL,
+                build_image=build_image,
+                compute_type=compute_type,
                 privileged=True
             ),
             build_spec=aws_codebuild.BuildSpec.from_object(self.buildspec.get_object()),
+            cache=cache
         )
 
+        # CodeBuild project, that runs a shard of tests. Its actions run in parallel before the deploy build.
+        if pipeline_params.test_shards > 1:
+            self.test_project = aws_codebuild.PipelineProject(
+                scope, prefix + 'CiCdLambdaTestProject',
+                project_name=prefix + 'CiCdLambdaTestProject',
+                role=build_role,
+                environment=aws_codebuild.BuildEnvironment(
+                    build_image=build_image,
+                    compute_type=compute_type,
+                    privileged=True
+                ),
+                build_spec=aws_codebuild.BuildSpec.from_object(self.buildspec.get_test_object()),
+                cache=cache
+            )
+
+            # Test shards store their test durations in the artifacts bucket.
+            self.bucket.grant_read_write(self.test_project.role)
+        else:
+            self.test_project = None
+
+        # CodeBuild project, that load tests the published version and then promotes it.
+        if pipeline_params.load_test_params is not None:
+            self.load_test_project = aws_codebuild.PipelineProject(
+                scope, prefix + 'CiCdLambdaLoadTestProject',
+                project_name=prefix + 'CiCdLambdaLoadTestProject',
+                role=build_role,
+                environment=aws_codebuild.BuildEnvironment(
+                    build_image=build_image,
+                    compute_type=compute_type
+                ),
+                build_spec=aws_codebuild.BuildSpec.from_object(self.buildspec.get_load_test_object())
+            )
+
+            # The load test invokes the function and stores results in the artifacts bucket.
+            self.function.grant_invoke(self.load_test_project.role)
+            self.bucket.grant_read_write(self.load_test_project.role)
+            self.build_tools.grant_read(self.load_test_project.role)
+
+            # Unchanged code is re-published to find its version.
+            self.code_build_project.role.add_to_policy(
+                statement=aws_iam.PolicyStatement(
+                    actions=['lambda:PublishVersion'],
+                    resources=['*'],
+                    effect=aws_iam.Effect.ALLOW)
+            )
+        else:
+            self.load_test_project = None
+
+        build_roles = [project.role for project in [self.code_build_project, self.test_project] if project]
+
+        # Roles, that promote new versions to the alias.
+        promote_roles = [project.role for project in [self.code_build_project, self.load_test_project] if project]
+
         # Adding permissions that allow CodeBuild to do the aforementioned things.
         self.code_build_project.role.add_to_policy(
             statement=aws_iam.PolicyStatement(
                 actions=[
                     's3:*',
                     'lambda:UpdateFunctionCode',
+                    'lambda:GetFunctionConfiguration',
                 ],
                 resources=['*'],
                 effect=aws_iam.Effect.ALLOW)
         )
 
-        # If a secret is provided, we allow CodeBuild to read it.
-        if pipeline_params.ssh_params.secret_arn is not None:
+        # In layered mode CodeBuild publishes dependency layers and attaches them to the function.
+        if packaging_params.layered:
             self.code_build_project.role.add_to_policy(
                 statement=aws_iam.PolicyStatement(
                     actions=[
-                        'secretsmanager:GetSecretValue'
+                        'lambda:PublishLayerVersion',
+                        'lambda:ListLayerVersions',
+                        'lambda:GetLayerVersion',
+                        'lambda:UpdateFunctionConfiguration',
+                        'lambda:PublishVersion',
                     ],
-                    resources=[pipeline_params.ssh_params.secret_arn],
+                    resources=['*'],
                     effect=aws_iam.Effect.ALLOW)
             )
 
-        # If KMS key is provided, we allow CodeBuild to decrypt using it.
-        if pipeline_params.ssh_params.kms_key_arn is not None:
+        # CodeBuild pushes images and points the function to them. Lambda checks, that the caller can pull the image.
+        if self.image_repository is not None:
+            self.image_repository.grant_pull_push(self.code_build_project.role)
             self.code_build_project.role.add_to_policy(
                 statement=aws_iam.PolicyStatement(
                     actions=[
-                        "kms:Decrypt"
+                        'ecr:GetRepositoryPolicy',
+                        'ecr:SetRepositoryPolicy',
                     ],
-                    effect=aws_iam.Effect.ALLOW,
-                    resources=[pipeline_params.ssh_params.kms_key_arn]
+                    resources=[self.image_repository.repository_arn],
+                    effect=aws_iam.Effect.ALLOW)
+            )
+
+        for role in promote_roles:
+            # CodeBuild moves the alias to every newly deployed version. Unchanged code is re-published to find
+            # its version, in case a previous build deployed it, but failed to move the alias.
+            if self.alias is not None:
+                role.add_to_policy(
+                    statement=aws_iam.PolicyStatement(
+                        actions=[
+                            'lambda:UpdateAlias',
+                            'lambda:GetAlias',
+                            'lambda:PublishVersion',
+                        ],
+                        resources=['*'],
+                        effect=aws_iam.Effect.ALLOW)
+                )
+
+            # CodeBuild starts CodeDeploy deployments, that shift traffic to new versions.
+            if self.deployment_group is not None:
+                role.add_to_policy(
+                    statement=aws_iam.PolicyStatement(
+                        actions=[
+                            'codedeploy:CreateDeployment',
+                            'codedeploy:GetDeployment',
+                            'codedeploy:GetDeploymentConfig',
+                            'codedeploy:GetApplicationRevision',
+                            'codedeploy:RegisterApplicationRevision',
+                        ],
+                        resources=['*'],
+                        effect=aws_iam.Effect.ALLOW)
+                )
+
+        # Permissions shared by the deploy build and test shards.
+        for role in build_roles:
+            # CodeBuild reads pre-built wheels from the shared wheelhouse and pushes newly built ones.
+            if wheelhouse_params is not None:
+                wheelhouse_params.bucket.grant_read_write(
+                    role,
+                    objects_key_pattern=f'{wheelhouse_params.prefix}/*'
+                )
+
+            # Allow CodeBuild to download build tools.
+            self.build_tools.grant_read(role)
+
+            # If a secret is provided, we allow CodeBuild to read it.
+            if pipeline_params.ssh_params.secret_arn is not None:
+                role.add_to_policy(
+                    statement=aws_iam.PolicyStatement(
+                        actions=[
+                            'secretsmanager:GetSecretValue'
+                        ],
+                        resources=[pipeline_params.ssh_params.secret_arn],
+                        effect=aws_iam.Effect.ALLOW)
                 )
+
+            # If KMS key is provided, we allow CodeBuild to decrypt using it.
+            if pipeline_params.ssh_params.kms_key_arn is not None:
+                role.add_to_policy(
+                    statement=aws_iam.PolicyStatement(
+                        actions=[
+                            "kms:Decrypt"
+                        ],
+                        effect=aws_iam.Effect.ALLOW,
+                        resources=[pipeline_params.ssh_params.kms_key_arn]
+                    )
+                )
+
+        # Every build publishes durations of its phases and steps (see build_tools/timing.py).
+        for role in dict.fromkeys(build_roles + promote_roles):
+            role.add_to_policy(
+                statement=aws_iam.PolicyStatement(
+                    actions=['cloudwatch:PutMetricData'],
+                    resources=['*'],
+                    conditions={'StringEquals': {'cloudwatch:namespace': NAMESPACE}},
+                    effect=aws_iam.Effect.ALLOW)
             )
 
         # Push hte initial commit to CodeCommit.
         self.initial_commit = InitialCommit(
-            scope, prefix, self.project_repository
+            scope, prefix, self.project_repository,
+            role=shared_infrastructure.custom_resource_role if shared_infrastructure else None,
+            template_path=pipeline_params.template_path
         ).get_resource()
 
         self.source_artifact = aws_codepipeline.Artifact(artifact_name=prefix + 'CiCdLambdaSourceArtifact')
@@ -153,15 +548,44 @@ class CiCdLambda:
             output=self.source_artifact
         )
 
+        # CodePipeline test actions, one per shard, that run in parallel.
+        self.test_actions = [
+            aws_codepipeline_actions.CodeBuildAction(
+                input=self.source_artifact,
+                project=self.test_project,
+                action_name=f'TestShard{index + 1}',
+                run_order=1,
+                environment_variables={
+                    'SHARD_INDEX': aws_codebuild.BuildEnvironmentVariable(value=str(index)),
+                    'SHARD_TOTAL': aws_codebuild.BuildEnvironmentVariable(value=str(pipeline_params.test_shards)),
+                }
+            )
+            for index in range(pipeline_params.test_shards)
+        ] if self.test_project else []
+
         # CodePipeline build action that uses the CodeBuild project.
         self.build_action = aws_codepipeline_actions.CodeBuildAction(
             input=self.source_artifact,
             project=self.code_build_project,
             action_name='BuildAction',
-            run_order=1
+            run_order=1,
+            variables_namespace='BuildVariables' if self.load_test_project else None
         )
 
-        # CodePipeline pipeline that executes both actions.
+        # CodePipeline load test action, that tests and promotes the version published by the build action.
+        self.load_test_action = aws_codepipeline_actions.CodeBuildAction(
+            input=self.source_artifact,
+            project=self.load_test_project,
+            action_name='LoadTestAction',
+            run_order=1,
+            environment_variables={
+                'FUNCTION_VERSION': aws_codebuild.BuildEnvironmentVariable(
+                    value=self.build_action.variable('DEPLOYED_VERSION')
+                )
+            }
+        ) if self.load_test_project else None
+
+        # CodePipeline pipeline that executes all actions. The deploy build starts only once all test shards pass.
         self.codecommit_to_lambda_pipeline = aws_codepipeline.Pipeline(
             scope,
             prefix + 'CiCdLambdaPipeline',
@@ -172,13 +596,125 @@ class CiCdLambda:
                     stage_name='SourceStage',
                     actions=[self.source_action]
                 ),
+                *([aws_codepipeline.StageProps(
+                    stage_name='TestStage',
+                    actions=self.test_actions
+                )] if self.test_actions else []),
                 aws_codepipeline.StageProps(
                     stage_name='BuildStage',
                     actions=[self.build_action]
-                )
+                ),
+                *([aws_codepipeline.StageProps(
+                    stage_name='LoadTestStage',
+                    actions=[self.load_test_action]
+                )] if self.load_test_action else [])
+            ]
+        )
+
+    def __create_event_source_mapping(
+            self,
+            scope: core.Stack,
+            construct_id: str,
+            params: EventSourceParameters
+    ) -> aws_lambda.CfnEventSourceMapping:
+        """
+        Creates an event source mapping and allows the function to read from the source.
+        """
+        stream = params.source_type != 'sqs'
+
+        if params.source_type == 'sqs':
+            actions = [
+                'sqs:ReceiveMessage',
+                'sqs:DeleteMessage',
+                'sqs:ChangeMessageVisibility',
+                'sqs:GetQueueAttributes',
+            ]
+        elif params.source_type == 'kinesis':
+            actions = [
+                'kinesis:DescribeStream',
+                'kinesis:DescribeStreamSummary',
+                'kinesis:GetRecords',
+                'kinesis:GetShardIterator',
+                'kinesis:ListShards',
+                'kinesis:SubscribeToShard',
+            ]
+        else:
+            actions = [
+                'dynamodb:DescribeStream',
+                'dynamodb:GetRecords',
+                'dynamodb:GetShardIterator',
+                'dynamodb:ListStreams',
             ]
+
+        self.function.add_to_role_policy(
+            aws_iam.PolicyStatement(
+                actions=actions,
+                resources=[params.source_arn],
+                effect=aws_iam.Effect.ALLOW
+            )
+        )
+
+        mapping = aws_lambda.CfnEventSourceMapping(
+            scope, construct_id,
+            function_name=self.alias.function_arn if self.alias else self.function.function_name,
+            event_source_arn=params.source_arn,
+            batch_size=params.batch_size,
+            maximum_batching_window_in_seconds=params.max_batching_window_seconds,
+            parallelization_factor=params.parallelization_factor if stream else None,
+            bisect_batch_on_function_error=params.bisect_batch_on_error if stream else None,
+            maximum_retry_attempts=params.maximum_retry_attempts if stream else None,
+            starting_position=params.starting_position if stream else None,
+            function_response_types=['ReportBatchItemFailures'] if params.report_batch_item_failures else None
         )
 
+        # Maximum concurrency of SQS sources is newer than some supported CDK versions, hence it is set directly.
+        if params.maximum_concurrency is not None:
+            mapping.add_property_override('ScalingConfig.MaximumConcurrency', params.maximum_concurrency)
+
+        # The function can not read events before the role allows it.
+        if self.function.role is not None:
+            mapping.node.add_dependency(self.function.role)
+
+        return mapping
+
+    @staticmethod
+    def __check_shared_grants(shared_infrastructure: SharedInfrastructure, pipeline_params: PipelineParameters) -> None:
+        """
+        The shared CodeBuild role drops permissions, that pipelines add to it. Resources of the pipeline, which
+        CodeBuild needs access to, must have been granted when the shared infrastructure was created.
+        Otherwise synthesis would succeed and builds would fail with AccessDenied.
+        """
+        ssh_params = pipeline_params.ssh_params
+        shared_ssh = shared_infrastructure.ssh_params
+        wheelhouse = pipeline_params.wheelhouse_params
+        shared_wheelhouse = shared_infrastructure.wheelhouse_params
+        cache = pipeline_params.cache_params
+        shared_cache = shared_infrastructure.cache_params
+
+        if ssh_params.secret_arn is not None:
+            message = 'The ssh key secret must be given to SharedInfrastructure (ssh_params).'
+            assert shared_ssh is not None and shared_ssh.secret_arn == ssh_params.secret_arn, message
+
+        if ssh_params.kms_key_arn is not None:
+            message = 'The ssh key KMS key must be given to SharedInfrastructure (ssh_params).'
+            assert shared_ssh is not None and shared_ssh.kms_key_arn == ssh_params.kms_key_arn, message
+
+        if wheelhouse is not None:
+            message = 'The wheelhouse must be given to SharedInfrastructure (wheelhouse_params).'
+            assert (
+                shared_wheelhouse is not None
+                and shared_wheelhouse.bucket is wheelhouse.bucket
+                and shared_wheelhouse.prefix == wheelhouse.prefix
+            ), message
+
+        if cache is not None and cache.bucket is not None:
+            message = 'The cache bucket must be given to SharedInfrastructure (cache_params).'
+            assert (
+                shared_cache is not None
+                and shared_cache.bucket is cache.bucket
+                and shared_cache.bucket_prefix == cache.bucket_prefix
+            ), message
+
     @staticmethod
     def __convert(name: str) -> str:
         """
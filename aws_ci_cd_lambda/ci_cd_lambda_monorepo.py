@@ -0,0 +1,375 @@
+import os
+import re
+
+from typing import Dict, List, Optional
+from aws_ci_cd_lambda.lambda_alarms import LambdaAlarms
+from aws_ci_cd_lambda.lambda_warmer import LambdaWarmer
+from aws_ci_cd_lambda.parameters.monorepo_function_parameters import MonorepoFunctionParameters
+from aws_ci_cd_lambda.parameters.pipeline_parameters import PipelineParameters
+from aws_ci_cd_lambda.parameters.vpc_parameters import VpcParameters
+from aws_ci_cd_lambda.custom.initial_commit import InitialCommit
+from aws_ci_cd_lambda.buildspec_object import BuildSpecObject
+from aws_ci_cd_lambda.build_tools.timing import NAMESPACE
+from aws_empty_bucket.empty_s3_bucket import EmptyS3Bucket
+from aws_cdk import (
+    aws_codepipeline_actions,
+    aws_codepipeline,
+    aws_codecommit,
+    aws_codebuild,
+    aws_lambda,
+    aws_s3_assets,
+    aws_ec2,
+    aws_iam,
+    core
+)
+
+
+class CiCdLambdaMonorepo:
+    ALIAS_NAME = 'live'
+
+    def __init__(
+            self,
+            scope: core.Stack,
+            prefix: str,
+            pipeline_params: PipelineParameters,
+            function_params: List[MonorepoFunctionParameters],
+            vpc_params: Optional[VpcParameters] = None,
+            shared_paths: Optional[List[str]] = None,
+            parallel_builds: int = 4
+    ):
+        """
+        AWS CDK package that helps deploying many lambda functions from a single repository.
+        One repository, one CodeBuild project and one pipeline serve all functions. Dependencies are installed
+        once by the repository's install.sh script and are shared by all functions. Each build deploys only
+        the functions, whose source paths changed since the last deployed commit.
+
+        :param scope: A scope in which resources shall be created.
+        :param prefix: Prefix for all of your resource IDs and names.
+        :param pipeline_params: Parameters, letting you supply ssh key for accessing remote repositories.
+        Its retention_params set how long deployment packages, manifests and pipeline artifacts are kept.
+        :param function_params: Parameters of every function in the repository.
+        :param vpc_params: Parameters, focused on Virtual Private Cloud settings. Functions outside of a VPC start
+        faster and reach AWS services without a NAT gateway, hence only use it if the function needs private
+        resources. Optional
+        :param shared_paths: Code directories, relative to the repository root, that are packaged into every function.
+        A change outside of all function source paths rebuilds all functions. Optional
+        :param parallel_builds: Number of functions packaged and deployed at the same time.
+        """
+        assert function_params, 'At least one function must be given.'
+        assert pipeline_params.test_shards == 1, 'Sharded tests are not supported for many functions.'
+        assert pipeline_params.traffic_shifting_params is None, 'Traffic shifting is not supported for many functions.'
+        assert pipeline_params.load_test_params is None, 'Load tests are not supported for many functions.'
+        assert pipeline_params.container_image_params is None, 'Container images are not supported for many functions.'
+        assert len({function.name for function in function_params}) == len(function_params), 'Names must be unique.'
+
+        runtimes = {function.lambda_params.lambda_runtime.name for function in function_params}
+        architectures = {function.lambda_params.architecture.name for function in function_params}
+
+        # Functions share one set of installed dependencies, hence one runtime and architecture.
+        assert len(runtimes) == 1, 'All functions must use the same runtime.'
+        assert len(architectures) == 1, 'All functions must use the same architecture.'
+
+        runtime = runtimes.pop()
+        architecture = architectures.pop()
+
+        # CodeCommmit repository to store source code of all functions.
+        self.project_repository = aws_codecommit.Repository(
+            scope, prefix + 'CiCdLambdaCodeCommitRepo',
+            repository_name=prefix + 'CiCdLambdaCodeCommitRepo',
+        )
+
+        # Endpoints keep AWS API calls of the functions inside the VPC instead of going through NAT.
+        self.vpc_endpoints = vpc_params.endpoints if vpc_params else None
+
+        if self.vpc_endpoints is not None:
+            self.vpc_endpoints.allow_from(vpc_params.security_groups)
+
+        self.functions: Dict[str, aws_lambda.Function] = {}
+        self.aliases: Dict[str, aws_lambda.Alias] = {}
+        self.alarms: Dict[str, LambdaAlarms] = {}
+        self.warmers: Dict[str, LambdaWarmer] = {}
+
+        for function_param in function_params:
+            name = function_param.name
+            lambda_params = function_param.lambda_params
+            provisioned_concurrency = lambda_params.provisioned_concurrency_params
+
+            self.functions[name] = aws_lambda.Function(
+                scope, prefix + name + 'Function',
+                code=aws_lambda.Code.from_inline(
+                    'def runner():\n'
+                    '    return \'Hello, World!\''
+                ),
+                handler=lambda_params.lambda_handler,
+                runtime=lambda_params.lambda_runtime,
+                description=f'Lambda function {prefix + name}.',
+                environment=lambda_params.environment,
+                function_name=prefix + name,
+                memory_size=lambda_params.lambda_memory,
+                reserved_concurrent_executions=lambda_params.reserved_concurrency,
+                role=lambda_params.execution_role,
+                architecture=lambda_params.architecture,
+                security_groups=vpc_params.security_groups if vpc_params else None,
+                timeout=core.Duration.seconds(lambda_params.lambda_timeout),
+                vpc=vpc_params.vpc if vpc_params else None,
+                vpc_subnets=aws_ec2.SubnetSelection(subnets=vpc_params.subnets) if vpc_params else None
+            )
+
+            # The pipeline moves the alias of every function to its newly deployed version.
+            self.aliases[name] = aws_lambda.Alias(
+                scope, prefix + name + 'CiCdLambdaAlias',
+                alias_name=self.ALIAS_NAME,
+                version=self.functions[name].current_version,
+                provisioned_concurrent_executions=provisioned_concurrency.min_capacity if provisioned_concurrency else None
+            )
+
+            if provisioned_concurrency is not None:
+                alias_scaling = self.aliases[name].add_auto_scaling(
+                    min_capacity=provisioned_concurrency.min_capacity,
+                    max_capacity=provisioned_concurrency.max_capacity
+                )
+
+                alias_scaling.scale_on_utilization(utilization_target=provisioned_concurrency.utilization_target)
+
+                for action_id, schedule, min_capacity, max_capacity in provisioned_concurrency.scheduled_capacity:
+                    alias_scaling.scale_on_schedule(
+                        action_id,
+                        schedule=schedule,
+                        min_capacity=min_capacity,
+                        max_capacity=max_capacity
+                    )
+
+            if lambda_params.warmer_params is not None:
+                self.warmers[name] = LambdaWarmer(
+                    scope,
+                    prefix + name,
+                    self.functions[name],
+                    lambda_params.warmer_params,
+                    target=self.aliases[name]
+                )
+
+            if lambda_params.alarms_sns_topic or lambda_params.alarm_params:
+                self.alarms[name] = LambdaAlarms(
+                    scope,
+                    prefix + name,
+                    lambda_params.alarms_sns_topic,
+                    self.functions[name],
+                    lambda_timeout=lambda_params.lambda_timeout,
+                    reserved_concurrency=lambda_params.reserved_concurrency,
+                    alarm_params=lambda_params.alarm_params
+                )
+
+        # Convert bucket name to an S3 friendly one.
+        bucket_name = self.__convert(prefix + 'CiCdLambdaArtifactsBucket')
+
+        self.bucket = EmptyS3Bucket(
+            scope, prefix + 'CiCdLambdaDeploymentBucket',
+            bucket_name=bucket_name
+        )
+
+        retention_params = pipeline_params.retention_params
+
+        # Deployment packages are content-addressed and refreshed on every deploy (see build_tools/artifacts.py),
+        # hence age based expiration removes only packages, that are no longer deployed.
+        for rule_prefix in ['artifacts/', 'manifests/']:
+            self.bucket.add_lifecycle_rule(
+                prefix=rule_prefix,
+                expiration=core.Duration.days(retention_params.artifact_retention_days),
+                abort_incomplete_multipart_upload_after=core.Duration.days(1)
+            )
+
+        # CodePipeline stores artifacts under the pipeline name, truncated to 20 characters.
+        self.bucket.add_lifecycle_rule(
+            prefix=(prefix + 'CiCdLambdaPipeline')[:20] + '/',
+            expiration=core.Duration.days(retention_params.pipeline_artifact_retention_days)
+        )
+
+        # Build tools (packager, etc.), that CodeBuild downloads and runs during the build.
+        self.build_tools = aws_s3_assets.Asset(
+            scope, prefix + 'CiCdLambdaBuildTools',
+            path=os.path.join(os.path.dirname(os.path.realpath(__file__)), 'build_tools'),
+            exclude=['__pycache__', '*.pyc']
+        )
+
+        cache_params = pipeline_params.cache_params
+        packaging_params = pipeline_params.packaging_params
+        wheelhouse_params = pipeline_params.wheelhouse_params
+
+        # Create a BuildSpec object for CodeBuild
+        self.buildspec = BuildSpecObject(
+            prefix,
+            self.bucket,
+            self.build_tools,
+            pipeline_params.ssh_params.secret_id,
+            pipeline_params.ssh_params.private_key,
+            pipeline_params.install_args,
+            pipeline_params.test_args,
+            pipeline_params.custom_pre_build_commands,
+            cache_hash_files=cache_params.hash_files if cache_params else None,
+            packaging_params=packaging_params,
+            alias_name=self.ALIAS_NAME,
+            python_version=runtime,
+            architecture=architecture,
+            wheelhouse_url=(
+                f's3://{wheelhouse_params.bucket.bucket_name}/{wheelhouse_params.prefix}' if wheelhouse_params else None
+            ),
+            functions={function.name: function.source_path for function in function_params},
+            shared_paths=shared_paths,
+            parallel_builds=parallel_builds
+        )
+
+        # Cache for dependencies, that are reused between builds.
+        if cache_params is None:
+            cache = None
+        elif cache_params.bucket is not None:
+            cache = aws_codebuild.Cache.bucket(cache_params.bucket, prefix=cache_params.bucket_prefix)
+        else:
+            cache = aws_codebuild.Cache.local(aws_codebuild.LocalCacheMode.CUSTOM)
+
+        # Native dependencies must be built on the same architecture as the functions run on.
+        # CodeBuild ARM containers require a large compute type.
+        if architecture == aws_lambda.Architecture.ARM_64.name:
+            build_image = pipeline_params.build_image or aws_codebuild.LinuxBuildImage.AMAZON_LINUX_2_ARM
+            compute_type = pipeline_params.build_compute_type or aws_codebuild.ComputeType.LARGE
+        else:
+            build_image = pipeline_params.build_image or aws_codebuild.LinuxBuildImage.STANDARD_3_0
+            compute_type = pipeline_params.build_compute_type or aws_codebuild.ComputeType.SMALL
+
+        # CodeBuild project, that installs shared dependencies, runs tests and deploys changed functions to Lambda.
+        self.code_build_project = aws_codebuild.PipelineProject(
+            scope, prefix + 'CiCdLambdaCodeBuildProject',
+            project_name=prefix + 'CiCdLambdaCodeBuildProject',
+            environment=aws_codebuild.BuildEnvironment(
+                build_image=build_image,
+                compute_type=compute_type,
+                privileged=True
+            ),
+            build_spec=aws_codebuild.BuildSpec.from_object(self.buildspec.get_object()),
+            cache=cache
+        )
+
+        # Adding permissions that allow CodeBuild to do the aforementioned things.
+        self.code_build_project.role.add_to_policy(
+            statement=aws_iam.PolicyStatement(
+                actions=[
+                    's3:*',
+                    'lambda:UpdateFunctionCode',
+                    'lambda:GetFunctionConfiguration',
+                    'lambda:UpdateAlias',
+                    'lambda:GetAlias',
+                    'lambda:PublishVersion',
+                ],
+                resources=['*'],
+                effect=aws_iam.Effect.ALLOW)
+        )
+
+        # In layered mode CodeBuild publishes a shared dependency layer and attaches it to the functions.
+        if packaging_params.layered:
+            self.code_build_project.role.add_to_policy(
+                statement=aws_iam.PolicyStatement(
+                    actions=[
+                        'lambda:PublishLayerVersion',
+                        'lambda:ListLayerVersions',
+                        'lambda:GetLayerVersion',
+                        'lambda:UpdateFunctionConfiguration',
+                    ],
+                    resources=['*'],
+                    effect=aws_iam.Effect.ALLOW)
+            )
+
+        # CodeBuild reads pre-built wheels from the shared wheelhouse and pushes newly built ones.
+        if wheelhouse_params is not None:
+            wheelhouse_params.bucket.grant_read_write(
+                self.code_build_project.role,
+                objects_key_pattern=f'{wheelhouse_params.prefix}/*'
+            )
+
+        # Allow CodeBuild to download build tools.
+        self.build_tools.grant_read(self.code_build_project.role)
+
+        # The build publishes durations of its phases and steps (see build_tools/timing.py).
+        self.code_build_project.role.add_to_policy(
+            statement=aws_iam.PolicyStatement(
+                actions=['cloudwatch:PutMetricData'],
+                resources=['*'],
+                conditions={'StringEquals': {'cloudwatch:namespace': NAMESPACE}},
+                effect=aws_iam.Effect.ALLOW)
+        )
+
+        # If a secret is provided, we allow CodeBuild to read it.
+        if pipeline_params.ssh_params.secret_arn is not None:
+            self.code_build_project.role.add_to_policy(
+                statement=aws_iam.PolicyStatement(
+                    actions=[
+                        'secretsmanager:GetSecretValue'
+                    ],
+                    resources=[pipeline_params.ssh_params.secret_arn],
+                    effect=aws_iam.Effect.ALLOW)
+            )
+
+        # If KMS key is provided, we allow CodeBuild to decrypt using it.
+        if pipeline_params.ssh_params.kms_key_arn is not None:
+            self.code_build_project.role.add_to_policy(
+                statement=aws_iam.PolicyStatement(
+                    actions=[
+                        "kms:Decrypt"
+                    ],
+                    effect=aws_iam.Effect.ALLOW,
+                    resources=[pipeline_params.ssh_params.kms_key_arn]
+                )
+            )
+
+        # Push the initial commit to CodeCommit.
+        self.initial_commit = InitialCommit(
+            scope, prefix, self.project_repository,
+            template_path=pipeline_params.template_path
+        ).get_resource()
+
+        self.source_artifact = aws_codepipeline.Artifact(artifact_name=prefix + 'CiCdLambdaSourceArtifact')
+
+        # CodePipeline source action to read from CodeCommit. A full clone is passed to CodeBuild,
+        # since changed functions are detected from the git history.
+        self.source_action = aws_codepipeline_actions.CodeCommitSourceAction(
+            repository=self.project_repository,
+            branch='master',
+            action_name='CodeCommitSource',
+            run_order=1,
+            trigger=aws_codepipeline_actions.CodeCommitTrigger.EVENTS,
+            output=self.source_artifact,
+            code_build_clone_output=True
+        )
+
+        # CodePipeline build action that uses the CodeBuild project.
+        self.build_action = aws_codepipeline_actions.CodeBuildAction(
+            input=self.source_artifact,
+            project=self.code_build_project,
+            action_name='BuildAction',
+            run_order=1
+        )
+
+        # CodePipeline pipeline that executes both actions.
+        self.codecommit_to_lambda_pipeline = aws_codepipeline.Pipeline(
+            scope,
+            prefix + 'CiCdLambdaPipeline',
+            pipeline_name=prefix + 'CiCdLambdaPipeline',
+            artifact_bucket=self.bucket,
+            stages=[
+                aws_codepipeline.StageProps(
+                    stage_name='SourceStage',
+                    actions=[self.source_action]
+                ),
+                aws_codepipeline.StageProps(
+                    stage_name='BuildStage',
+                    actions=[self.build_action]
+                )
+            ]
+        )
+
+    @staticmethod
+    def __convert(name: str) -> str:
+        """
+        Converts CamelCase string to pascal-case where underscores are dashes.
+        This is required due to S3 not supporting capital letters or underscores.
+        """
+        s1 = re.sub('(.)([A-Z][a-z]+)', r'\1-\2', name)
+        return re.sub('([a-z0-9])([A-Z])', r'\1-\2', s1).lower()
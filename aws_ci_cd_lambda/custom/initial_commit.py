@@ -1,21 +1,75 @@
+import hashlib
 import os
 
-from typing import Any, Dict, Optional
+from functools import lru_cache
+from typing import Dict, Optional
 from aws_cdk import core
 from aws_cdk.aws_codecommit import Repository
-from aws_cdk.aws_iam import Role, PolicyStatement, PolicyDocument, Effect, ServicePrincipal
-from aws_cdk.custom_resources import AwsCustomResource, PhysicalResourceId
+from aws_cdk.aws_iam import IRole, PolicyStatement, Effect
+from aws_cdk.aws_lambda import Code, Runtime, SingletonFunction
+from aws_cdk.aws_s3_assets import Asset
+
+DEFAULT_TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', 'files', 'template')
+
+# Files, that are never part of a template.
+EXCLUDE = ['__pycache__', '*.pyc', '.git']
+
+
+@lru_cache(maxsize=None)
+def file_digest(path: str, modified_ns: int, size: int) -> str:
+    """
+    Hashes a file. Cached by path, modification time and size, hence pipelines of one synth, that share
+    a template, read it once, while a file, that changed meanwhile, is hashed again.
+
+    :param path: File path.
+    :param modified_ns: Modification time of the file in nanoseconds, part of the cache key.
+    :param size: Size of the file in bytes, part of the cache key.
+
+    :return: Hexadecimal sha256 hash.
+    """
+    with open(path, 'rb') as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+
+def template_manifest(path: str) -> Dict[str, str]:
+    """
+    Hashes every file of a template directory.
+
+    :param path: Template directory.
+
+    :return: Relative paths mapped to "<sha256> <mode>" entries, where the mode is NORMAL or EXECUTABLE.
+    """
+    manifest = {}
+
+    for root, directories, files in os.walk(path):
+        directories[:] = sorted(directory for directory in directories if directory not in ['__pycache__', '.git'])
+
+        for name in sorted(files):
+            if name.endswith('.pyc'):
+                continue
+
+            file_path = os.path.join(root, name)
+            status = os.stat(file_path)
+            digest = file_digest(file_path, status.st_mtime_ns, status.st_size)
+
+            mode = 'EXECUTABLE' if os.access(file_path, os.X_OK) else 'NORMAL'
+            manifest[os.path.relpath(file_path, path).replace(os.sep, '/')] = f'{digest} {mode}'
+
+    return manifest
 
 
 class InitialCommit:
     """
-    Custom CloudFormation resource which creates a git commit action to set initial function code.
+    Custom CloudFormation resource which pushes a project template to the repository. On stack updates files,
+    that changed in the template, are pushed again.
     """
     def __init__(
             self,
             stack: core.Stack,
             prefix: str,
             code_repository: Repository,
+            role: Optional[IRole] = None,
+            template_path: Optional[str] = None
     ) -> None:
         """
         Constructor.
@@ -23,118 +77,72 @@ class InitialCommit:
         :param stack: A CloudFormation stack to which add this resource.
         :param prefix: Prefix for resource names.
         :param code_repository: A codecommit git repository to create commits for.
+        :param role: A role, that may create commits to the repository, e.g. one shared by many
+        repositories (see SharedInfrastructure). Optional
+        :param template_path: A local directory with files of the initial commit. Must contain install.sh,
+        test.sh and the function handler. Defaults to a minimal template with manage.runner handler.
         """
         self.__stack = stack
         self.__prefix = prefix
         self.__code_repository = code_repository
+        self.__shared_role = role
+        self.__template_path = os.path.realpath(template_path or DEFAULT_TEMPLATE_PATH)
 
-    def get_resource(self):
+        assert os.path.isdir(self.__template_path), f'Template directory {self.__template_path} does not exist.'
+
+    def get_resource(self) -> core.CustomResource:
         """
         Creates a custom resource to create commits to codecommit.
 
         :return: Custom resource to create commits to codecommit.
         """
-        return AwsCustomResource(
+        manifest = template_manifest(self.__template_path)
+
+        template = Asset(
             self.__stack,
-            self.__prefix + "CiCdLambdaCustomCommitResource",
-            on_create=self.__on_create(),
-            on_update=self.__on_update(),
-            on_delete=self.__on_delete(),
-            role=self.__role()
+            self.__prefix + 'CiCdLambdaTemplate',
+            path=self.__template_path,
+            exclude=EXCLUDE
         )
 
-    def __role(self) -> Role:
-        """
-        A role for custom resource which manages git commits to codecommit.
-
-        :return: Custom resource's role.
-        """
-        return Role(
+        # One function serves every pipeline of the stack.
+        function = SingletonFunction(
             self.__stack,
-            self.__prefix + 'CiCdLambdaCustomCommitRole',
-            inline_policies={
-                self.__prefix + 'CiCdLambdaCustomCommitPolicy': PolicyDocument(
-                    statements=[
-                        PolicyStatement(
-                            actions=[
-                                "codecommit:CreateCommit",
-                            ],
-                            resources=[self.__code_repository.repository_arn],
-                            effect=Effect.ALLOW
-                        ),
-                        PolicyStatement(
-                            actions=[
-                                "logs:CreateLogGroup",
-                                "logs:CreateLogStream",
-                                "logs:PutLogEvents"
-                            ],
-                            resources=['*'],
-                            effect=Effect.ALLOW
-                        )
-                    ]
-                )},
-            assumed_by=ServicePrincipal('lambda.amazonaws.com')
+            self.__prefix + 'CiCdLambdaCustomCommitFunction',
+            uuid='2d4b5f0e-8c61-4a8e-9b37-5f1c0e7a9d42',
+            lambda_purpose='CiCdLambdaCustomCommit',
+            runtime=Runtime.PYTHON_3_9,
+            handler='index.handler',
+            code=Code.from_asset(os.path.join(os.path.dirname(os.path.realpath(__file__)), 'initial_commit_handler')),
+            timeout=core.Duration.minutes(5),
+            role=self.__shared_role
         )
 
-    @staticmethod
-    def service_name() -> str:
-        """
-        Returns a service name that this custom resource manages.
-
-        :return: Service name.
-        """
-        return 'CodeCommit'
-
-    def __on_create(self) -> Optional[Dict[Any, Any]]:
-        """
-        Creates an "on_create" command.
+        function.add_to_role_policy(
+            PolicyStatement(
+                actions=[
+                    'codecommit:GetBranch',
+                    'codecommit:GetFile',
+                    'codecommit:CreateCommit',
+                ],
+                resources=[self.__stack.format_arn(service='codecommit', resource='*CiCdLambdaCodeCommitRepo')],
+                effect=Effect.ALLOW
+            )
+        )
 
-        :return: A dictionary command.
-        """
+        template.grant_read(function)
 
-        dir_path = os.path.dirname(os.path.realpath(__file__))
-        path = os.path.join(dir_path, '../files')
-
-        return {
-                "service": self.service_name(),
-                "action": "createCommit",
-                "parameters": {
-                    'branchName': 'master',
-                    'repositoryName': self.__code_repository.repository_name,
-                    'commitMessage': 'Initial files.',
-                    'putFiles': [
-                        {
-                            'filePath': 'install.sh',
-                            'fileMode': 'NORMAL',
-                            'fileContent': open(os.path.join(path, 'install.sh'), 'r').read(),
-                        },
-                        {
-                            'filePath': 'manage.py',
-                            'fileMode': 'NORMAL',
-                            'fileContent': open(os.path.join(path, 'manage.py'), 'r').read(),
-                        },
-                        {
-                            'filePath': 'test.sh',
-                            'fileMode': 'NORMAL',
-                            'fileContent': open(os.path.join(path, 'test.sh'), 'r').read(),
-                        },
-                    ]
-                },
-                "physical_resource_id": PhysicalResourceId.of(self.__prefix + 'CiCdLambdaCreateCommit'),
+        return core.CustomResource(
+            self.__stack,
+            self.__prefix + 'CiCdLambdaCustomCommitResource',
+            service_token=function.function_arn,
+            properties={
+                'PhysicalResourceId': self.__prefix + 'CiCdLambdaCreateCommit',
+                'RepositoryName': self.__code_repository.repository_name,
+                'BranchName': 'master',
+                'CommitMessage': 'Initial files.',
+                'Bucket': template.s3_bucket_name,
+                'Key': template.s3_object_key,
+                'Manifest': manifest,
             }
-
-    def __on_update(self) -> Optional[Dict[Any, Any]]:
-        """
-        Creates an "on_update" command".
-
-        :return: A dictionary command.
-        """
-        return None
-
-    def __on_delete(self) -> Optional[Dict[Any, Any]]:
-        """
-        Creates an "on_delete" command".
-
-        :return: A dictionary command.
-        """
-        return None
+        )
@@ -0,0 +1,204 @@
+"""
+Handler of the InitialCommit custom resource.
+
+Pushes files of a template (a zip archive in S3) to a CodeCommit branch. The resource carries a manifest
+of the template ({path: "sha256 mode"}). On create every file is pushed, on update only files, whose entry
+differs from the previous manifest, are pushed and files removed from the template are deleted. Files, that
+were edited in the repository since, are left alone.
+
+CodeCommit limits the number and size of files in a single commit, hence files are pushed in batches,
+each commit being the parent of the next one.
+"""
+import hashlib
+import io
+import json
+import urllib.request
+import zipfile
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import boto3
+
+# CodeCommit accepts at most 100 files and 6 MB per CreateCommit request. Content is base64 encoded.
+MAX_FILES = 100
+MAX_BYTES = 4 * 1024 * 1024
+
+codecommit = boto3.client('codecommit')
+s3 = boto3.client('s3')
+
+
+def batches(files: List[Tuple[str, int]]) -> List[List[str]]:
+    """
+    Splits files into batches within CreateCommit limits.
+
+    :param files: Paths and sizes in bytes.
+
+    :return: Batches of paths. A file larger than the limit is a batch of its own.
+    """
+    result: List[List[str]] = []
+    size = 0
+
+    for path, file_size in files:
+        if not result or len(result[-1]) >= MAX_FILES or size + file_size > MAX_BYTES:
+            result.append([])
+            size = 0
+
+        result[-1].append(path)
+        size += file_size
+
+    return result
+
+
+def branch_head(repository: str, branch: str) -> Optional[str]:
+    try:
+        return codecommit.get_branch(repositoryName=repository, branchName=branch)['branch']['commitId']
+    except (codecommit.exceptions.BranchDoesNotExistException, codecommit.exceptions.RepositoryDoesNotExistException):
+        return None
+
+
+def edited(repository: str, branch: str, path: str, entry: str) -> bool:
+    """
+    Checks, whether a file of the branch differs from the one pushed from the template.
+
+    :param entry: Manifest entry of the file, that was pushed.
+    """
+    try:
+        content = codecommit.get_file(repositoryName=repository, commitSpecifier=branch, filePath=path)['fileContent']
+    except codecommit.exceptions.FileDoesNotExistException:
+        return True
+
+    return hashlib.sha256(content).hexdigest() != entry.split(' ')[0]
+
+
+def commit(
+        repository: str,
+        branch: str,
+        parent: Optional[str],
+        put_files: List[Dict[str, Any]],
+        delete_files: List[str],
+        message: str
+) -> Optional[str]:
+    """
+    Creates a commit. Files, that already have the same content or are already deleted, are skipped.
+
+    :return: Head of the branch after the commit.
+    """
+    params: Dict[str, Any] = {
+        'repositoryName': repository,
+        'branchName': branch,
+        'commitMessage': message,
+        'putFiles': put_files,
+        'deleteFiles': [{'filePath': path} for path in delete_files],
+    }
+
+    if parent is not None:
+        params['parentCommitId'] = parent
+
+    try:
+        return codecommit.create_commit(**params)['commitId']
+    except (
+            codecommit.exceptions.SameFileContentException,
+            codecommit.exceptions.FileDoesNotExistException,
+            codecommit.exceptions.NoChangeException
+    ):
+        if len(put_files) + len(delete_files) <= 1:
+            return parent
+
+    # Some files of the batch did not change (e.g. they were edited in the repository to match the template).
+    # The batch is retried file by file, so the rest is still pushed.
+    for file in put_files:
+        parent = commit(repository, branch, parent, [file], [], message)
+
+    for path in delete_files:
+        parent = commit(repository, branch, parent, [], [path], message)
+
+    return parent
+
+
+def push(event: Dict[str, Any]) -> None:
+    properties = event['ResourceProperties']
+    manifest: Dict[str, str] = properties['Manifest']
+    old_manifest: Dict[str, str] = {}
+
+    if event['RequestType'] == 'Update':
+        old_manifest = event.get('OldResourceProperties', {}).get('Manifest', {})
+
+    changed = sorted(path for path, entry in manifest.items() if old_manifest.get(path) != entry)
+    deleted = sorted(path for path in old_manifest if path not in manifest)
+
+    if not changed and not deleted:
+        print('Template did not change.')
+        return
+
+    repository, branch = properties['RepositoryName'], properties['BranchName']
+    message = properties['CommitMessage'] if event['RequestType'] == 'Create' else 'Update template files.'
+    parent = branch_head(repository, branch)
+
+    # E.g. the resource was replaced. Files of an existing project are never overwritten by a fresh template.
+    if event['RequestType'] == 'Create' and parent is not None:
+        print(f'Branch {branch} already exists, the template is not pushed.')
+        return
+
+    if parent is not None:
+        kept = [
+            path for path in changed + deleted
+            if path in old_manifest and edited(repository, branch, path, old_manifest[path])
+        ]
+        changed = [path for path in changed if path not in kept]
+        deleted = [path for path in deleted if path not in kept]
+
+        for path in kept:
+            print(f'{path} was changed in the repository, it is not updated.')
+
+    body = s3.get_object(Bucket=properties['Bucket'], Key=properties['Key'])['Body'].read()
+    archive = zipfile.ZipFile(io.BytesIO(body))
+
+    sizes = [(path, archive.getinfo(path).file_size) for path in changed]
+
+    for paths in batches(sizes):
+        put_files = [
+            {
+                'filePath': path,
+                'fileMode': manifest[path].split(' ')[1],
+                'fileContent': archive.read(path),
+            }
+            for path in paths
+        ]
+
+        parent = commit(repository, branch, parent, put_files, [], message)
+        print(f'Pushed {len(paths)} files, head is {parent}.')
+
+    for index in range(0, len(deleted), MAX_FILES):
+        parent = commit(repository, branch, parent, [], deleted[index:index + MAX_FILES], message)
+        print(f'Deleted {len(deleted[index:index + MAX_FILES])} files, head is {parent}.')
+
+
+def respond(event: Dict[str, Any], context: Any, status: str, reason: str) -> None:
+    body = json.dumps({
+        'Status': status,
+        'Reason': reason or f'See the details in CloudWatch Log Stream: {context.log_stream_name}',
+        'PhysicalResourceId': event['ResourceProperties']['PhysicalResourceId'],
+        'StackId': event['StackId'],
+        'RequestId': event['RequestId'],
+        'LogicalResourceId': event['LogicalResourceId'],
+    }).encode()
+
+    request = urllib.request.Request(event['ResponseURL'], data=body, method='PUT', headers={
+        'Content-Type': '',
+        'Content-Length': str(len(body)),
+    })
+
+    urllib.request.urlopen(request)
+
+
+def handler(event: Dict[str, Any], context: Any) -> None:
+    status, reason = 'SUCCESS', ''
+
+    try:
+        if event['RequestType'] in ['Create', 'Update']:
+            push(event)
+    except Exception as error:
+        status, reason = 'FAILED', str(error)
+        print(f'Failed to push the template: {error}')
+
+    respond(event, context, status, reason)
@@ -0,0 +1,25 @@
+#!/usr/bin/env python
+import os
+
+import runtime
+
+# Heavy modules, that only some requests need, are best imported on first use,
+# e.g. pandas = runtime.lazy_import('pandas').
+
+
+@runtime.once
+def settings():
+    # Expensive objects (configuration, clients, models) are created once per instance.
+    # E.g. runtime.client('s3') returns a boto3 client, that keeps its connections alive.
+    return {
+        'greeting': os.environ.get('GREETING', 'Hello, world!'),
+    }
+
+
+@runtime.handler
+def runner(event, lambda_context):
+    message = settings()['greeting']
+
+    return {
+        'message': message
+    }
@@ -0,0 +1,196 @@
+"""
+Runtime helpers for Lambda handlers.
+
+Lambda reuses an instance for many invocations, hence everything expensive should be done once per instance
+rather than once per invocation:
+
+- once: caches the result of a function, e.g. loaded settings, for the lifetime of the instance.
+- lazy_import: imports a heavy module on first use, so requests, that do not need it, do not pay for it
+  during the cold start.
+- client: a cached boto3 client with TCP keep-alive and a connection pool.
+- request: HTTP(S) requests over cached keep-alive connections, one per host.
+- handler: a decorator, that answers warming events (see WarmerParameters) and emits a CloudWatch Embedded
+  Metric Format record with ColdStart, InitDuration (the duration of the module import, not reported for
+  provisioned concurrency) and HandlerDuration per invocation.
+
+Objects, that every invocation needs, are best created at module level: the init phase runs with a full CPU.
+"""
+import functools
+import http.client
+import importlib
+import json
+import os
+import sys
+import time
+import types
+import urllib.parse
+
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Start of the init phase (approximately, this module is imported first by the handler module).
+INIT_STARTED = time.perf_counter()
+
+# Provisioned instances are initialized ahead of traffic, their init duration does not delay any request.
+PROVISIONED = os.environ.get('AWS_LAMBDA_INITIALIZATION_TYPE') == 'provisioned-concurrency'
+
+NAMESPACE = os.environ.get('METRICS_NAMESPACE', 'CiCdLambda/Handler')
+
+# Key of warming events (see WarmerParameters).
+WARMER = 'ciCdLambdaWarmer'
+
+_cold = True
+_connections: Dict[Tuple[str, str, int], http.client.HTTPConnection] = {}
+
+
+def once(function: Callable[[], Any]) -> Callable[[], Any]:
+    """
+    Caches the result of a function without arguments for the lifetime of the instance.
+    """
+    return functools.lru_cache(maxsize=None)(function)
+
+
+class _LazyModule(types.ModuleType):
+    def __init__(self, name: str) -> None:
+        super().__init__(name)
+        self.__dict__['_module'] = None
+
+    def __getattr__(self, attribute: str) -> Any:
+        if self.__dict__['_module'] is None:
+            self.__dict__['_module'] = importlib.import_module(self.__name__)
+
+        return getattr(self.__dict__['_module'], attribute)
+
+
+def lazy_import(name: str) -> types.ModuleType:
+    """
+    Returns a module, that is imported on the first attribute access.
+
+    :param name: Module name, e.g. "pandas".
+    """
+    return sys.modules.get(name) or _LazyModule(name)
+
+
+@functools.lru_cache(maxsize=None)
+def client(service: str, region_name: Optional[str] = None, max_pool_connections: int = 10) -> Any:
+    """
+    Returns a boto3 client, that is created once per instance and keeps its connections alive.
+
+    :param service: Service name, e.g. "s3".
+    :param region_name: Region of the service. Defaults to the region of the function.
+    :param max_pool_connections: Size of the connection pool, raise it for clients used by many threads.
+    """
+    import boto3
+    import botocore.config
+
+    config = botocore.config.Config(
+        tcp_keepalive=True,
+        max_pool_connections=max_pool_connections,
+        connect_timeout=5,
+        read_timeout=30,
+        retries={'mode': 'standard', 'max_attempts': 3}
+    )
+
+    return boto3.session.Session().client(service, region_name=region_name, config=config)
+
+
+def _connection(scheme: str, host: str, port: int, timeout: float) -> http.client.HTTPConnection:
+    key = (scheme, host, port)
+
+    if key not in _connections:
+        connection_class = http.client.HTTPSConnection if scheme == 'https' else http.client.HTTPConnection
+        _connections[key] = connection_class(host, port, timeout=timeout)
+
+    return _connections[key]
+
+
+def request(
+        method: str,
+        url: str,
+        body: Optional[bytes] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: float = 10
+) -> Tuple[int, Dict[str, str], bytes]:
+    """
+    Sends an HTTP(S) request over a keep-alive connection, that is reused by later requests to the same host.
+    A connection, that the server closed meanwhile (e.g. while the instance was frozen), is reopened once.
+
+    :return: Status, headers and body of the response.
+    """
+    parts = urllib.parse.urlsplit(url)
+    port = parts.port or (443 if parts.scheme == 'https' else 80)
+    path = parts.path or '/'
+    path += f'?{parts.query}' if parts.query else ''
+
+    for attempt in range(2):
+        connection = _connection(parts.scheme, parts.hostname, port, timeout)
+
+        try:
+            connection.request(method, path, body=body, headers={'Connection': 'keep-alive', **(headers or {})})
+            response = connection.getresponse()
+            data = response.read()
+        except (http.client.RemoteDisconnected, http.client.CannotSendRequest, ConnectionError):
+            connection.close()
+            del _connections[(parts.scheme, parts.hostname, port)]
+
+            if attempt:
+                raise
+
+            continue
+
+        if response.will_close:
+            connection.close()
+            del _connections[(parts.scheme, parts.hostname, port)]
+
+        return response.status, dict(response.getheaders()), data
+
+
+def handler(function: Callable[[Any, Any], Any]) -> Callable[[Any, Any], Any]:
+    """
+    Decorates a Lambda handler. Warming events are answered right away, other invocations are timed.
+    """
+    # The handler is decorated at the end of its module import, i.e. at the end of the init phase.
+    # Invocations may come much later (warmed instances), hence the init duration is measured here.
+    init_ms = (time.perf_counter() - INIT_STARTED) * 1000
+
+    @functools.wraps(function)
+    def wrapper(event: Any, context: Any) -> Any:
+        global _cold
+        started = time.perf_counter()
+        cold, _cold = _cold, False
+
+        # Warming invocations hold the instance for a moment, so concurrent ones reach other instances.
+        if isinstance(event, dict) and WARMER in event:
+            time.sleep(event[WARMER].get('holdMs', 0) / 1000)
+            return {'cold': cold}
+
+        try:
+            return function(event, context)
+        finally:
+            # Requests to provisioned instances never wait for the init phase.
+            cold_start = cold and not PROVISIONED
+
+            metrics = {
+                'ColdStart': int(cold_start),
+                'HandlerDuration': (time.perf_counter() - started) * 1000,
+            }
+
+            if cold_start:
+                metrics['InitDuration'] = init_ms
+
+            print(json.dumps({
+                '_aws': {
+                    'Timestamp': int(time.time() * 1000),
+                    'CloudWatchMetrics': [{
+                        'Namespace': NAMESPACE,
+                        'Dimensions': [['FunctionName']],
+                        'Metrics': [
+                            {'Name': name, 'Unit': 'Count' if name == 'ColdStart' else 'Milliseconds'}
+                            for name in sorted(metrics)
+                        ],
+                    }],
+                },
+                'FunctionName': os.environ.get('AWS_LAMBDA_FUNCTION_NAME', function.__name__),
+                **metrics,
+            }))
+
+    return wrapper
@@ -1,7 +1,17 @@
-from aws_cdk.aws_cloudwatch import CfnAlarm
+from typing import List, Optional
+from aws_cdk.aws_cloudwatch import (
+    CfnAlarm,
+    Dashboard,
+    GraphWidget,
+    HorizontalAnnotation,
+    LogQueryWidget,
+    LogQueryVisualizationType
+)
 from aws_cdk.aws_lambda import IFunction
 from aws_cdk.aws_sns import ITopic
-from aws_cdk.core import Stack
+from aws_cdk.core import Duration, Fn, Stack
+from aws_ci_cd_lambda.parameters.alarm_parameters import AlarmParameters
+from aws_ci_cd_lambda.parameters.event_source_parameters import EventSourceParameters
 
 
 class LambdaAlarms:
@@ -9,13 +19,18 @@ class LambdaAlarms:
             self,
             scope: Stack,
             prefix: str,
-            sns_topic: ITopic,
-            lambda_function: IFunction
+            sns_topic: Optional[ITopic],
+            lambda_function: IFunction,
+            lambda_timeout: Optional[int] = None,
+            reserved_concurrency: Optional[int] = None,
+            alarm_params: Optional[AlarmParameters] = None,
+            event_source_params: Optional[List[EventSourceParameters]] = None
     ) -> None:
         self.__prefix = prefix
         self.__scope = scope
         self.__sns_topic = sns_topic
         self.__lambda_function = lambda_function
+        self.__alarm_actions = [sns_topic.topic_arn] if sns_topic else []
 
         self.__errors_alarm = CfnAlarm(
             scope=self.__scope,
@@ -26,9 +41,7 @@ class LambdaAlarms:
             dimensions=[CfnAlarm.DimensionProperty(name='FunctionName', value=self.__lambda_function.function_name)],
             metric_name='Errors',
             namespace='AWS/Lambda',
-            alarm_actions=[
-                self.__sns_topic.topic_arn
-            ],
+            alarm_actions=self.__alarm_actions,
 
             # Fire an alarm if at least one event has occurred within 10 minutes.
             # This way we will immanently know when a function has crashed or is crashing.
@@ -48,9 +61,7 @@ class LambdaAlarms:
             dimensions=[CfnAlarm.DimensionProperty(name='FunctionName', value=self.__lambda_function.function_name)],
             metric_name='Throttles',
             namespace='AWS/Lambda',
-            alarm_actions=[
-                self.__sns_topic.topic_arn
-            ],
+            alarm_actions=self.__alarm_actions,
 
             # Fire an alarm if average events is higher than 0 within 1 minute.
             # This way we can constantly push alarm notifications that a throttling is happening.
@@ -61,6 +72,205 @@ class LambdaAlarms:
             threshold=0,
         )
 
+        # Latency, saturation and event age alarms and the dashboard are opt-in, only errors and throttles
+        # are monitored by default.
+        alarm_params = alarm_params or AlarmParameters(
+            duration_p90_timeout_fraction=None,
+            duration_p99_timeout_fraction=None,
+            concurrency_fraction=None,
+            create_dashboard=False
+        )
+        event_source_params = event_source_params or []
+
+        self.__duration_p90_alarm = None
+        self.__duration_p99_alarm = None
+        self.__concurrency_alarm = None
+        self.__iterator_age_alarm = None
+        self.__async_event_age_alarm = None
+        self.__queue_age_alarms: List[CfnAlarm] = []
+        self.__dashboard = None
+
+        if lambda_timeout is not None and alarm_params.duration_p90_timeout_fraction is not None:
+            self.__duration_p90_alarm = self.__duration_alarm(
+                'p90', lambda_timeout * 1000 * alarm_params.duration_p90_timeout_fraction
+            )
+
+        if lambda_timeout is not None and alarm_params.duration_p99_timeout_fraction is not None:
+            self.__duration_p99_alarm = self.__duration_alarm(
+                'p99', lambda_timeout * 1000 * alarm_params.duration_p99_timeout_fraction
+            )
+
+        if reserved_concurrency is not None and alarm_params.concurrency_fraction is not None:
+            self.__concurrency_alarm = self.__maximum_alarm(
+                'ConcurrentExecutionsAlarm',
+                'ConcurrentExecutions',
+                reserved_concurrency * alarm_params.concurrency_fraction,
+                'concurrent executions are close to reserved concurrency'
+            )
+
+        # IteratorAge is reported per function, hence stream sources share one alarm with the strictest threshold.
+        iterator_age_thresholds = [
+            params.age_alarm_ms for params in event_source_params
+            if params.source_type != 'sqs' and params.age_alarm_ms is not None
+        ]
+
+        if alarm_params.iterator_age_ms is not None:
+            iterator_age_thresholds.append(alarm_params.iterator_age_ms)
+
+        if iterator_age_thresholds:
+            self.__iterator_age_alarm = self.__maximum_alarm(
+                'IteratorAgeAlarm',
+                'IteratorAge',
+                min(iterator_age_thresholds),
+                'stream event source falls behind'
+            )
+
+        for index, params in enumerate(event_source_params):
+            if params.source_type == 'sqs' and params.age_alarm_ms is not None:
+                self.__queue_age_alarms.append(self.__queue_age_alarm(index, params))
+
+        if alarm_params.async_event_age_ms is not None:
+            self.__async_event_age_alarm = self.__maximum_alarm(
+                'AsyncEventAgeAlarm',
+                'AsyncEventAge',
+                alarm_params.async_event_age_ms,
+                'asynchronous events wait too long'
+            )
+
+        if alarm_params.create_dashboard:
+            self.__dashboard = self.__create_dashboard(lambda_timeout, reserved_concurrency)
+
+    def __duration_alarm(self, percentile: str, threshold_ms: float) -> CfnAlarm:
+        return CfnAlarm(
+            scope=self.__scope,
+            id=self.__prefix + f'Duration{percentile.upper()}Alarm',
+            actions_enabled=True,
+            alarm_name=self.__prefix + f'Duration{percentile.upper()}Alarm',
+            alarm_description=f'Lambda function {self.__lambda_function.function_name} {percentile} duration alarm.',
+            dimensions=[CfnAlarm.DimensionProperty(name='FunctionName', value=self.__lambda_function.function_name)],
+            metric_name='Duration',
+            namespace='AWS/Lambda',
+            alarm_actions=self.__alarm_actions,
+
+            # Fire an alarm if the percentile stays above the threshold for 3 minutes.
+            # Single slow invocations (e.g. cold starts) should not wake anyone up.
+            evaluation_periods=3,
+            period=60,
+            comparison_operator='GreaterThanThreshold',
+            extended_statistic=percentile,
+            threshold=threshold_ms,
+            treat_missing_data='notBreaching',
+        )
+
+    def __maximum_alarm(self, name: str, metric_name: str, threshold: float, reason: str) -> CfnAlarm:
+        return CfnAlarm(
+            scope=self.__scope,
+            id=self.__prefix + name,
+            actions_enabled=True,
+            alarm_name=self.__prefix + name,
+            alarm_description=f'Lambda function {self.__lambda_function.function_name} {reason}.',
+            dimensions=[CfnAlarm.DimensionProperty(name='FunctionName', value=self.__lambda_function.function_name)],
+            metric_name=metric_name,
+            namespace='AWS/Lambda',
+            alarm_actions=self.__alarm_actions,
+
+            # Fire an alarm if the maximum stays above the threshold for 5 minutes.
+            evaluation_periods=5,
+            period=60,
+            comparison_operator='GreaterThanThreshold',
+            statistic='Maximum',
+            threshold=threshold,
+            treat_missing_data='notBreaching',
+        )
+
+    def __queue_age_alarm(self, index: int, params: EventSourceParameters) -> CfnAlarm:
+        # Queue name is the last part of the queue ARN. It is resolved by CloudFormation, since the ARN may be a token.
+        queue_name = Fn.select(5, Fn.split(':', params.source_arn))
+
+        return CfnAlarm(
+            scope=self.__scope,
+            id=self.__prefix + f'QueueAge{index}Alarm',
+            actions_enabled=True,
+            alarm_name=self.__prefix + f'QueueAge{index}Alarm',
+            alarm_description=f'Lambda function {self.__lambda_function.function_name} queue event source falls behind.',
+            dimensions=[CfnAlarm.DimensionProperty(name='QueueName', value=queue_name)],
+            metric_name='ApproximateAgeOfOldestMessage',
+            namespace='AWS/SQS',
+            alarm_actions=self.__alarm_actions,
+
+            # Fire an alarm if the oldest message stays older than the threshold for 5 minutes.
+            # SQS reports message age in seconds.
+            evaluation_periods=5,
+            period=60,
+            comparison_operator='GreaterThanThreshold',
+            statistic='Maximum',
+            threshold=params.age_alarm_ms / 1000,
+            treat_missing_data='notBreaching',
+        )
+
+    def __create_dashboard(self, lambda_timeout: Optional[int], reserved_concurrency: Optional[int]) -> Dashboard:
+        function = self.__lambda_function
+        period = Duration.minutes(1)
+
+        duration_widget = GraphWidget(
+            title='Duration',
+            left=[function.metric_duration(statistic=statistic, period=period) for statistic in ['p50', 'p90', 'p99']],
+            left_annotations=[
+                HorizontalAnnotation(value=lambda_timeout * 1000, label='Timeout')
+            ] if lambda_timeout is not None else None,
+            width=12
+        )
+
+        invocations_widget = GraphWidget(
+            title='Invocations, errors and throttles',
+            left=[
+                function.metric_invocations(statistic='Sum', period=period),
+                function.metric_errors(statistic='Sum', period=period),
+                function.metric_throttles(statistic='Sum', period=period),
+            ],
+            width=12
+        )
+
+        concurrency_widget = GraphWidget(
+            title='Concurrent executions',
+            left=[function.metric('ConcurrentExecutions', statistic='Maximum', period=period)],
+            left_annotations=[
+                HorizontalAnnotation(value=reserved_concurrency, label='Reserved concurrency')
+            ] if reserved_concurrency is not None else None,
+            width=12
+        )
+
+        cold_starts_widget = LogQueryWidget(
+            title='Cold starts',
+            log_group_names=[f'/aws/lambda/{function.function_name}'],
+            query_lines=[
+                'filter @type = "REPORT"',
+                'stats sum(ispresent(@initDuration)) as coldStarts, avg(@initDuration) as initDuration by bin(5m)',
+            ],
+            view=LogQueryVisualizationType.LINE,
+            width=12
+        )
+
+        event_age_widget = GraphWidget(
+            title='Event age',
+            left=[
+                function.metric('IteratorAge', statistic='Maximum', period=period),
+                function.metric('AsyncEventAge', statistic='Maximum', period=period),
+            ],
+            width=24
+        )
+
+        return Dashboard(
+            self.__scope,
+            self.__prefix + 'PerformanceDashboard',
+            dashboard_name=self.__prefix + 'PerformanceDashboard',
+            widgets=[
+                [duration_widget, invocations_widget],
+                [concurrency_widget, cold_starts_widget],
+                [event_age_widget],
+            ]
+        )
+
     @property
     def errors_alarm(self) -> CfnAlarm:
         return self.__errors_alarm
@@ -68,3 +278,31 @@ class LambdaAlarms:
     @property
     def throttles_alarm(self) -> CfnAlarm:
         return self.__throttles_alarm
+
+    @property
+    def duration_p90_alarm(self) -> Optional[CfnAlarm]:
+        return self.__duration_p90_alarm
+
+    @property
+    def duration_p99_alarm(self) -> Optional[CfnAlarm]:
+        return self.__duration_p99_alarm
+
+    @property
+    def concurrency_alarm(self) -> Optional[CfnAlarm]:
+        return self.__concurrency_alarm
+
+    @property
+    def iterator_age_alarm(self) -> Optional[CfnAlarm]:
+        return self.__iterator_age_alarm
+
+    @property
+    def async_event_age_alarm(self) -> Optional[CfnAlarm]:
+        return self.__async_event_age_alarm
+
+    @property
+    def queue_age_alarms(self) -> List[CfnAlarm]:
+        return self.__queue_age_alarms
+
+    @property
+    def dashboard(self) -> Optional[Dashboard]:
+        return self.__dashboard
@@ -0,0 +1,77 @@
+import os
+
+from typing import Optional
+from aws_cdk.aws_events import Rule, Schedule
+from aws_cdk.aws_events_targets import LambdaFunction
+from aws_cdk.aws_iam import Effect, PolicyStatement
+from aws_cdk.aws_lambda import Code, Function, IFunction, Runtime
+from aws_cdk.core import Duration, Stack
+from aws_ci_cd_lambda.parameters.warmer_parameters import WarmerParameters
+
+
+class LambdaWarmer:
+    """
+    Keeps instances of a function warm: a schedule triggers a warmer function, which invokes the function
+    concurrently with warming events and publishes cold start and warm hit counts.
+    """
+    NAMESPACE = 'CiCdLambda/Warmer'
+
+    def __init__(
+            self,
+            scope: Stack,
+            prefix: str,
+            lambda_function: IFunction,
+            warmer_params: WarmerParameters,
+            target: Optional[IFunction] = None
+    ) -> None:
+        """
+        Constructor.
+
+        :param scope: A scope in which resources shall be created.
+        :param prefix: Prefix for all of your resource IDs and names.
+        :param lambda_function: The function to keep warm.
+        :param warmer_params: Parameters, focused on the concurrency and rate of warming.
+        :param target: A version or alias of the function to invoke, e.g. the "live" alias. Defaults to the function.
+        """
+        target = target or lambda_function
+
+        self.__function = Function(
+            scope, prefix + 'CiCdLambdaWarmerFunction',
+            description=f'Keeps {warmer_params.concurrency} instances of {prefix} warm.',
+            code=Code.from_asset(os.path.join(os.path.dirname(os.path.realpath(__file__)), 'warmer_handler')),
+            handler='index.handler',
+            runtime=Runtime.PYTHON_3_9,
+            memory_size=128,
+            timeout=Duration.minutes(1),
+            environment={
+                'TARGET_FUNCTION': target.function_arn,
+                'FUNCTION_NAME': lambda_function.function_name,
+                'CONCURRENCY': str(warmer_params.concurrency),
+                'HOLD_MS': str(warmer_params.hold_ms),
+                'MARKER': WarmerParameters.MARKER,
+                'NAMESPACE': self.NAMESPACE,
+            }
+        )
+
+        self.__function.add_to_role_policy(
+            PolicyStatement(
+                actions=['lambda:InvokeFunction'],
+                resources=[target.function_arn],
+                effect=Effect.ALLOW
+            )
+        )
+
+        self.__rule = Rule(
+            scope, prefix + 'CiCdLambdaWarmerRule',
+            description=f'Warms {prefix} every {warmer_params.rate_minutes} minutes.',
+            schedule=Schedule.rate(Duration.minutes(warmer_params.rate_minutes)),
+            targets=[LambdaFunction(self.__function)]
+        )
+
+    @property
+    def function(self) -> Function:
+        return self.__function
+
+    @property
+    def rule(self) -> Rule:
+        return self.__rule
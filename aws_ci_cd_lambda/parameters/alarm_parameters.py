@@ -0,0 +1,34 @@
+from typing import Optional
+
+
+class AlarmParameters:
+    """
+    Parameters, focused on latency, saturation and event age alarms and the performance dashboard of your function.
+    """
+    def __init__(
+            self,
+            duration_p90_timeout_fraction: Optional[float] = 0.5,
+            duration_p99_timeout_fraction: Optional[float] = 0.8,
+            concurrency_fraction: Optional[float] = 0.8,
+            iterator_age_ms: Optional[int] = None,
+            async_event_age_ms: Optional[int] = None,
+            create_dashboard: bool = True
+    ) -> None:
+        """
+        Constructor. Thresholds are derived from the function's timeout and reserved concurrency.
+        Set a fraction to None to disable the corresponding alarm.
+
+        :param duration_p90_timeout_fraction: Fires when p90 Duration exceeds this fraction of the function timeout.
+        :param duration_p99_timeout_fraction: Fires when p99 Duration exceeds this fraction of the function timeout.
+        :param concurrency_fraction: Fires when ConcurrentExecutions exceed this fraction of reserved concurrency.
+        Ignored if the function has no reserved concurrency.
+        :param iterator_age_ms: Fires when IteratorAge (stream event sources) exceeds this value. Optional
+        :param async_event_age_ms: Fires when AsyncEventAge (asynchronous invocations) exceeds this value. Optional
+        :param create_dashboard: Create a CloudWatch dashboard with performance metrics and cold starts.
+        """
+        self.duration_p90_timeout_fraction = duration_p90_timeout_fraction
+        self.duration_p99_timeout_fraction = duration_p99_timeout_fraction
+        self.concurrency_fraction = concurrency_fraction
+        self.iterator_age_ms = iterator_age_ms
+        self.async_event_age_ms = async_event_age_ms
+        self.create_dashboard = create_dashboard
@@ -0,0 +1,40 @@
+from typing import Optional, List
+from aws_cdk.aws_s3 import IBucket
+
+
+class CacheParameters:
+    """
+    Parameters, focused on caching function dependencies between CodeBuild runs.
+    """
+    DEFAULT_HASH_FILES = [
+        'install.sh',
+        'requirements*.txt',
+        'setup.py',
+        'setup.cfg',
+        'pyproject.toml',
+        'Pipfile.lock',
+        'poetry.lock',
+    ]
+
+    def __init__(
+            self,
+            bucket: Optional[IBucket] = None,
+            bucket_prefix: Optional[str] = None,
+            hash_files: Optional[List[str]] = None
+    ) -> None:
+        """
+        Constructor. By default a CodeBuild local cache is used. If a bucket is supplied, an S3 cache is used instead
+        (CodeBuild allows only one cache type per project).
+
+        A cached virtual environment is reused only when the hash of the dependency files matches the hash of the
+        files the environment was built from. Hence your install.sh script should install only the dependencies
+        of your function and not the function code itself.
+
+        :param bucket: S3 bucket to store the cache in. Optional.
+        :param bucket_prefix: Key prefix for cache objects in the given S3 bucket. Optional.
+        :param hash_files: File names or shell patterns (relative to the repository root) which define
+        the dependencies of your function. Defaults to install.sh, requirements and lock files.
+        """
+        self.bucket = bucket
+        self.bucket_prefix = bucket_prefix
+        self.hash_files = hash_files or self.DEFAULT_HASH_FILES
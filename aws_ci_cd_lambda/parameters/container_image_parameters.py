@@ -0,0 +1,27 @@
+from typing import List, Optional
+
+
+class ContainerImageParameters:
+    """
+    Parameters, focused on deploying the function as a container image instead of a zip package.
+    """
+    def __init__(
+            self,
+            lock_files: Optional[List[str]] = None,
+            max_image_count: int = 20
+    ) -> None:
+        """
+        Constructor. The pipeline generates a Dockerfile on top of the AWS Lambda base image of the function
+        runtime, builds it with Docker BuildKit and pushes it to an ECR repository, which also serves as
+        the layer cache. Dependencies are installed by your ./install.sh script inside the image, in a layer,
+        that is rebuilt only when install.sh or one of the lock files change. Hence install.sh should
+        install dependencies only (e.g. "pip install -r requirements.txt"), not the project itself.
+
+        :param lock_files: File names or glob patterns of dependency files, that install.sh reads.
+        Defaults to "requirements*.txt".
+        :param max_image_count: Number of images kept in the ECR repository.
+        """
+        assert max_image_count > 1, 'At least two images must be kept for rollbacks.'
+
+        self.lock_files = lock_files or ['requirements*.txt']
+        self.max_image_count = max_image_count
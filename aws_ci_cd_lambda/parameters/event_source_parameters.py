@@ -0,0 +1,73 @@
+from typing import Optional
+
+
+class EventSourceParameters:
+    """
+    Parameters, focused on an event source mapping (SQS queue, Kinesis stream or DynamoDB stream) of your function.
+    """
+    SOURCE_TYPES = ['sqs', 'kinesis', 'dynamodb']
+
+    def __init__(
+            self,
+            source_type: str,
+            source_arn: str,
+            batch_size: Optional[int] = None,
+            max_batching_window_seconds: Optional[int] = None,
+            parallelization_factor: Optional[int] = None,
+            maximum_concurrency: Optional[int] = None,
+            bisect_batch_on_error: bool = False,
+            report_batch_item_failures: bool = False,
+            maximum_retry_attempts: Optional[int] = None,
+            starting_position: str = 'LATEST',
+            age_alarm_ms: Optional[int] = 60000
+    ) -> None:
+        """
+        Constructor. The mapping invokes the "live" alias, if the function has one, so events are processed
+        by promoted versions only. Permissions to read from the source are added to the execution role.
+
+        :param source_type: "sqs", "kinesis" or "dynamodb".
+        :param source_arn: ARN of the queue or stream (for DynamoDB the table's stream ARN).
+        :param batch_size: Maximum number of records per invocation. Defaults to the Lambda default of the source.
+        :param max_batching_window_seconds: Time to gather records before invoking, trading latency for fewer
+        and fuller invocations. Optional
+        :param parallelization_factor: Number of concurrent batches per shard (1 - 10). Streams only. Optional
+        :param maximum_concurrency: Maximum number of concurrent invocations (2 - 1000) the queue can scale to,
+        so a backlog can not starve other consumers of the account concurrency. SQS only. Optional
+        :param bisect_batch_on_error: Split a failed batch in two and retry each half, so one bad record
+        does not block a shard. Streams only.
+        :param report_batch_item_failures: Let the function return failed record ids ("batchItemFailures"),
+        so only those are retried instead of the whole batch. Set it to True only once your handler returns
+        the partial batch response, e.g. {"batchItemFailures": [{"itemIdentifier": message_id}]}: a response
+        without it marks the whole batch as processed, silently dropping failed records.
+        :param maximum_retry_attempts: Retries of a failed batch before it is skipped. Streams only. Optional
+        :param starting_position: Position in the stream to start reading from, "LATEST" or "TRIM_HORIZON".
+        Streams only.
+        :param age_alarm_ms: Fires when the age of the oldest unprocessed event exceeds this value: IteratorAge
+        for streams, ApproximateAgeOfOldestMessage for queues. None disables the alarm.
+        """
+        assert source_type in self.SOURCE_TYPES, f'Source type must be one of: {", ".join(self.SOURCE_TYPES)}.'
+
+        if source_type == 'sqs':
+            assert parallelization_factor is None, 'Parallelization factor applies to streams only.'
+            assert not bisect_batch_on_error, 'Bisecting batches applies to streams only.'
+            assert maximum_retry_attempts is None, 'Retry attempts apply to streams only, use a queue redrive policy.'
+        else:
+            assert maximum_concurrency is None, 'Maximum concurrency applies to SQS queues only.'
+
+        if parallelization_factor is not None:
+            assert 1 <= parallelization_factor <= 10, 'Parallelization factor must be between 1 and 10.'
+
+        if maximum_concurrency is not None:
+            assert 2 <= maximum_concurrency <= 1000, 'Maximum concurrency must be between 2 and 1000.'
+
+        self.source_type = source_type
+        self.source_arn = source_arn
+        self.batch_size = batch_size
+        self.max_batching_window_seconds = max_batching_window_seconds
+        self.parallelization_factor = parallelization_factor
+        self.maximum_concurrency = maximum_concurrency
+        self.bisect_batch_on_error = bisect_batch_on_error
+        self.report_batch_item_failures = report_batch_item_failures
+        self.maximum_retry_attempts = maximum_retry_attempts
+        self.starting_position = starting_position
+        self.age_alarm_ms = age_alarm_ms
@@ -0,0 +1,28 @@
+from typing import Optional
+
+
+class ImportTimeParameters:
+    """
+    Parameters, focused on guarding the import time (cold start initialization) of your function.
+    """
+    def __init__(
+            self,
+            max_regression: float = 0.2,
+            max_total_ms: Optional[float] = None,
+            runs: int = 3,
+            handler_module: Optional[str] = None
+    ) -> None:
+        """
+        Constructor. Before every deploy the packaged handler module is imported in a clean interpreter
+        and the build fails if its import time regresses. Reports are stored in the artifacts bucket.
+
+        :param max_regression: Allowed relative increase of the import time compared to the last successful build,
+        e.g. 0.2 allows a 20% increase.
+        :param max_total_ms: Allowed absolute import time in milliseconds. Optional.
+        :param runs: Number of measurements. The median is compared.
+        :param handler_module: Module to import. Defaults to the module of the lambda handler.
+        """
+        self.max_regression = max_regression
+        self.max_total_ms = max_total_ms
+        self.runs = runs
+        self.handler_module = handler_module
@@ -1,7 +1,10 @@
 from typing import Dict, Any, Optional
 from aws_cdk.aws_iam import Role
-from aws_cdk.aws_lambda import Runtime
+from aws_cdk.aws_lambda import Architecture, Runtime
 from aws_cdk.aws_sns import ITopic
+from aws_ci_cd_lambda.parameters.alarm_parameters import AlarmParameters
+from aws_ci_cd_lambda.parameters.provisioned_concurrency_parameters import ProvisionedConcurrencyParameters
+from aws_ci_cd_lambda.parameters.warmer_parameters import WarmerParameters
 
 
 class LambdaParameters:
@@ -16,7 +19,12 @@ class LambdaParameters:
             lambda_handler: str,
             lambda_runtime: Runtime,
             environment: Optional[Dict[Any, Any]] = None,
-            alarms_sns_topic: Optional[ITopic] = None
+            alarms_sns_topic: Optional[ITopic] = None,
+            reserved_concurrency: Optional[int] = 5,
+            provisioned_concurrency_params: Optional[ProvisionedConcurrencyParameters] = None,
+            alarm_params: Optional[AlarmParameters] = None,
+            architecture: Optional[Architecture] = None,
+            warmer_params: Optional[WarmerParameters] = None
     ) -> None:
         """
         Constructor.
@@ -26,7 +34,28 @@ class LambdaParameters:
         :param lambda_timeout: Time, after which the function times out and returns an error (in seconds).
         :param lambda_handler: File name and function name that handles lambda invocation.
         :param lambda_runtime: Runtime for your Lambda function (the programming language it uses).
+        :param environment: Environment variables for your function. Optional
+        :param alarms_sns_topic: SNS topic to which alarms of your function are sent. Optional
+        :param reserved_concurrency: Number of concurrent executions reserved for your function.
+        None means the function uses unreserved account concurrency.
+        :param provisioned_concurrency_params: Parameters, focused on provisioned concurrency with auto scaling. Optional
+        :param alarm_params: Parameters, focused on latency and saturation alarms and a performance dashboard.
+        Without them only errors and throttles are monitored. Pass AlarmParameters() to opt in with defaults. Optional
+        :param architecture: Instruction set architecture of your function. Choosing ARM64 (Graviton) also makes
+        the pipeline build on an ARM image, so native dependencies match the runtime. Defaults to X86_64.
+        :param warmer_params: Parameters, focused on keeping instances warm with scheduled concurrent
+        invocations. Optional
         """
+        assert lambda_runtime.name.startswith('python'), 'Only python runtimes are supported.'
+
+        if reserved_concurrency is not None and provisioned_concurrency_params is not None:
+            message = 'Provisioned concurrency can not exceed reserved concurrency.'
+            assert provisioned_concurrency_params.max_capacity <= reserved_concurrency, message
+
+        if reserved_concurrency is not None and warmer_params is not None:
+            message = 'Warmer concurrency can not exceed reserved concurrency.'
+            assert warmer_params.concurrency <= reserved_concurrency, message
+
         self.execution_role = execution_role
         self.lambda_memory = lambda_memory
         self.lambda_timeout = lambda_timeout
@@ -34,3 +63,8 @@ class LambdaParameters:
         self.lambda_runtime = lambda_runtime
         self.environment: Dict[Any, Any] = environment or {}
         self.alarms_sns_topic = alarms_sns_topic
+        self.reserved_concurrency = reserved_concurrency
+        self.provisioned_concurrency_params = provisioned_concurrency_params
+        self.alarm_params = alarm_params
+        self.architecture = architecture or Architecture.X86_64
+        self.warmer_params = warmer_params
@@ -0,0 +1,41 @@
+from typing import Optional
+
+
+class LoadTestParameters:
+    """
+    Parameters, focused on load testing newly published versions before they receive traffic.
+    """
+    def __init__(
+            self,
+            events_path: str = 'loadtest/events',
+            concurrency: int = 10,
+            invocations: int = 200,
+            p50_budget_ms: Optional[float] = None,
+            p99_budget_ms: Optional[float] = None,
+            max_regression: Optional[float] = 0.2,
+            max_error_rate: float = 0.0
+    ) -> None:
+        """
+        Constructor. A load test stage runs after the build stage. It invokes the newly published version
+        with sample events, and only if latency stays within budgets, the version is promoted to the "live" alias.
+        Results are stored as JSON in the artifacts bucket. The last passed run is the baseline of the next one.
+
+        :param events_path: Path in your repository to a JSON file with a list of sample events
+        or to a directory of JSON files with one event each.
+        :param concurrency: Number of concurrent invocations.
+        :param invocations: Total number of invocations. Events are replayed round robin.
+        :param p50_budget_ms: Maximum client side p50 latency in milliseconds. Optional
+        :param p99_budget_ms: Maximum client side p99 latency in milliseconds. Optional
+        :param max_regression: Maximum growth of client side, duration and billed duration percentiles relative
+        to the previous passed run, e.g. 0.2 fails the stage if p99 is more than 20% slower. None disables the check.
+        :param max_error_rate: Maximum fraction of failed invocations.
+        """
+        assert concurrency > 0 and invocations > 0, 'Concurrency and invocations must be positive.'
+
+        self.events_path = events_path
+        self.concurrency = concurrency
+        self.invocations = invocations
+        self.p50_budget_ms = p50_budget_ms
+        self.p99_budget_ms = p99_budget_ms
+        self.max_regression = max_regression
+        self.max_error_rate = max_error_rate
@@ -0,0 +1,29 @@
+from aws_ci_cd_lambda.parameters.lambda_parameters import LambdaParameters
+
+
+class MonorepoFunctionParameters:
+    """
+    Parameters, focused on a single function of a repository with many functions.
+    """
+    def __init__(
+            self,
+            name: str,
+            source_path: str,
+            lambda_params: LambdaParameters
+    ) -> None:
+        """
+        Constructor.
+
+        :param name: Name of the function. The Lambda function is named by the prefix followed by this name.
+        :param source_path: Directory of the function source code relative to the repository root.
+        Its contents are placed to the root of the deployment package, hence the handler is relative to it.
+        :param lambda_params: Parameters, focusing on the Lambda function itself.
+        """
+        source_path = source_path.strip('/')
+
+        assert name.isalnum(), 'Function name must be alphanumeric.'
+        assert source_path and not source_path.startswith('.'), 'Source path must be a directory inside the repository.'
+
+        self.name = name
+        self.source_path = source_path
+        self.lambda_params = lambda_params
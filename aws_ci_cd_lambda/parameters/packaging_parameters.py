@@ -0,0 +1,43 @@
+from typing import Optional, List
+
+from aws_ci_cd_lambda.build_tools.slimming import PRUNE_RULES
+
+
+class PackagingParameters:
+    """
+    Parameters, focused on packaging the function code and its dependencies into a deployment package.
+    """
+    def __init__(
+            self,
+            compression_level: int = 6,
+            workers: Optional[int] = None,
+            layered: bool = False,
+            prune_rules: Optional[List[str]] = None,
+            strip_binaries: bool = False,
+            precompile: bool = False
+    ) -> None:
+        """
+        Constructor.
+
+        :param compression_level: Zip compression level from 0 (no compression) to 9 (best compression).
+        :param workers: Number of parallel compression threads. Defaults to the number of CPU cores of the build.
+        :param layered: If enabled, dependencies are deployed as a separate Lambda Layer named by a hash of the
+        resolved dependency set. The layer is published only when dependencies change, and the function package
+        contains only your code.
+        :param prune_rules: Names of slimming rules, that remove files not needed at runtime from the package:
+        "pycache", "tests", "docs", "stubs", "examples", "dist_info" and "boto3" (the runtime provides boto3).
+        See build_tools.slimming.DEFAULT_PRUNE_RULES for a set that is safe for most packages.
+        :param strip_binaries: Strip debug symbols from shared objects (.so files).
+        :param precompile: Precompile python sources into bytecode of the function runtime.
+        """
+        assert 0 <= compression_level <= 9, 'Compression level must be between 0 and 9.'
+
+        unknown = set(prune_rules or []) - set(PRUNE_RULES)
+        assert not unknown, f'Unknown prune rules: {", ".join(sorted(unknown))}.'
+
+        self.compression_level = compression_level
+        self.workers = workers
+        self.layered = layered
+        self.prune_rules = prune_rules or []
+        self.strip_binaries = strip_binaries
+        self.precompile = precompile
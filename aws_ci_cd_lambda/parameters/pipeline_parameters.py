@@ -1,6 +1,15 @@
 from typing import Optional, List
+from aws_cdk.aws_codebuild import ComputeType, IBuildImage
 
+from aws_ci_cd_lambda.parameters.cache_parameters import CacheParameters
+from aws_ci_cd_lambda.parameters.container_image_parameters import ContainerImageParameters
+from aws_ci_cd_lambda.parameters.import_time_parameters import ImportTimeParameters
+from aws_ci_cd_lambda.parameters.load_test_parameters import LoadTestParameters
+from aws_ci_cd_lambda.parameters.packaging_parameters import PackagingParameters
+from aws_ci_cd_lambda.parameters.retention_parameters import RetentionParameters
 from aws_ci_cd_lambda.parameters.ssh_parameters import SshParameters
+from aws_ci_cd_lambda.parameters.traffic_shifting_parameters import TrafficShiftingParameters
+from aws_ci_cd_lambda.parameters.wheelhouse_parameters import WheelhouseParameters
 
 
 class PipelineParameters:
@@ -12,7 +21,19 @@ class PipelineParameters:
             ssh_params: SshParameters,
             install_args: Optional[List[str]] = None,
             test_args: Optional[List[str]] = None,
-            custom_pre_build_commands: Optional[List[str]] = None
+            custom_pre_build_commands: Optional[List[str]] = None,
+            cache_params: Optional[CacheParameters] = None,
+            packaging_params: Optional[PackagingParameters] = None,
+            import_time_params: Optional[ImportTimeParameters] = None,
+            build_compute_type: Optional[ComputeType] = None,
+            build_image: Optional[IBuildImage] = None,
+            wheelhouse_params: Optional[WheelhouseParameters] = None,
+            test_shards: int = 1,
+            traffic_shifting_params: Optional[TrafficShiftingParameters] = None,
+            load_test_params: Optional[LoadTestParameters] = None,
+            container_image_params: Optional[ContainerImageParameters] = None,
+            retention_params: Optional[RetentionParameters] = None,
+            template_path: Optional[str] = None
     ) -> None:
         """
         Constructor.
@@ -21,9 +42,49 @@ class PipelineParameters:
         :param install_args: Arguments for your ./install.sh script
         :param test_args: Arguments for your ./test.sh script
         :param custom_pre_build_commands: Commands, that CodeBuild should execute between installation and testing. Optional
+        :param cache_params: Parameters, focused on caching function dependencies between builds. Optional
+        :param packaging_params: Parameters, focused on packaging the deployment package. Optional
+        :param import_time_params: Parameters, focused on failing builds whose import time regresses. Optional
+        :param build_compute_type: Compute type of the CodeBuild project. Defaults to SMALL (LARGE for ARM64).
+        :param build_image: Image of the CodeBuild project. Defaults to a standard image matching
+        the function architecture. The image must contain the python version of the function runtime.
+        See BuildImage for an image with build tools preinstalled.
+        :param wheelhouse_params: Parameters, focused on a wheelhouse of pre-built dependencies shared between
+        pipelines. Optional
+        :param test_shards: Number of parallel CodeBuild actions, that run your ./test.sh script before the deploy
+        build. Each shard gets SHARD_INDEX, SHARD_TOTAL and SHARD_TESTS_FILE (test files of the shard, balanced by
+        historical durations) environment variables. Write a JUnit XML report to SHARD_JUNIT_PATH to record
+        durations. Custom pre build commands run in every shard. Defaults to 1 (tests run in the deploy build).
+        :param traffic_shifting_params: Parameters, focused on progressive CodeDeploy traffic shifting to new
+        versions with automatic rollback on alarms. Optional
+        :param load_test_params: Parameters, focused on load testing new versions before promoting them. Optional
+        :param container_image_params: Parameters, focused on deploying the function as a container image.
+        Packaging parameters and the import time gate apply to zip packages only. Optional
+        :param retention_params: Parameters, focused on expiring old deployment packages and pipeline artifacts.
+        Defaults to 30 days for packages and 14 days for pipeline artifacts.
+        :param template_path: A local directory, whose files are pushed to a new repository. Files changed in
+        the directory are pushed again on stack updates. Defaults to a minimal template (install.sh, test.sh and
+        manage.py with a manage.runner handler).
         """
+        assert test_shards >= 1, 'There must be at least one test shard.'
+
+        if container_image_params is not None:
+            assert not (packaging_params and packaging_params.layered), 'Container images can not use layers.'
+            assert import_time_params is None, 'Import time gate is not supported for container images.'
 
         self.ssh_params = ssh_params
         self.install_args = install_args
         self.test_args = test_args
         self.custom_pre_build_commands = custom_pre_build_commands
+        self.cache_params = cache_params
+        self.packaging_params = packaging_params or PackagingParameters()
+        self.import_time_params = import_time_params
+        self.build_compute_type = build_compute_type
+        self.build_image = build_image
+        self.wheelhouse_params = wheelhouse_params
+        self.test_shards = test_shards
+        self.traffic_shifting_params = traffic_shifting_params
+        self.load_test_params = load_test_params
+        self.container_image_params = container_image_params
+        self.retention_params = retention_params or RetentionParameters()
+        self.template_path = template_path
@@ -0,0 +1,33 @@
+from typing import List, Optional, Tuple
+from aws_cdk.aws_applicationautoscaling import Schedule
+
+
+class ProvisionedConcurrencyParameters:
+    """
+    Parameters, focused on keeping function instances initialized with provisioned concurrency.
+    """
+    def __init__(
+            self,
+            min_capacity: int,
+            max_capacity: int,
+            utilization_target: float = 0.7,
+            scheduled_capacity: Optional[List[Tuple[str, Schedule, int, int]]] = None
+    ) -> None:
+        """
+        Constructor. Provisioned concurrency is configured on a "live" alias, which the pipeline moves
+        to every newly deployed version, so provisioned instances stay warm across deploys.
+
+        :param min_capacity: Minimum number of provisioned instances.
+        :param max_capacity: Maximum number of provisioned instances.
+        :param utilization_target: Target value of ProvisionedConcurrencyUtilization metric for target tracking
+        scaling, e.g. 0.7 scales out when 70% of provisioned instances are in use.
+        :param scheduled_capacity: Scheduled scaling actions for known traffic peaks. Each action is a tuple of
+        a unique action id, a schedule, minimum capacity and maximum capacity. Optional.
+        """
+        assert 0 < min_capacity <= max_capacity, 'Capacity must be positive and min capacity must not exceed max.'
+        assert 0 < utilization_target < 1, 'Utilization target must be between 0 and 1.'
+
+        self.min_capacity = min_capacity
+        self.max_capacity = max_capacity
+        self.utilization_target = utilization_target
+        self.scheduled_capacity = scheduled_capacity or []
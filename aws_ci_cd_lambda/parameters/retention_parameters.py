@@ -0,0 +1,25 @@
+class RetentionParameters:
+    """
+    Parameters, focused on how long deployment packages and pipeline artifacts are kept in the artifacts bucket.
+    """
+    def __init__(
+            self,
+            artifact_retention_days: int = 30,
+            pipeline_artifact_retention_days: int = 14
+    ) -> None:
+        """
+        Constructor. Deployment packages are stored under their sha256 hash ("artifacts/<hash>.zip") together with
+        manifests, that map commits to packages ("manifests/<function>/<commit>.json"). A package is refreshed every
+        time it is deployed, hence only packages, that have not been deployed for the retention period, expire.
+Manifests are written together with the refresh and expire no later than their packages, so a package can not
+expire while a manifest still references it. Commits older than the retention period can not be rolled back to.
+
+        :param artifact_retention_days: Days to keep packages and manifests after they were last deployed.
+        This is how far back the rollback tool can go.
+        :param pipeline_artifact_retention_days: Days to keep CodePipeline source and build artifacts.
+        """
+        assert artifact_retention_days > 0, 'Artifact retention must be positive.'
+        assert pipeline_artifact_retention_days > 0, 'Pipeline artifact retention must be positive.'
+
+        self.artifact_retention_days = artifact_retention_days
+        self.pipeline_artifact_retention_days = pipeline_artifact_retention_days
@@ -0,0 +1,43 @@
+from typing import List, Optional
+from aws_cdk.aws_cloudwatch import IAlarm
+
+
+class TrafficShiftingParameters:
+    """
+    Parameters, focused on shifting traffic to newly deployed versions progressively with CodeDeploy.
+    """
+    STRATEGIES = ['canary', 'linear', 'all_at_once']
+
+    def __init__(
+            self,
+            strategy: str = 'canary',
+            percentage: int = 10,
+            interval_minutes: int = 5,
+            rollback_on_errors: bool = True,
+            rollback_on_duration: bool = True,
+            alarms: Optional[List[IAlarm]] = None
+    ) -> None:
+        """
+        Constructor. New versions are published through a "live" alias. CodeDeploy moves traffic from the
+        current version to the new one and rolls back automatically if any of the monitored alarms fires
+        before all traffic is shifted.
+
+        :param strategy: "canary" shifts the percentage of traffic, waits for the interval (the bake time) and
+        shifts the rest. "linear" shifts the percentage every interval. "all_at_once" shifts all traffic immediately.
+        :param percentage: Percentage of traffic shifted at once. Ignored for "all_at_once".
+        :param interval_minutes: Minutes between traffic shifts. Ignored for "all_at_once".
+        :param rollback_on_errors: Roll back if the errors alarm of the function fires.
+        :param rollback_on_duration: Roll back if the p99 duration alarm of the function fires
+        (see AlarmParameters.duration_p99_timeout_fraction). The alarm is created even without AlarmParameters.
+        :param alarms: Additional alarms, that roll back a deployment. Optional
+        """
+        assert strategy in self.STRATEGIES, f'Strategy must be one of: {", ".join(self.STRATEGIES)}.'
+        assert 0 < percentage < 100, 'Percentage must be between 1 and 99.'
+        assert interval_minutes > 0, 'Interval must be positive.'
+
+        self.strategy = strategy
+        self.percentage = percentage
+        self.interval_minutes = interval_minutes
+        self.rollback_on_errors = rollback_on_errors
+        self.rollback_on_duration = rollback_on_duration
+        self.alarms = alarms or []
@@ -0,0 +1,32 @@
+from typing import List, Optional
+
+
+class VpcEndpointParameters:
+    """
+    Parameters, focused on VPC endpoints, that keep AWS API calls of your function inside the VPC.
+    """
+    def __init__(
+            self,
+            gateway_services: Optional[List[str]] = None,
+            interface_services: Optional[List[str]] = None,
+            private_dns_enabled: bool = True
+    ) -> None:
+        """
+        Constructor. Without endpoints a function in a VPC reaches AWS APIs through a NAT gateway, which adds
+        latency to every call and costs per gigabyte. Gateway endpoints are free and add routes to the route tables
+        of the function subnets. Interface endpoints are placed in the function subnets and accept HTTPS
+        from the function security groups only.
+
+        :param gateway_services: Services reached through gateway endpoints. Defaults to "s3" and "dynamodb".
+        :param interface_services: Services reached through interface endpoints, named like the service part
+        of their endpoint, e.g. "secretsmanager", "sqs", "sts", "kms", "ssm". Defaults to "secretsmanager",
+        "sqs" and "sts".
+        :param private_dns_enabled: Resolve default service domain names to the interface endpoints, so the SDK
+        uses them without configuration. Disable it if the VPC already has endpoints for these services.
+        """
+        gateway_services = ['s3', 'dynamodb'] if gateway_services is None else gateway_services
+        assert set(gateway_services) <= {'s3', 'dynamodb'}, 'Gateway endpoints exist for "s3" and "dynamodb" only.'
+
+        self.gateway_services = gateway_services
+        self.interface_services = ['secretsmanager', 'sqs', 'sts'] if interface_services is None else interface_services
+        self.private_dns_enabled = private_dns_enabled
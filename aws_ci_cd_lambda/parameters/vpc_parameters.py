@@ -1,5 +1,6 @@
-from typing import List
+from typing import List, Optional
 from aws_cdk.aws_ec2 import Vpc, Subnet, SecurityGroup
+from aws_ci_cd_lambda.vpc_endpoints import VpcEndpoints
 
 
 class VpcParameters:
@@ -11,6 +12,7 @@ class VpcParameters:
             vpc: Vpc,
             subnets: List[Subnet],
             security_groups: List[SecurityGroup],
+            endpoints: Optional[VpcEndpoints] = None
     ) -> None:
         """
         Constructor.
@@ -18,7 +20,11 @@ class VpcParameters:
         :param vpc: VPC your function should be deployed to.
         :param subnets: List of subnets your function should be deployed to.
         :param security_groups: List of security groups for your function.
+        :param endpoints: VPC endpoints for AWS services your function calls. Create them once per VPC and
+        pass the same object to every function in the VPC. The function security groups are allowed to reach them.
+        Optional
         """
         self.vpc = vpc
         self.subnets = subnets
         self.security_groups = security_groups
+        self.endpoints = endpoints
@@ -0,0 +1,34 @@
+class WarmerParameters:
+    """
+    Parameters, focused on keeping function instances warm with scheduled invocations. A cheaper alternative to
+    provisioned concurrency for functions with spiky, low-volume traffic.
+    """
+    # Key of the event, that marks a warming invocation.
+    MARKER = 'ciCdLambdaWarmer'
+
+    def __init__(
+            self,
+            concurrency: int = 5,
+            rate_minutes: int = 5,
+            hold_ms: int = 100
+    ) -> None:
+        """
+        Constructor. A schedule triggers a warmer function, which invokes your function concurrently with
+        {"ciCdLambdaWarmer": {...}} events. Your handler must return right away on such events (see
+        runtime.handler in files/template/runtime.py). The warmer publishes ColdStarts and WarmHits metrics
+        (CiCdLambda/Warmer namespace) from the responses. Note, that warming invocations are counted in the
+        Invocations and Duration metrics of your function.
+
+        :param concurrency: Number of concurrent invocations, i.e. instances kept warm.
+        :param rate_minutes: Interval between warming rounds. Idle instances are usually reclaimed
+        after 5 to 15 minutes.
+        :param hold_ms: Time, for which a warming invocation holds its instance, so concurrent invocations
+        can not reuse it and reach other instances.
+        """
+        assert 1 <= concurrency <= 100, 'Warmer concurrency must be between 1 and 100.'
+        assert rate_minutes >= 1, 'Warmer rate must be at least one minute.'
+        assert 0 <= hold_ms <= 1000, 'Warming invocations must not hold instances longer than a second.'
+
+        self.concurrency = concurrency
+        self.rate_minutes = rate_minutes
+        self.hold_ms = hold_ms
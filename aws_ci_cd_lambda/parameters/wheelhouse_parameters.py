@@ -0,0 +1,22 @@
+from aws_cdk.aws_s3 import IBucket
+
+
+class WheelhouseParameters:
+    """
+    Parameters, focused on a wheelhouse of pre-built dependencies shared between pipelines.
+    """
+    def __init__(
+            self,
+            bucket: IBucket,
+            prefix: str = 'wheelhouse'
+    ) -> None:
+        """
+        Constructor. Several pipelines can reference the same bucket and prefix. Wheels are stored under
+        a key of the python version, architecture and build image distribution. Pip finds them through
+        PIP_FIND_LINKS, hence your install.sh script should install dependencies with pip.
+
+        :param bucket: S3 bucket of the wheelhouse.
+        :param prefix: Key prefix of the wheelhouse in the bucket.
+        """
+        self.bucket = bucket
+        self.prefix = prefix.strip('/')
@@ -0,0 +1,255 @@
+import os
+import re
+
+from typing import List, Optional
+from aws_cdk import aws_iam, aws_s3_assets, core
+from aws_empty_bucket.empty_s3_bucket import EmptyS3Bucket
+from aws_ci_cd_lambda.build_tools.timing import NAMESPACE
+from aws_ci_cd_lambda.parameters.cache_parameters import CacheParameters
+from aws_ci_cd_lambda.parameters.retention_parameters import RetentionParameters
+from aws_ci_cd_lambda.parameters.ssh_parameters import SshParameters
+from aws_ci_cd_lambda.parameters.wheelhouse_parameters import WheelhouseParameters
+
+
+class SharedInfrastructure:
+    """
+    Infrastructure, that many CiCdLambda pipelines of one stack can share: the artifacts bucket (together with its
+    emptying custom resource), build tools, a CodeBuild role and the role of the initial commit custom resource.
+    Without it every pipeline creates its own copies, which makes stacks with many functions slow to synthesize
+    and deploy and quickly exhausts the CloudFormation resource limit.
+    """
+    def __init__(
+            self,
+            scope: core.Stack,
+            prefix: str,
+            retention_params: Optional[RetentionParameters] = None,
+            build_role_statements: Optional[List[aws_iam.PolicyStatement]] = None,
+            ssh_params: Optional[SshParameters] = None,
+            wheelhouse_params: Optional[WheelhouseParameters] = None,
+            cache_params: Optional[CacheParameters] = None
+    ) -> None:
+        """
+        Constructor. Pass the object to every CiCdLambda, that should use it.
+
+        The shared CodeBuild role is not extended by pipelines, since dozens of pipelines would exceed the IAM
+        policy size limit of a single role. Instead it is granted everything pipelines need up front (on functions,
+        aliases and ECR repositories of the account). Resources, that depend on your setup, i.e. the ssh key
+        secret, a wheelhouse or a cache bucket, must be given here and pipelines must use the same ones
+        (CiCdLambda fails otherwise). Other permissions can be given in build_role_statements.
+
+        :param scope: A scope in which resources shall be created.
+        :param prefix: Prefix for all of your resource IDs and names.
+        :param retention_params: Parameters, focused on expiring old deployment packages. Retention of pipeline
+        artifacts is still set by each pipeline. Defaults to 30 days.
+        :param build_role_statements: Additional permissions of the shared CodeBuild role. Optional
+        :param ssh_params: The ssh key secret (and its KMS key), that pipelines read. Optional
+        :param wheelhouse_params: The wheelhouse, that pipelines read and write. Optional
+        :param cache_params: The dependency cache of pipelines. Only an S3 cache bucket needs permissions. Optional
+        """
+        stack = core.Stack.of(scope)
+        retention_params = retention_params or RetentionParameters()
+
+        self.__bucket = EmptyS3Bucket(
+            scope, prefix + 'CiCdLambdaSharedDeploymentBucket',
+            bucket_name=self.__convert(prefix + 'CiCdLambdaSharedArtifactsBucket')
+        )
+
+        # Packages are content-addressed, hence identical packages of different functions are stored once.
+        for rule_prefix in ['artifacts/', 'manifests/']:
+            self.__bucket.add_lifecycle_rule(
+                prefix=rule_prefix,
+                expiration=core.Duration.days(retention_params.artifact_retention_days),
+                abort_incomplete_multipart_upload_after=core.Duration.days(1)
+            )
+
+        self.__build_tools = aws_s3_assets.Asset(
+            scope, prefix + 'CiCdLambdaSharedBuildTools',
+            path=os.path.join(os.path.dirname(os.path.realpath(__file__)), 'build_tools'),
+            exclude=['__pycache__', '*.pyc']
+        )
+
+        self.__mutable_build_role = aws_iam.Role(
+            scope, prefix + 'CiCdLambdaSharedBuildRole',
+            assumed_by=aws_iam.ServicePrincipal('codebuild.amazonaws.com')
+        )
+
+        self.__bucket.grant_read_write(self.__mutable_build_role)
+        self.__build_tools.grant_read(self.__mutable_build_role)
+
+        statements = [
+            # What CodeBuild projects usually grant themselves.
+            aws_iam.PolicyStatement(
+                actions=['logs:CreateLogGroup', 'logs:CreateLogStream', 'logs:PutLogEvents'],
+                resources=[stack.format_arn(
+                    service='logs',
+                    resource='log-group',
+                    resource_name='/aws/codebuild/*',
+                    sep=':'
+                )],
+                effect=aws_iam.Effect.ALLOW
+            ),
+            aws_iam.PolicyStatement(
+                actions=[
+                    'codebuild:CreateReportGroup',
+                    'codebuild:CreateReport',
+                    'codebuild:UpdateReport',
+                    'codebuild:BatchPutTestCases',
+                    'codebuild:BatchPutCodeCoverages',
+                ],
+                resources=[stack.format_arn(service='codebuild', resource='report-group', resource_name='*')],
+                effect=aws_iam.Effect.ALLOW
+            ),
+            # Deploys, layers, load tests and alias promotion.
+            aws_iam.PolicyStatement(
+                actions=[
+                    'lambda:GetFunctionConfiguration',
+                    'lambda:UpdateFunctionCode',
+                    'lambda:UpdateFunctionConfiguration',
+                    'lambda:PublishVersion',
+                    'lambda:PublishLayerVersion',
+                    'lambda:ListLayerVersions',
+                    'lambda:GetLayerVersion',
+                    'lambda:GetAlias',
+                    'lambda:UpdateAlias',
+                    'lambda:InvokeFunction',
+                ],
+                resources=['*'],
+                effect=aws_iam.Effect.ALLOW
+            ),
+            # Progressive traffic shifting.
+            aws_iam.PolicyStatement(
+                actions=[
+                    'codedeploy:CreateDeployment',
+                    'codedeploy:GetDeployment',
+                    'codedeploy:GetDeploymentConfig',
+                    'codedeploy:GetApplicationRevision',
+                    'codedeploy:RegisterApplicationRevision',
+                ],
+                resources=['*'],
+                effect=aws_iam.Effect.ALLOW
+            ),
+            # Container image builds.
+            aws_iam.PolicyStatement(
+                actions=['ecr:GetAuthorizationToken'],
+                resources=['*'],
+                effect=aws_iam.Effect.ALLOW
+            ),
+            aws_iam.PolicyStatement(
+                actions=[
+                    'ecr:BatchCheckLayerAvailability',
+                    'ecr:BatchGetImage',
+                    'ecr:GetDownloadUrlForLayer',
+                    'ecr:InitiateLayerUpload',
+                    'ecr:UploadLayerPart',
+                    'ecr:CompleteLayerUpload',
+                    'ecr:PutImage',
+                    'ecr:DescribeImages',
+                    'ecr:GetRepositoryPolicy',
+                    'ecr:SetRepositoryPolicy',
+                ],
+                resources=[stack.format_arn(service='ecr', resource='repository', resource_name='*')],
+                effect=aws_iam.Effect.ALLOW
+            ),
+            # Build timings (see build_tools/timing.py).
+            aws_iam.PolicyStatement(
+                actions=['cloudwatch:PutMetricData'],
+                resources=['*'],
+                conditions={'StringEquals': {'cloudwatch:namespace': NAMESPACE}},
+                effect=aws_iam.Effect.ALLOW
+            ),
+        ]
+
+        if ssh_params is not None and ssh_params.secret_arn is not None:
+            statements.append(aws_iam.PolicyStatement(
+                actions=['secretsmanager:GetSecretValue'],
+                resources=[ssh_params.secret_arn],
+                effect=aws_iam.Effect.ALLOW
+            ))
+
+        if ssh_params is not None and ssh_params.kms_key_arn is not None:
+            statements.append(aws_iam.PolicyStatement(
+                actions=['kms:Decrypt'],
+                resources=[ssh_params.kms_key_arn],
+                effect=aws_iam.Effect.ALLOW
+            ))
+
+        if wheelhouse_params is not None:
+            wheelhouse_params.bucket.grant_read_write(
+                self.__mutable_build_role,
+                objects_key_pattern=f'{wheelhouse_params.prefix}/*'
+            )
+
+        if cache_params is not None and cache_params.bucket is not None:
+            cache_params.bucket.grant_read_write(
+                self.__mutable_build_role,
+                objects_key_pattern=f'{cache_params.bucket_prefix}/*' if cache_params.bucket_prefix else '*'
+            )
+
+        self.__ssh_params = ssh_params
+        self.__wheelhouse_params = wheelhouse_params
+        self.__cache_params = cache_params
+
+        for statement in statements + (build_role_statements or []):
+            self.__mutable_build_role.add_to_policy(statement)
+
+        # Pipelines try to extend the role of their projects. Those statements are dropped.
+        self.__build_role = self.__mutable_build_role.without_policy_updates()
+
+        # Initial commit resources of a stack share one function, hence also one role.
+        self.__custom_resource_role = aws_iam.Role(
+            scope, prefix + 'CiCdLambdaSharedCustomResourceRole',
+            assumed_by=aws_iam.ServicePrincipal('lambda.amazonaws.com'),
+            inline_policies={
+                prefix + 'CiCdLambdaSharedCustomResourcePolicy': aws_iam.PolicyDocument(
+                    statements=[
+                        aws_iam.PolicyStatement(
+                            actions=['codecommit:GetBranch', 'codecommit:GetFile', 'codecommit:CreateCommit'],
+                            resources=[stack.format_arn(service='codecommit', resource='*CiCdLambdaCodeCommitRepo')],
+                            effect=aws_iam.Effect.ALLOW
+                        ),
+                        aws_iam.PolicyStatement(
+                            actions=['logs:CreateLogGroup', 'logs:CreateLogStream', 'logs:PutLogEvents'],
+                            resources=['*'],
+                            effect=aws_iam.Effect.ALLOW
+                        ),
+                    ]
+                )
+            }
+        )
+
+    @property
+    def bucket(self) -> EmptyS3Bucket:
+        return self.__bucket
+
+    @property
+    def build_tools(self) -> aws_s3_assets.Asset:
+        return self.__build_tools
+
+    @property
+    def build_role(self) -> aws_iam.IRole:
+        return self.__build_role
+
+    @property
+    def custom_resource_role(self) -> aws_iam.Role:
+        return self.__custom_resource_role
+
+    @property
+    def ssh_params(self) -> Optional[SshParameters]:
+        return self.__ssh_params
+
+    @property
+    def wheelhouse_params(self) -> Optional[WheelhouseParameters]:
+        return self.__wheelhouse_params
+
+    @property
+    def cache_params(self) -> Optional[CacheParameters]:
+        return self.__cache_params
+
+    @staticmethod
+    def __convert(name: str) -> str:
+        """
+        Converts CamelCase string to pascal-case where underscores are dashes.
+        This is required due to S3 not supporting capital letters or underscores.
+        """
+        s1 = re.sub('(.)([A-Z][a-z]+)', r'\1-\2', name)
+        return re.sub('([a-z0-9])([A-Z])', r'\1-\2', s1).lower()
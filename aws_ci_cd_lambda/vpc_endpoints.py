@@ -0,0 +1,111 @@
+from typing import List, Optional
+from aws_cdk.aws_ec2 import (
+    GatewayVpcEndpoint,
+    GatewayVpcEndpointAwsService,
+    InterfaceVpcEndpoint,
+    InterfaceVpcEndpointAwsService,
+    ISecurityGroup,
+    ISubnet,
+    IVpc,
+    Port,
+    SecurityGroup,
+    SubnetSelection
+)
+from aws_cdk.core import Stack
+from aws_ci_cd_lambda.parameters.vpc_endpoint_parameters import VpcEndpointParameters
+
+
+class VpcEndpoints:
+    """
+    Gateway and interface VPC endpoints for AWS services, that functions in a VPC call.
+
+    Endpoints belong to the VPC: a VPC can have one gateway endpoint per service and route table and only one
+    interface endpoint per service with private DNS. Create them once per VPC and pass them to every function
+    in it (see VpcParameters).
+    """
+    def __init__(
+            self,
+            scope: Stack,
+            prefix: str,
+            vpc: IVpc,
+            subnets: List[ISubnet],
+            endpoint_params: Optional[VpcEndpointParameters] = None
+    ) -> None:
+        """
+        Constructor.
+
+        :param scope: A scope in which resources shall be created.
+        :param prefix: Prefix for all of your resource IDs and names.
+        :param vpc: VPC of your functions.
+        :param subnets: Subnets of your functions. Gateway endpoints are routed from them and interface endpoints
+        are placed in them.
+        :param endpoint_params: Parameters, focused on services to create endpoints for. Optional
+        """
+        endpoint_params = endpoint_params or VpcEndpointParameters()
+        subnet_selection = SubnetSelection(subnets=subnets)
+
+        self.__gateway_endpoints: List[GatewayVpcEndpoint] = [
+            GatewayVpcEndpoint(
+                scope, prefix + f'CiCdLambda{service.capitalize()}GatewayEndpoint',
+                vpc=vpc,
+                service=GatewayVpcEndpointAwsService(service),
+                subnets=[subnet_selection]
+            )
+            for service in endpoint_params.gateway_services
+        ]
+
+        self.__interface_endpoints: List[InterfaceVpcEndpoint] = []
+        self.__security_group = None
+
+        if endpoint_params.interface_services:
+            # Interface endpoints accept HTTPS from function security groups only (see allow_from).
+            self.__security_group = SecurityGroup(
+                scope, prefix + 'CiCdLambdaEndpointSecurityGroup',
+                vpc=vpc,
+                description=f'VPC endpoints of {prefix}.',
+                allow_all_outbound=False
+            )
+
+            for service in endpoint_params.interface_services:
+                name = ''.join(part.capitalize() for part in service.replace('.', '-').split('-'))
+
+                self.__interface_endpoints.append(InterfaceVpcEndpoint(
+                    scope, prefix + f'CiCdLambda{name}InterfaceEndpoint',
+                    vpc=vpc,
+                    service=InterfaceVpcEndpointAwsService(service),
+                    subnets=subnet_selection,
+                    security_groups=[self.__security_group],
+                    private_dns_enabled=endpoint_params.private_dns_enabled,
+                    open=False
+                ))
+
+    def allow_from(self, security_groups: List[ISecurityGroup]) -> None:
+        """
+        Lets functions reach the interface endpoints. Called by every CiCdLambda, that uses the endpoints.
+        Rules of the same security group are added once.
+
+        :param security_groups: Security groups of functions.
+
+        :return: No return.
+        """
+        if self.__security_group is None:
+            return
+
+        for security_group in security_groups:
+            self.__security_group.connections.allow_from(
+                security_group,
+                Port.tcp(443),
+                'HTTPS from the function.'
+            )
+
+    @property
+    def gateway_endpoints(self) -> List[GatewayVpcEndpoint]:
+        return self.__gateway_endpoints
+
+    @property
+    def interface_endpoints(self) -> List[InterfaceVpcEndpoint]:
+        return self.__interface_endpoints
+
+    @property
+    def security_group(self) -> Optional[SecurityGroup]:
+        return self.__security_group
@@ -0,0 +1,70 @@
+"""
+Handler of the warmer function (see LambdaWarmer).
+
+Invokes the target function concurrently with warming events and publishes, how many of the invocations hit
+a warm instance and how many started a new one, as CloudWatch Embedded Metric Format records.
+"""
+import json
+import os
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict
+
+import boto3
+import botocore.config
+
+TARGET = os.environ['TARGET_FUNCTION']
+FUNCTION_NAME = os.environ['FUNCTION_NAME']
+CONCURRENCY = int(os.environ['CONCURRENCY'])
+HOLD_MS = int(os.environ['HOLD_MS'])
+MARKER = os.environ['MARKER']
+NAMESPACE = os.environ['NAMESPACE']
+
+# The default connection pool is smaller than the maximum concurrency.
+client = boto3.client('lambda', config=botocore.config.Config(max_pool_connections=max(CONCURRENCY, 10)))
+
+
+def warm(index: int) -> Dict[str, Any]:
+    """
+    Invokes the target with a warming event.
+
+    :return: Response of the target, e.g. {"cold": true}.
+    """
+    event = {MARKER: {'index': index, 'concurrency': CONCURRENCY, 'holdMs': HOLD_MS}}
+    response = client.invoke(FunctionName=TARGET, Payload=json.dumps(event).encode())
+    payload = json.loads(response['Payload'].read() or 'null')
+
+    if 'FunctionError' in response or not isinstance(payload, dict):
+        raise RuntimeError(f'Warming invocation {index} failed: {payload}')
+
+    return payload
+
+
+def handler(event: Dict[str, Any], context: Any) -> Dict[str, int]:
+    counts = {'ColdStarts': 0, 'WarmHits': 0, 'Failures': 0}
+
+    with ThreadPoolExecutor(max_workers=CONCURRENCY) as executor:
+        futures = [executor.submit(warm, index) for index in range(CONCURRENCY)]
+
+    for future in futures:
+        try:
+            counts['ColdStarts' if future.result().get('cold') else 'WarmHits'] += 1
+        except Exception as error:
+            counts['Failures'] += 1
+            print(error)
+
+    print(json.dumps({
+        '_aws': {
+            'Timestamp': int(time.time() * 1000),
+            'CloudWatchMetrics': [{
+                'Namespace': NAMESPACE,
+                'Dimensions': [['FunctionName']],
+                'Metrics': [{'Name': name, 'Unit': 'Count'} for name in sorted(counts)],
+            }],
+        },
+        'FunctionName': FUNCTION_NAME,
+        **counts,
+    }))
+
+    return counts
@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+"""
+Compares first-call and steady-state latency of a handler written with the template runtime
+(files/template/runtime.py) against a naive handler doing the same work: deriving a key (an expensive object),
+importing a module and calling a local HTTP service.
+
+The naive handler does everything on every invocation and opens a new connection per request. The runtime
+handler caches the key per instance, imports the module lazily and reuses a keep-alive connection.
+Every handler runs in a fresh process, so the first call includes module imports like a cold start.
+
+Usage:
+    python benchmarks/handler_benchmark.py [--invocations 200] [--runs 5]
+"""
+import argparse
+import http.server
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+from typing import Any, Dict, List
+
+TEMPLATE = os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', 'aws_ci_cd_lambda', 'files', 'template')
+
+HANDLERS = {
+    'naive': '''
+import hashlib
+import http.client
+import urllib.parse
+
+
+def runner(event, context):
+    import xml.dom.minidom
+
+    key = hashlib.pbkdf2_hmac('sha256', b'secret', b'salt', 20000)
+    parts = urllib.parse.urlsplit(event['url'])
+    connection = http.client.HTTPConnection(parts.hostname, parts.port)
+    connection.request('GET', parts.path)
+    body = connection.getresponse().read()
+    connection.close()
+
+    return {'key': key.hex(), 'size': len(body), 'document': xml.dom.minidom.__name__}
+''',
+    'runtime': '''
+import hashlib
+
+import runtime
+
+minidom = runtime.lazy_import('xml.dom.minidom')
+
+
+@runtime.once
+def key():
+    return hashlib.pbkdf2_hmac('sha256', b'secret', b'salt', 20000)
+
+
+@runtime.handler
+def runner(event, context):
+    status, headers, body = runtime.request('GET', event['url'])
+
+    return {'key': key().hex(), 'size': len(body), 'document': minidom.__name__}
+''',
+}
+
+
+class Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    # Headers and body are written separately, which Nagle's algorithm delays on keep-alive connections.
+    disable_nagle_algorithm = True
+
+    def do_GET(self) -> None:
+        body = b'{"status": "ok"}'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args: Any) -> None:
+        pass
+
+
+def measure(name: str, url: str, invocations: int) -> Dict[str, Any]:
+    """
+    Loads a handler and invokes it. Runs in a dedicated process (see run).
+    """
+    sys.path.insert(0, TEMPLATE)
+    started = time.perf_counter()
+
+    module: Dict[str, Any] = {'__name__': f'{name}_handler'}
+    exec(compile(HANDLERS[name], f'{name}_handler.py', 'exec'), module)
+    module['runner']({'url': url}, None)
+
+    first_ms = (time.perf_counter() - started) * 1000
+    durations = []
+
+    for _ in range(invocations):
+        started = time.perf_counter()
+        module['runner']({'url': url}, None)
+        durations.append((time.perf_counter() - started) * 1000)
+
+    durations.sort()
+
+    return {
+        'first_ms': first_ms,
+        'p50_ms': durations[len(durations) // 2],
+        'p99_ms': durations[min(int(len(durations) * 0.99), len(durations) - 1)],
+    }
+
+
+def run(name: str, url: str, invocations: int) -> Dict[str, Any]:
+    command = [sys.executable, os.path.realpath(__file__), '--measure', name, '--url', url,
+               '--invocations', str(invocations)]
+    # EMF records of the runtime handler are discarded, the result is the last line.
+    result = subprocess.run(command, stdout=subprocess.PIPE, check=True, universal_newlines=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--invocations', type=int, default=200, help='Steady-state invocations per run.')
+    parser.add_argument('--runs', type=int, default=5, help='Fresh processes per handler.')
+    parser.add_argument('--measure', default=None, choices=sorted(HANDLERS), help=argparse.SUPPRESS)
+    parser.add_argument('--url', default=None, help=argparse.SUPPRESS)
+    arguments = parser.parse_args()
+
+    if arguments.measure is not None:
+        print(json.dumps(measure(arguments.measure, arguments.url, arguments.invocations)))
+        return
+
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f'http://127.0.0.1:{server.server_address[1]}/status'
+
+    print(f'{"handler":<8} {"first ms":>9} {"p50 ms":>8} {"p99 ms":>8}')
+
+    try:
+        for name in HANDLERS:
+            results: List[Dict[str, Any]] = [run(name, url, arguments.invocations) for _ in range(arguments.runs)]
+
+            print(
+                f'{name:<8} '
+                f'{statistics.median(item["first_ms"] for item in results):>9.2f} '
+                f'{statistics.median(item["p50_ms"] for item in results):>8.3f} '
+                f'{statistics.median(item["p99_ms"] for item in results):>8.3f}'
+            )
+    finally:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+"""
+Compares the build_tools.packager against the former shell packaging pipeline
+(two "cp -R" staging copies followed by "zip -9 -r").
+
+Usage:
+    python benchmarks/packager_benchmark.py [--packages 200] [--files 40] [--site-packages PATH]
+"""
+import argparse
+import hashlib
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), '..'))
+
+from aws_ci_cd_lambda.build_tools.packager import build_archive, collect_entries
+
+
+def create_site_packages(path: str, packages: int, files: int) -> None:
+    """
+    Creates a synthetic site-packages directory with python sources and incompressible binaries.
+    """
+    generator = random.Random(0)
+
+    for package in range(packages):
+        package_path = os.path.join(path, f'package_{package}')
+        os.makedirs(package_path)
+
+        for index in range(files):
+            with open(os.path.join(package_path, f'module_{index}.py'), 'w') as file:
+                file.write(f'def function_{index}(value):\n    return value * {index}\n' * 200)
+
+        with open(os.path.join(package_path, '_native.so'), 'wb') as file:
+            file.write(bytes(generator.getrandbits(8) for _ in range(64 * 1024)))
+
+
+def shell_pipeline(source: str, site_packages: str, output: str) -> None:
+    install_path = tempfile.mkdtemp()
+    work_path = tempfile.mkdtemp()
+
+    try:
+        shutil.rmtree(work_path)
+        shutil.copytree(source, work_path)
+        subprocess.check_call(f'cp -R {source}/. {install_path}', shell=True)
+        subprocess.check_call(f'cp -R {site_packages}/. {install_path}', shell=True)
+        subprocess.check_call(f'cp -R {site_packages}/. {work_path}', shell=True)
+        subprocess.check_call(['zip', '-9', '-q', '-r', output, '.'], cwd=install_path)
+    finally:
+        shutil.rmtree(install_path)
+        shutil.rmtree(work_path)
+
+
+def packager(source: str, site_packages: str, output: str, level: int) -> None:
+    build_archive(output, collect_entries([source, site_packages]), level)
+
+
+def measure(function, *args) -> float:
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def digest(path: str) -> str:
+    with open(path, 'rb') as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--packages', type=int, default=200)
+    parser.add_argument('--files', type=int, default=40)
+    parser.add_argument('--site-packages', default=None, help='Use a real site-packages directory instead.')
+    arguments = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        source = os.path.join(directory, 'source')
+        os.makedirs(source)
+
+        with open(os.path.join(source, 'manage.py'), 'w') as file:
+            file.write('def runner(event, context):\n    return {}\n')
+
+        site_packages = arguments.site_packages
+        if site_packages is None:
+            site_packages = os.path.join(directory, 'site-packages')
+            create_site_packages(site_packages, arguments.packages, arguments.files)
+
+        results = []
+
+        if shutil.which('zip'):
+            output = os.path.join(directory, 'shell.zip')
+            results.append(('cp -R + zip -9', measure(shell_pipeline, source, site_packages, output), output))
+        else:
+            print('zip binary not found, skipping the shell pipeline.')
+
+        for level in [9, 6, 1]:
+            output = os.path.join(directory, f'packager-{level}.zip')
+            results.append((f'packager level {level}', measure(packager, source, site_packages, output, level), output))
+
+        print(f'{"method":<20} {"seconds":>8} {"bytes":>12}')
+        for name, seconds, output in results:
+            print(f'{name:<20} {seconds:>8.2f} {os.path.getsize(output):>12}')
+
+        repeated = os.path.join(directory, 'repeated.zip')
+        packager(source, site_packages, repeated, 6)
+        deterministic = digest(repeated) == digest(os.path.join(directory, 'packager-6.zip'))
+        print(f'Packager output is byte-identical between runs: {deterministic}.')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,180 @@
+#!/usr/bin/env python
+"""
+Measures how synthesis scales with the number of CiCdLambda instances in one stack: wall time, peak memory
+(of the python process and of the jsii node process), resource count and template size. Every measurement
+runs in a fresh process, so the jsii runtime and its caches do not carry over between runs.
+
+Results can be stored and compared with a previous run, which fails if any metric regresses.
+
+Usage:
+    python benchmarks/synth_benchmark.py [--instances 1 10 100] [--mode separate shared]
+        [--output results.json] [--baseline results.json] [--max-regression 0.2]
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from typing import Any, Dict, List, Optional
+
+ROOT = os.path.join(os.path.dirname(os.path.realpath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+METRICS = ['seconds', 'python_peak_mb', 'node_peak_mb', 'resources', 'template_kb']
+
+
+def create_stack(app: Any, instances: int, shared: bool) -> None:
+    from aws_cdk import aws_iam, aws_lambda, core
+    from aws_ci_cd_lambda.ci_cd_lambda import CiCdLambda
+    from aws_ci_cd_lambda.parameters.lambda_parameters import LambdaParameters
+    from aws_ci_cd_lambda.parameters.pipeline_parameters import PipelineParameters
+    from aws_ci_cd_lambda.parameters.ssh_parameters import SshParameters
+    from aws_ci_cd_lambda.shared_infrastructure import SharedInfrastructure
+
+    stack = core.Stack(app, 'SynthBenchmark', env=core.Environment(account='123456789012', region='eu-west-1'))
+    shared_infrastructure = SharedInfrastructure(stack, 'Bench') if shared else None
+
+    role = aws_iam.Role(stack, 'ExecutionRole', assumed_by=aws_iam.ServicePrincipal('lambda.amazonaws.com'))
+
+    for index in range(instances):
+        CiCdLambda(
+            stack,
+            f'Bench{index}',
+            pipeline_params=PipelineParameters(ssh_params=SshParameters()),
+            lambda_params=LambdaParameters(
+                execution_role=role,
+                lambda_memory=256,
+                lambda_timeout=30,
+                lambda_handler='manage.runner',
+                lambda_runtime=aws_lambda.Runtime.PYTHON_3_8
+            ),
+            shared_infrastructure=shared_infrastructure
+        )
+
+
+def node_peak_mb() -> Optional[float]:
+    """
+    Reads the peak resident memory of child processes (the jsii node runtime) while they are still running.
+    """
+    peaks = []
+
+    for task in os.listdir('/proc/self/task'):
+        try:
+            with open(f'/proc/self/task/{task}/children') as file:
+                children = file.read().split()
+        except OSError:
+            return None
+
+        for child in children:
+            with open(f'/proc/{child}/status') as file:
+                for line in file:
+                    if line.startswith('VmHWM:'):
+                        peaks.append(int(line.split()[1]) / 1024)
+
+    return max(peaks) if peaks else None
+
+
+def measure(instances: int, shared: bool) -> Dict[str, Any]:
+    """
+    Synthesizes a stack and measures it. Runs in a dedicated process (see run).
+    """
+    from aws_cdk import core
+
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        # Large measurements exceed the CloudFormation limit of 500 resources, which synthesis enforces.
+        app = core.App(outdir=directory, context={'@aws-cdk/core:stackResourceLimit': 0})
+        create_stack(app, instances, shared)
+        assembly = app.synth()
+        seconds = time.perf_counter() - start
+
+        resources = 0
+        template_bytes = 0
+
+        for stack in assembly.stacks:
+            template_bytes += os.path.getsize(os.path.join(directory, stack.template_file))
+            resources += len(stack.template.get('Resources', {}))
+
+        return {
+            'seconds': seconds,
+            'python_peak_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+            'node_peak_mb': node_peak_mb(),
+            'resources': resources,
+            'template_kb': template_bytes / 1024,
+        }
+
+
+def run(instances: int, shared: bool) -> Dict[str, Any]:
+    command = [sys.executable, os.path.realpath(__file__), '--measure', str(instances)] + (['--shared'] if shared else [])
+    result = subprocess.run(command, stdout=subprocess.PIPE, check=True, universal_newlines=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def compare(results: List[Dict[str, Any]], baseline: List[Dict[str, Any]], max_regression: float) -> List[str]:
+    previous = {(item['mode'], item['instances']): item for item in baseline}
+    violations = []
+
+    for item in results:
+        old = previous.get((item['mode'], item['instances']))
+
+        for metric in METRICS if old else []:
+            value, old_value = item.get(metric), old.get(metric)
+
+            if value is not None and old_value and value > old_value * (1 + max_regression):
+                violations.append(
+                    f'{item["mode"]} x{item["instances"]}: {metric} {value:.1f} regressed from {old_value:.1f}.'
+                )
+
+    return violations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--instances', type=int, nargs='+', default=[1, 10, 100])
+    parser.add_argument('--mode', nargs='+', default=['separate', 'shared'], choices=['separate', 'shared'])
+    parser.add_argument('--output', default=None, help='Path of a JSON file to store results in.')
+    parser.add_argument('--baseline', default=None, help='Results of a previous run to compare with.')
+    parser.add_argument('--max-regression', type=float, default=0.2)
+    parser.add_argument('--measure', type=int, default=None, help=argparse.SUPPRESS)
+    parser.add_argument('--shared', action='store_true', help=argparse.SUPPRESS)
+    arguments = parser.parse_args()
+
+    if arguments.measure is not None:
+        print(json.dumps(measure(arguments.measure, arguments.shared)))
+        return
+
+    results = []
+
+    print(f'{"mode":<10} {"instances":>9} {"seconds":>8} {"python MB":>10} {"node MB":>8} {"resources":>10} {"template KB":>12}')
+
+    for mode in arguments.mode:
+        for instances in arguments.instances:
+            item = dict(run(instances, mode == 'shared'), mode=mode, instances=instances)
+            results.append(item)
+
+            node = f'{item["node_peak_mb"]:>8.0f}' if item['node_peak_mb'] is not None else f'{"n/a":>8}'
+            print(
+                f'{mode:<10} {instances:>9} {item["seconds"]:>8.1f} {item["python_peak_mb"]:>10.0f} {node} '
+                f'{item["resources"]:>10} {item["template_kb"]:>12.0f}'
+            )
+
+    if arguments.output:
+        with open(arguments.output, 'w') as file:
+            json.dump(results, file, indent=2)
+
+    if arguments.baseline:
+        with open(arguments.baseline) as file:
+            violations = compare(results, json.load(file), arguments.max_regression)
+
+        if violations:
+            raise SystemExit('Synth regressed:\n' + '\n'.join(violations))
+
+        print('No regressions against the baseline.')
+
+
+if __name__ == '__main__':
+    main()
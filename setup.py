@@ -7,9 +7,9 @@ with open('HISTORY.md') as history_file:
     HISTORY = history_file.read()
 setup(
     name='aws_ci_cd_lambda',
-    version='3.4.0',
+    version='3.5.0',
     license='GNU GENERAL PUBLIC LICENSE Version 3',
-    packages=find_packages(exclude=['venv', 'test']),
+    packages=find_packages(exclude=['venv', 'test', 'tests', 'tests.*']),
     description=(
         'AWS CDK package that helps deploying a lambda function.'
     ),
@@ -18,19 +18,30 @@ setup(
     include_package_data=True,
     install_requires=[
         # AWS CDK dependencies.
-        'aws_cdk.core>=1.60.0,<2.0.0',
-        'aws_cdk.aws_iam>=1.60.0,<2.0.0',
-        'aws_cdk.custom_resources>=1.60.0,<2.0.0',
-        'aws_cdk.aws_lambda>=1.60.0,<2.0.0',
-        'aws_cdk.aws_codecommit>=1.60.0,<2.0.0',
-        'aws_cdk.aws_codebuild>=1.60.0,<2.0.0',
-        'aws_cdk.aws_codepipeline>=1.60.0,<2.0.0',
-        'aws_cdk.aws_codepipeline_actions>=1.60.0,<2.0.0',
-        'aws_cdk.aws_ec2>=1.60.0,<2.0.0',
+        'aws_cdk.core>=1.130.0,<2.0.0',
+        'aws_cdk.aws_iam>=1.130.0,<2.0.0',
+        'aws_cdk.aws_lambda>=1.130.0,<2.0.0',
+        'aws_cdk.aws_codecommit>=1.130.0,<2.0.0',
+        'aws_cdk.aws_codebuild>=1.130.0,<2.0.0',
+        'aws_cdk.aws_codedeploy>=1.130.0,<2.0.0',
+        'aws_cdk.aws_codepipeline>=1.130.0,<2.0.0',
+        'aws_cdk.aws_codepipeline_actions>=1.130.0,<2.0.0',
+        'aws_cdk.aws_ec2>=1.130.0,<2.0.0',
+        'aws_cdk.aws_ecr>=1.130.0,<2.0.0',
+        'aws_cdk.aws_events>=1.130.0,<2.0.0',
+        'aws_cdk.aws_events_targets>=1.130.0,<2.0.0',
+        'aws_cdk.aws_cloudwatch>=1.130.0,<2.0.0',
+        'aws_cdk.aws_applicationautoscaling>=1.130.0,<2.0.0',
+        'aws_cdk.aws_s3>=1.130.0,<2.0.0',
+        'aws_cdk.aws_s3_assets>=1.130.0,<2.0.0',
 
         # Other dependencies.
         'aws-empty-bucket>=2.0.0,<3.0.0'
     ],
+    extras_require={
+        # Load test and power tuning tools invoke functions with boto3.
+        'tools': ['boto3>=1.16.0,<2.0.0'],
+    },
     author='Deividas Tamkus',
     author_email='dtamkus@gmail.com',
     keywords='AWS CDK Ci/Cd Lambda Pipeline',
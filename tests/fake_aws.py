@@ -0,0 +1,122 @@
+import base64
+import hashlib
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from aws_ci_cd_lambda.build_tools.aws_cli import AwsCliError
+
+
+class FakeAwsCli:
+    """
+    In-memory stand-in of AwsCli with the S3 and Lambda operations, that build tools call.
+    Every call is recorded as a (service, operation) pair.
+    """
+    def __init__(self) -> None:
+        self.objects: Dict[str, bytes] = {}
+        self.modified: Dict[str, int] = {}
+        self.functions: Dict[str, Dict[str, Any]] = {}
+        self.calls: List[Tuple[str, str]] = []
+
+    def add_function(self, name: str, code: bytes = b'', alias: Optional[str] = None) -> None:
+        self.functions[name] = {'code': self.sha256(code), 'layers': [], 'versions': [], 'aliases': {}}
+
+        if alias is not None:
+            self.functions[name]['aliases'][alias] = self.__publish(name)
+
+    def put(self, url: str, data: bytes) -> None:
+        self.objects[url] = data
+        self.modified[url] = len(self.modified)
+
+    def operations(self, service: str) -> List[str]:
+        return [operation for called_service, operation in self.calls if called_service == service]
+
+    @staticmethod
+    def sha256(data: bytes) -> str:
+        return base64.b64encode(hashlib.sha256(data).digest()).decode()
+
+    def copy(self, source: str, destination: str) -> None:
+        self.calls.append(('s3', 'cp'))
+
+        if source.startswith('s3://'):
+            if source not in self.objects:
+                raise AwsCliError('aws s3 cp', 'An error occurred (404) when calling the HeadObject operation')
+
+            with open(destination, 'wb') as file:
+                file.write(self.objects[source])
+        else:
+            with open(source, 'rb') as file:
+                self.put(destination, file.read())
+
+    def call(self, service: str, operation: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        self.calls.append((service, operation))
+        params = params or {}
+        handler = getattr(self, f'_{service}_{operation.replace("-", "_")}')
+        return handler(**params)
+
+    def _s3api_head_object(self, Bucket: str, Key: str) -> Dict[str, Any]:
+        if f's3://{Bucket}/{Key}' not in self.objects:
+            raise AwsCliError('aws s3api head-object', 'An error occurred (404) when calling the HeadObject operation')
+
+        return {'ContentLength': len(self.objects[f's3://{Bucket}/{Key}'])}
+
+    def _s3api_copy_object(self, Bucket: str, Key: str, CopySource: str, **params: Any) -> Dict[str, Any]:
+        source = f's3://{CopySource}'
+
+        if source not in self.objects:
+            raise AwsCliError('aws s3api copy-object', 'An error occurred (NoSuchKey) when calling CopyObject')
+
+        self.put(f's3://{Bucket}/{Key}', self.objects[source])
+        return {}
+
+    def _s3api_list_objects_v2(self, Bucket: str, Prefix: str) -> Dict[str, Any]:
+        base = f's3://{Bucket}/'
+        contents = [
+            {'Key': url[len(base):], 'LastModified': f'2024-01-01T00:00:{self.modified[url]:02d}'}
+            for url in self.objects if url.startswith(base + Prefix)
+        ]
+
+        return {'Contents': contents} if contents else {}
+
+    def _lambda_get_function_configuration(self, FunctionName: str) -> Dict[str, Any]:
+        function = self.functions[FunctionName]
+
+        return {
+            'FunctionName': FunctionName,
+            'CodeSha256': function['code'],
+            'Layers': [{'Arn': arn} for arn in function['layers']],
+            'LastUpdateStatus': 'Successful',
+        }
+
+    def _lambda_update_function_code(
+            self,
+            FunctionName: str,
+            S3Bucket: str,
+            S3Key: str,
+            Publish: bool = False
+    ) -> Dict[str, Any]:
+        self.functions[FunctionName]['code'] = self.sha256(self.objects[f's3://{S3Bucket}/{S3Key}'])
+        return {'Version': self.__publish(FunctionName) if Publish else '$LATEST'}
+
+    def _lambda_update_function_configuration(self, FunctionName: str, Layers: List[str]) -> Dict[str, Any]:
+        self.functions[FunctionName]['layers'] = list(Layers)
+        return {}
+
+    def _lambda_publish_version(self, FunctionName: str) -> Dict[str, Any]:
+        return {'Version': self.__publish(FunctionName)}
+
+    def _lambda_get_alias(self, FunctionName: str, Name: str) -> Dict[str, Any]:
+        return {'Name': Name, 'FunctionVersion': self.functions[FunctionName]['aliases'][Name]}
+
+    def _lambda_update_alias(self, FunctionName: str, Name: str, FunctionVersion: str) -> Dict[str, Any]:
+        self.functions[FunctionName]['aliases'][Name] = FunctionVersion
+        return {}
+
+    def __publish(self, function_name: str) -> str:
+        function = self.functions[function_name]
+        state = (function['code'], tuple(function['layers']))
+
+        # Like Lambda, publishing unchanged code and configuration returns the latest version.
+        if not function['versions'] or function['versions'][-1] != state:
+            function['versions'].append(state)
+
+        return str(len(function['versions']))
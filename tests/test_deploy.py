@@ -0,0 +1,31 @@
+import unittest
+
+from aws_ci_cd_lambda.build_tools.deploy import should_deploy
+
+LAYER = 'arn:aws:lambda:eu-west-1:123456789012:layer:function-deps-abc:3'
+
+
+class TestShouldDeploy(unittest.TestCase):
+    def test_changed_code_is_deployed(self) -> None:
+        self.assertTrue(should_deploy('new', {'CodeSha256': 'old'}))
+
+    def test_same_code_is_skipped(self) -> None:
+        self.assertFalse(should_deploy('same', {'CodeSha256': 'same'}))
+
+    def test_new_function_is_deployed(self) -> None:
+        self.assertTrue(should_deploy('same', {}))
+
+    def test_same_code_with_same_layer_is_skipped(self) -> None:
+        configuration = {'CodeSha256': 'same', 'Layers': [{'Arn': LAYER}]}
+        self.assertFalse(should_deploy('same', configuration, LAYER))
+
+    def test_same_code_with_other_layer_is_deployed(self) -> None:
+        configuration = {'CodeSha256': 'same', 'Layers': [{'Arn': LAYER[:-1] + '2'}]}
+        self.assertTrue(should_deploy('same', configuration, LAYER))
+
+    def test_same_code_without_layer_is_deployed(self) -> None:
+        self.assertTrue(should_deploy('same', {'CodeSha256': 'same'}, LAYER))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+
+from aws_ci_cd_lambda.build_tools.loadtest import Invocation, check, percentile, summarize
+
+
+def report(client_p50: float, client_p99: float, errors: int = 0, invocations: int = 100) -> dict:
+    return {
+        'invocations': invocations,
+        'errors': errors,
+        'error_samples': [],
+        'client': {'p50': client_p50, 'p99': client_p99},
+        'duration': {'p50': None, 'p99': None},
+        'billed': {'p50': None, 'p99': None},
+    }
+
+
+class TestPercentile(unittest.TestCase):
+    def test_nearest_rank(self) -> None:
+        values = [float(value) for value in range(100, 0, -1)]
+
+        self.assertEqual(percentile(values, 0.5), 50.0)
+        self.assertEqual(percentile(values, 0.99), 99.0)
+        self.assertEqual(percentile(values, 1.0), 100.0)
+
+    def test_small_fraction_is_the_minimum(self) -> None:
+        self.assertEqual(percentile([3.0, 1.0, 2.0], 0.0), 1.0)
+
+    def test_no_values(self) -> None:
+        self.assertIsNone(percentile([], 0.5))
+
+
+class TestSummarize(unittest.TestCase):
+    def test_failed_invocations_are_counted_not_measured(self) -> None:
+        invocations = [
+            Invocation(10.0, 8.0, 9.0, None),
+            Invocation(20.0, 18.0, 19.0, None),
+            Invocation(1000.0, None, None, 'Unhandled'),
+            Invocation(5.0, None, None, 'Timeout'),
+        ]
+
+        result = summarize(invocations)
+
+        self.assertEqual(result['invocations'], 4)
+        self.assertEqual(result['errors'], 2)
+        self.assertEqual(result['error_samples'], ['Timeout', 'Unhandled'])
+        self.assertEqual(result['client'], {'p50': 10.0, 'p99': 20.0})
+        self.assertEqual(result['duration'], {'p50': 8.0, 'p99': 18.0})
+        self.assertEqual(result['billed'], {'p50': 9.0, 'p99': 19.0})
+
+    def test_missing_durations(self) -> None:
+        result = summarize([Invocation(10.0, None, None, None)])
+
+        self.assertEqual(result['client'], {'p50': 10.0, 'p99': 10.0})
+        self.assertEqual(result['duration'], {'p50': None, 'p99': None})
+
+
+class TestCheck(unittest.TestCase):
+    def test_passes(self) -> None:
+        self.assertEqual(check(report(10, 50), report(10, 50), 20, 100, 0.2), [])
+
+    def test_errors_above_rate(self) -> None:
+        self.assertEqual(len(check(report(10, 50, errors=1), None)), 1)
+        self.assertEqual(check(report(10, 50, errors=1), None, max_error_rate=0.01), [])
+
+    def test_budgets(self) -> None:
+        violations = check(report(30, 150), None, p50_budget_ms=20, p99_budget_ms=100)
+
+        self.assertEqual(len(violations), 2)
+        self.assertIn('p50', violations[0])
+        self.assertIn('p99', violations[1])
+
+    def test_regression(self) -> None:
+        self.assertEqual(check(report(11.9, 50), report(10, 50), max_regression=0.2), [])
+
+        violations = check(report(12.1, 50), report(10, 50), max_regression=0.2)
+
+        self.assertEqual(len(violations), 1)
+        self.assertIn('Client p50', violations[0])
+
+    def test_no_regression_check_without_baseline_or_threshold(self) -> None:
+        self.assertEqual(check(report(100, 500), None, max_regression=0.2), [])
+        self.assertEqual(check(report(100, 500), report(10, 50)), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import os
+import tempfile
+import unittest
+
+from typing import Optional
+
+from aws_ci_cd_lambda.build_tools.monorepo import build_and_deploy, changed_functions, parse_functions
+from aws_ci_cd_lambda.build_tools.packager import build_archive, collect_entries
+from aws_ci_cd_lambda.build_tools.slimming import Slimmer
+from tests.fake_aws import FakeAwsCli
+
+BUCKET = 'artifacts-bucket'
+FUNCTIONS = {'api': 'functions/api', 'worker': 'functions/worker'}
+
+
+class TestChangedFunctions(unittest.TestCase):
+    def test_parse_functions(self) -> None:
+        self.assertEqual(parse_functions(['api=./functions/api/', 'worker=functions//worker']), FUNCTIONS)
+
+    def test_single_function_change(self) -> None:
+        self.assertEqual(changed_functions(FUNCTIONS, ['functions/api/handler.py']), ['api'])
+
+    def test_shared_path_change_rebuilds_every_function(self) -> None:
+        changed = ['functions/api/handler.py', 'common/db.py']
+
+        self.assertEqual(changed_functions(FUNCTIONS, changed), ['api', 'worker'])
+        self.assertEqual(changed_functions(FUNCTIONS, ['requirements.txt']), ['api', 'worker'])
+
+    def test_source_path_prefix_is_not_a_change(self) -> None:
+        self.assertEqual(changed_functions(FUNCTIONS, ['functions/api-v2/handler.py']), ['api', 'worker'])
+        self.assertEqual(changed_functions({**FUNCTIONS, 'v2': 'functions/api-v2'}, ['functions/api-v2/x.py']), ['v2'])
+
+    def test_no_changes(self) -> None:
+        self.assertEqual(changed_functions(FUNCTIONS, []), [])
+
+    def test_unknown_changes_rebuild_every_function(self) -> None:
+        self.assertEqual(changed_functions(FUNCTIONS, None), ['api', 'worker'])
+
+
+class TestBuildAndDeploy(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.directory.name, 'api')
+        os.makedirs(self.source)
+
+        with open(os.path.join(self.source, 'handler.py'), 'wb') as file:
+            file.write(b'def runner(event, context):\n    return event\n')
+
+        self.client = FakeAwsCli()
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def package(self) -> bytes:
+        path = os.path.join(self.directory.name, 'package.zip')
+        build_archive(path, collect_entries([self.source]), workers=1)
+
+        with open(path, 'rb') as file:
+            return file.read()
+
+    def build_and_deploy(self, alias: Optional[str] = None) -> str:
+        result = build_and_deploy(
+            self.client, 'api', 'prefix-api', self.source, [], {}, BUCKET, 6, 1, Slimmer(), None, alias, 'abc'
+        )
+
+        return result.status
+
+    def test_changed_code_is_deployed_and_promoted(self) -> None:
+        self.client.add_function('prefix-api', code=b'old', alias='live')
+
+        self.assertEqual(self.build_and_deploy('live'), 'deployed v2')
+        self.assertEqual(self.client.functions['prefix-api']['code'], FakeAwsCli.sha256(self.package()))
+        self.assertEqual(self.client.functions['prefix-api']['aliases']['live'], '2')
+        self.assertIn(f's3://{BUCKET}/manifests/prefix-api/abc.json', self.client.objects)
+
+    def test_no_op_without_alias(self) -> None:
+        self.client.add_function('prefix-api', code=self.package())
+
+        self.assertEqual(self.build_and_deploy(), 'no-op')
+        self.assertEqual(self.client.operations('lambda'), ['get-function-configuration'])
+
+    def test_no_op_with_current_alias(self) -> None:
+        self.client.add_function('prefix-api', code=self.package(), alias='live')
+
+        self.assertEqual(self.build_and_deploy('live'), 'no-op')
+
+        # Publishing unchanged code returns the current version, which needs lambda:PublishVersion.
+        self.assertEqual(
+            self.client.operations('lambda'),
+            ['get-function-configuration', 'publish-version', 'get-alias']
+        )
+
+    def test_no_op_moves_an_alias_left_behind(self) -> None:
+        self.client.add_function('prefix-api', code=b'old', alias='live')
+
+        # A previous build deployed the code, but failed before moving the alias.
+        self.client.put(f's3://{BUCKET}/previous.zip', self.package())
+        self.client.call('lambda', 'update-function-code', {
+            'FunctionName': 'prefix-api',
+            'S3Bucket': BUCKET,
+            'S3Key': 'previous.zip',
+        })
+        self.client.calls.clear()
+
+        self.assertEqual(self.build_and_deploy('live'), 'promoted v2')
+        self.assertEqual(self.client.functions['prefix-api']['aliases']['live'], '2')
+        self.assertIn('publish-version', self.client.operations('lambda'))
+        self.assertNotIn('update-function-code', self.client.operations('lambda'))
+
+
+if __name__ == '__main__':
+    unittest.main()
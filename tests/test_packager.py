@@ -0,0 +1,87 @@
+import hashlib
+import os
+import tempfile
+import time
+import unittest
+import zipfile
+
+from aws_ci_cd_lambda.build_tools.packager import build_archive, collect_entries
+
+FILES = {
+    'manage.py': b'def runner(event, context):\n    return event\n',
+    'app/__init__.py': b'',
+    'app/data.json': b'{"key": "value"}' * 1000,
+    'bin/tool': b'#!/bin/sh\necho tool\n',
+}
+
+
+def write_sources(root: str) -> None:
+    for name, content in FILES.items():
+        path = os.path.join(root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        with open(path, 'wb') as file:
+            file.write(content)
+
+    os.chmod(os.path.join(root, 'bin', 'tool'), 0o755)
+
+
+def digest(path: str) -> str:
+    with open(path, 'rb') as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+
+class TestBuildArchive(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.root = self.directory.name
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def build(self, name: str, source: str, workers: int) -> str:
+        output = os.path.join(self.root, name)
+        build_archive(output, collect_entries([source]), workers=workers)
+        return output
+
+    def test_identical_inputs_produce_identical_archives(self) -> None:
+        first, second = os.path.join(self.root, 'first'), os.path.join(self.root, 'second')
+        write_sources(first)
+        write_sources(second)
+
+        # Modification times and the number of compression threads must not change the archive.
+        os.utime(os.path.join(second, 'manage.py'), (time.time() + 3600, time.time() + 3600))
+
+        self.assertEqual(
+            digest(self.build('first.zip', first, workers=1)),
+            digest(self.build('second.zip', second, workers=4))
+        )
+
+    def test_archive_contents(self) -> None:
+        source = os.path.join(self.root, 'source')
+        write_sources(source)
+
+        with zipfile.ZipFile(self.build('package.zip', source, workers=2)) as archive:
+            self.assertIsNone(archive.testzip())
+            self.assertEqual(archive.namelist(), sorted(FILES))
+
+            for info in archive.infolist():
+                self.assertEqual(archive.read(info), FILES[info.filename])
+                self.assertEqual(info.date_time, (1980, 1, 1, 0, 0, 0))
+
+            self.assertTrue(archive.getinfo('bin/tool').external_attr >> 16 & 0o100)
+            self.assertFalse(archive.getinfo('manage.py').external_attr >> 16 & 0o100)
+
+    def test_changed_content_changes_the_archive(self) -> None:
+        source = os.path.join(self.root, 'source')
+        write_sources(source)
+        before = digest(self.build('before.zip', source, workers=2))
+
+        with open(os.path.join(source, 'manage.py'), 'ab') as file:
+            file.write(b'# changed\n')
+
+        self.assertNotEqual(before, digest(self.build('after.zip', source, workers=2)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+
+from typing import List
+
+from aws_ci_cd_lambda.build_tools.loadtest import Invocation
+from aws_ci_cd_lambda.build_tools.powertuning import PowerPoint, invocation_cost, recommend, sweep
+
+
+class StubTuner:
+    """
+    A function, whose duration halves with every doubling of memory up to 1024 MB.
+    """
+    def __init__(self, failing_memory: int = 0) -> None:
+        self.failing_memory = failing_memory
+        self.memory = 0
+        self.prepared: List[int] = []
+        self.cleaned_up = False
+
+    def prepare(self, memory: int) -> None:
+        self.memory = memory
+        self.prepared.append(memory)
+
+    def invoke(self, payload: bytes) -> Invocation:
+        if self.memory == self.failing_memory:
+            raise RuntimeError('Out of memory')
+
+        duration = 800.0 * 128 / min(self.memory, 1024)
+        return Invocation(duration + 5, duration, float(int(duration) + 1), None)
+
+    def cleanup(self) -> None:
+        self.cleaned_up = True
+
+
+class TestSweep(unittest.TestCase):
+    def test_measures_every_memory_size(self) -> None:
+        tuner = StubTuner()
+        points = sweep(tuner, [512, 128, 2048], [b'{}'], invocations=4, concurrency=2)
+
+        self.assertEqual(tuner.prepared, [128, 512, 2048])
+        self.assertTrue(tuner.cleaned_up)
+        self.assertEqual([point.memory for point in points], [128, 512, 2048])
+        self.assertEqual([point.duration_ms for point in points], [800.0, 200.0, 100.0])
+        self.assertEqual(points[0].cost, invocation_cost(128, 801.0))
+        self.assertTrue(all(point.errors == 0 for point in points))
+
+    def test_failed_memory_size(self) -> None:
+        tuner = StubTuner(failing_memory=128)
+        points = sweep(tuner, [128, 256], [b'{}'], invocations=3)
+
+        self.assertEqual(points[0].errors, 3)
+        self.assertEqual(points[0].cost, float('inf'))
+        self.assertEqual(points[1].errors, 0)
+
+    def test_cleans_up_on_failure(self) -> None:
+        class ThrottledTuner(StubTuner):
+            def prepare(self, memory: int) -> None:
+                raise RuntimeError('Throttled')
+
+        tuner = ThrottledTuner()
+
+        with self.assertRaises(RuntimeError):
+            sweep(tuner, [128], [b'{}'], invocations=1)
+
+        self.assertTrue(tuner.cleaned_up)
+
+
+class TestRecommend(unittest.TestCase):
+    POINTS = [
+        PowerPoint(128, 800.0, 801.0, invocation_cost(128, 801.0), 0),
+        PowerPoint(512, 200.0, 201.0, invocation_cost(512, 201.0), 0),
+        PowerPoint(1024, 100.0, 101.0, invocation_cost(1024, 101.0), 0),
+        PowerPoint(2048, 100.0, 101.0, invocation_cost(2048, 101.0), 0),
+    ]
+
+    def test_fastest_prefers_the_cheaper_of_equally_fast(self) -> None:
+        self.assertEqual(recommend(self.POINTS, 'fastest').memory, 1024)
+
+    def test_cheapest(self) -> None:
+        self.assertEqual(recommend(self.POINTS, 'cheapest').memory, 128)
+
+    def test_balanced(self) -> None:
+        self.assertEqual(recommend(self.POINTS, 'balanced').memory, 1024)
+        self.assertEqual(recommend(self.POINTS, 'balanced', balanced_weight=0.0).memory, 128)
+
+    def test_memory_sizes_with_errors_are_not_recommended(self) -> None:
+        points = [self.POINTS[0]._replace(errors=1)] + self.POINTS[1:]
+
+        self.assertEqual(recommend(points, 'cheapest').memory, 512)
+
+
+if __name__ == '__main__':
+    unittest.main()
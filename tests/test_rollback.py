@@ -0,0 +1,56 @@
+import json
+import unittest
+
+from unittest import mock
+
+from aws_ci_cd_lambda.build_tools import rollback
+from aws_ci_cd_lambda.build_tools.artifacts import artifact_key, manifest_key
+from tests.fake_aws import FakeAwsCli
+
+BUCKET = 'artifacts-bucket'
+PACKAGE = b'old package'
+
+
+class TestRollback(unittest.TestCase):
+    def setUp(self) -> None:
+        self.client = FakeAwsCli()
+        self.client.add_function('api', code=b'new package', alias='live')
+
+        self.key = artifact_key(FakeAwsCli.sha256(PACKAGE))
+        manifest = {'function': 'api', 'commit': 'abc', 'key': self.key, 'layer_arn': None, 'created': 0}
+        self.client.put(f's3://{BUCKET}/{manifest_key("api", "abc")}', json.dumps(manifest).encode())
+
+    def rollback(self, *args: str) -> None:
+        with mock.patch.object(rollback, 'AwsCli', return_value=self.client):
+            rollback.main(['--function-name', 'api', '--bucket', BUCKET, '--alias', 'live', *args])
+
+    def test_rolls_back_to_a_commit(self) -> None:
+        self.client.put(f's3://{BUCKET}/{self.key}', PACKAGE)
+        self.rollback('--commit', 'abc')
+
+        function = self.client.functions['api']
+        self.assertEqual(function['code'], FakeAwsCli.sha256(PACKAGE))
+        self.assertEqual(function['aliases']['live'], '2')
+
+    def test_rolls_back_to_a_hash(self) -> None:
+        self.client.put(f's3://{BUCKET}/{self.key}', PACKAGE)
+        self.rollback('--sha256', self.key.split('/')[1][:-len('.zip')].upper())
+
+        self.assertEqual(self.client.functions['api']['code'], FakeAwsCli.sha256(PACKAGE))
+
+    def test_unknown_hash_is_rejected(self) -> None:
+        with self.assertRaises(SystemExit):
+            self.rollback('--sha256', '00' * 32)
+
+        self.assertNotIn('update-function-code', self.client.operations('lambda'))
+
+    def test_expired_package_is_rejected(self) -> None:
+        with self.assertRaises(SystemExit) as context:
+            self.rollback('--commit', 'abc')
+
+        self.assertIn('no longer exists', str(context.exception))
+        self.assertNotIn('update-function-code', self.client.operations('lambda'))
+
+
+if __name__ == '__main__':
+    unittest.main()
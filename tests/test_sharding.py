@@ -0,0 +1,62 @@
+import os
+import tempfile
+import unittest
+
+from aws_ci_cd_lambda.build_tools.sharding import assign, discover, junit_durations
+
+REPORT = '''<?xml version="1.0" encoding="utf-8"?>
+<testsuites>
+  <testsuite name="pytest">
+    <testcase classname="tests.test_api.TestApi" name="test_get" time="1.5"/>
+    <testcase classname="tests.test_api.TestApi" name="test_post" time="2.0"/>
+    <testcase classname="tests.test_db" name="test_query" file="tests/test_db.py" time="0.25"/>
+    <testcase classname="missing.TestMissing" name="test_gone" time="9"/>
+  </testsuite>
+</testsuites>
+'''
+
+
+class TestAssign(unittest.TestCase):
+    def test_longest_files_go_to_the_least_loaded_shard(self) -> None:
+        timings = {'a.py': 10.0, 'b.py': 6.0, 'c.py': 5.0, 'd.py': 4.0, 'e.py': 1.0}
+
+        self.assertEqual(assign(sorted(timings), timings, 2), [['a.py', 'd.py'], ['b.py', 'c.py', 'e.py']])
+
+    def test_every_file_is_assigned_once(self) -> None:
+        files = [f'test_{index}.py' for index in range(25)]
+        shards = assign(files, {name: float(index % 7) for index, name in enumerate(files)}, 4)
+
+        self.assertEqual(sorted(name for shard in shards for name in shard), sorted(files))
+
+    def test_unknown_files_take_the_average_duration(self) -> None:
+        timings = {'a.py': 4.0, 'b.py': 2.0}
+
+        self.assertEqual(assign(['a.py', 'b.py', 'new.py'], timings, 2), [['a.py'], ['b.py', 'new.py']])
+
+    def test_order_does_not_matter(self) -> None:
+        files = ['c.py', 'a.py', 'b.py', 'd.py']
+
+        self.assertEqual(assign(files, {}, 3), assign(list(reversed(files)), {}, 3))
+
+    def test_more_shards_than_files(self) -> None:
+        self.assertEqual(assign(['a.py'], {}, 3), [['a.py'], [], []])
+
+
+class TestDiscovery(unittest.TestCase):
+    def test_discover_and_durations(self) -> None:
+        with tempfile.TemporaryDirectory() as root:
+            for name in ['tests/test_api.py', 'tests/test_db.py', 'tests/helpers.py', 'venv/lib/test_skip.py']:
+                os.makedirs(os.path.dirname(os.path.join(root, name)), exist_ok=True)
+                open(os.path.join(root, name), 'w').close()
+
+            report = os.path.join(root, 'report.xml')
+
+            with open(report, 'w') as file:
+                file.write(REPORT)
+
+            self.assertEqual(discover(root), ['tests/test_api.py', 'tests/test_db.py'])
+            self.assertEqual(junit_durations(report, root), {'tests/test_api.py': 3.5, 'tests/test_db.py': 0.25})
+
+
+if __name__ == '__main__':
+    unittest.main()
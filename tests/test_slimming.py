@@ -0,0 +1,127 @@
+import importlib.util
+import marshal
+import os
+import sys
+import tempfile
+import unittest
+
+from aws_ci_cd_lambda.build_tools.packager import Entry, collect_entries
+from aws_ci_cd_lambda.build_tools.slimming import PRUNE_RULES, Slimmer, is_pruned, precompile
+
+FILES = {
+    'app/__init__.py': b'',
+    'app/handler.py': b'VALUE = 42\n',
+    'app/broken.py': b'def broken(:\n',
+    'app/tests/test_handler.py': b'def test(): pass\n',
+    'pytest/__init__.py': b'',
+    'requests/__pycache__/api.cpython-39.pyc': b'stale',
+    'requests/api.py': b'def get(): pass\n',
+    'requests/README.md': b'# requests\n',
+    'requests-2.0.dist-info/METADATA': b'Name: requests\n',
+}
+
+
+def write_sources(root: str) -> None:
+    for name, content in FILES.items():
+        path = os.path.join(root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        with open(path, 'wb') as file:
+            file.write(content)
+
+
+class TestIsPruned(unittest.TestCase):
+    def test_directory_patterns_match_whole_directory_names(self) -> None:
+        rules = [PRUNE_RULES['tests']]
+
+        self.assertTrue(is_pruned('app/tests/test_handler.py', rules))
+        self.assertTrue(is_pruned('test/conftest.py', rules))
+        self.assertFalse(is_pruned('pytest/__init__.py', rules))
+        self.assertFalse(is_pruned('app/testsuite/run.py', rules))
+
+    def test_file_name_is_not_a_directory(self) -> None:
+        self.assertFalse(is_pruned('app/tests', [PRUNE_RULES['tests']]))
+
+    def test_wildcard_patterns(self) -> None:
+        self.assertTrue(is_pruned('requests-2.0.dist-info/METADATA', [PRUNE_RULES['dist_info']]))
+        self.assertTrue(is_pruned('botocore-1.0.dist-info/RECORD', [PRUNE_RULES['boto3']]))
+        self.assertTrue(is_pruned('requests/README.md', [PRUNE_RULES['docs']]))
+        self.assertFalse(is_pruned('requests/api.py', [PRUNE_RULES['docs'], PRUNE_RULES['stubs']]))
+
+    def test_no_rules(self) -> None:
+        self.assertFalse(is_pruned('app/tests/test_handler.py', []))
+
+
+class TestPrecompile(unittest.TestCase):
+    def test_unchecked_hash_based_bytecode(self) -> None:
+        with tempfile.TemporaryDirectory() as root:
+            write_sources(root)
+            entry = precompile(Entry('app/handler.py', os.path.join(root, 'app/handler.py'), True), root)
+
+            with open(entry.path, 'rb') as file:
+                data = file.read()
+
+        self.assertEqual(entry.arcname, f'app/__pycache__/handler.{sys.implementation.cache_tag}.pyc')
+        self.assertFalse(entry.executable)
+        self.assertEqual(data[:4], importlib.util.MAGIC_NUMBER)
+
+        # Flags: hash based (bit 0), the source is not checked (bit 1 unset), since Lambda can not rewrite it.
+        self.assertEqual(int.from_bytes(data[4:8], 'little'), 1)
+        self.assertEqual(data[8:16], importlib.util.source_hash(FILES['app/handler.py']))
+
+        namespace = {}
+        exec(marshal.loads(data[16:]), namespace)
+        self.assertEqual(namespace['VALUE'], 42)
+
+    def test_invalid_source(self) -> None:
+        with tempfile.TemporaryDirectory() as root:
+            write_sources(root)
+
+            self.assertIsNone(precompile(Entry('app/broken.py', os.path.join(root, 'app/broken.py'), False), root))
+
+
+class TestSlimmer(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.directory.name, 'source')
+        self.work_dir = os.path.join(self.directory.name, 'work')
+        write_sources(self.source)
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_partitions_kept_and_pruned_entries(self) -> None:
+        entries = collect_entries([self.source])
+        kept, pruned = Slimmer(['tests', 'docs']).apply(entries, self.work_dir)
+
+        self.assertEqual(
+            [entry.arcname for entry in pruned],
+            ['app/tests/test_handler.py', 'requests/README.md']
+        )
+        self.assertEqual(sorted(kept + pruned), sorted(entries))
+
+    def test_precompiled_entries_are_sorted_and_unique(self) -> None:
+        kept, _ = Slimmer(['tests'], compile_bytecode=True).apply(collect_entries([self.source]), self.work_dir)
+        names = [entry.arcname for entry in kept]
+        tag = sys.implementation.cache_tag
+
+        self.assertEqual(names, sorted(names))
+        self.assertEqual(len(names), len(set(names)))
+        self.assertIn(f'app/__pycache__/handler.{tag}.pyc', names)
+        self.assertNotIn(f'app/__pycache__/broken.{tag}.pyc', names)
+        self.assertNotIn(f'app/tests/__pycache__/test_handler.{tag}.pyc', names)
+
+    def test_existing_bytecode_is_not_duplicated(self) -> None:
+        stale = f'requests/__pycache__/api.{sys.implementation.cache_tag}.pyc'
+        os.rename(
+            os.path.join(self.source, 'requests/__pycache__/api.cpython-39.pyc'),
+            os.path.join(self.source, stale)
+        )
+
+        kept, _ = Slimmer(compile_bytecode=True).apply(collect_entries([self.source]), self.work_dir)
+
+        self.assertEqual([entry.path for entry in kept if entry.arcname == stale], [os.path.join(self.source, stale)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import os
+import tempfile
+import unittest
+
+from aws_ci_cd_lambda.build_tools.timing import (
+    PHASE_END,
+    Step,
+    instrument,
+    metric_records,
+    phase_durations,
+    read_marks,
+    step_label,
+    steps
+)
+
+
+class TestStepLabel(unittest.TestCase):
+    def test_build_tool(self) -> None:
+        self.assertEqual(step_label('python3 -m build_tools.sharding assign --index 0'), 'sharding assign')
+        self.assertEqual(step_label('python3 -m build_tools.packager --output pack.zip src'), 'packager')
+
+    def test_variable_assignment(self) -> None:
+        self.assertEqual(step_label('export VENV_PATH=/tmp/venv'), 'export VENV_PATH')
+
+    def test_shell_special_characters_are_removed(self) -> None:
+        self.assertEqual(step_label('echo "$(cat file)" | tee out'), 'echo cat file  tee out')
+
+
+class TestSteps(unittest.TestCase):
+    MARKS = [
+        ('install', 'pip install', 1000),
+        ('install', PHASE_END, 3500),
+        ('build', 'packager', 4000),
+        ('build', 'deploy', 5000),
+        ('build', 'packager', 9000),
+        ('build', PHASE_END, 9500),
+        ('post_build', 'timing', 10000),
+    ]
+
+    def test_steps_last_until_the_next_mark(self) -> None:
+        self.assertEqual(steps(self.MARKS, 12000), [
+            Step('install', 'pip install', 2.5),
+            Step('build', 'packager', 1.5),
+            Step('build', 'deploy', 4.0),
+            Step('post_build', 'timing', 2.0),
+        ])
+
+    def test_failed_step_lasts_until_the_end(self) -> None:
+        self.assertEqual(steps(self.MARKS[:4], 8000)[-1], Step('build', 'deploy', 3.0))
+
+    def test_phase_durations(self) -> None:
+        durations = phase_durations(steps(self.MARKS, 12000))
+
+        self.assertEqual(list(durations), ['install', 'build', 'post_build'])
+        self.assertEqual(durations, {'install': 2.5, 'build': 5.5, 'post_build': 2.0})
+
+    def test_metric_records(self) -> None:
+        records = metric_records('Api', 'build', [Step('build', 'packager', 1.5), Step('build', 'deploy', 4.0)])
+
+        self.assertEqual(records, [
+            ({'Prefix': 'Api', 'Stage': 'build', 'Phase': 'build'}, {'PhaseDuration': 5.5}),
+            ({'Prefix': 'Api', 'Stage': 'build', 'Phase': 'build', 'Step': 'packager'}, {'StepDuration': 1.5}),
+            ({'Prefix': 'Api', 'Stage': 'build', 'Phase': 'build', 'Step': 'deploy'}, {'StepDuration': 4.0}),
+        ])
+
+
+class TestInstrument(unittest.TestCase):
+    def test_marks_round_trip(self) -> None:
+        buildspec = {'version': 0.2, 'phases': {'build': {'commands': ['./build.sh']}}}
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'marks.txt')
+            result = instrument(buildspec, 'report', path)
+            commands = result['phases']['build']['commands']
+
+            self.assertEqual(commands[1], './build.sh')
+            self.assertEqual(result['phases']['post_build']['commands'], ['report || true'])
+            self.assertEqual(buildspec['phases']['build']['commands'], ['./build.sh'])
+
+            # Marks are written by the shell, "date +%s%3N" is replaced by fixed timestamps.
+            with open(path, 'w') as file:
+                for index, command in enumerate(commands[::2]):
+                    file.write(command.split("'")[1] + f'{1000 * (index + 1)}\n')
+
+            self.assertEqual(read_marks(path), [('build', 'build.sh', 1000), ('build', PHASE_END, 2000)])
+
+
+if __name__ == '__main__':
+    unittest.main()